@@ -2,18 +2,33 @@
 CALCULADORA DE SOSTENIBILIDAD ALIMENTARIA - REDISEÑO
 ¿Qué tan sustentable es tu comida?
 
+Punto de entrada multipágina: configuración, estilos, barra lateral común y
+navegación. Cada página vive en paginas/ y solo importa lo que usa; el cálculo
+está en calculadora_nucleo.py y los gráficos en calculadora_graficos.py.
+
 Autor: Laura Ochoa M.
 Fecha: Enero 2026
 Versión: 3.0 (42 productos)
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from io import BytesIO
-from typing import Dict, Tuple
+
+from calculadora_nucleo import (
+    COLUMNAS_SCORE,
+    ContextoPagina,
+    PERFIL_ETAPAS,
+    REGION_BASE,
+    cargar_datos,
+    cargar_distancias_regionales,
+    etiqueta_estilos,
+    fijar_contexto_pagina,
+    obtener_catalogo_combinado,
+    obtener_indice_productos,
+    obtener_rankings_incrementales,
+    obtener_registro,
+    obtener_resumen_catalogo,
+    obtener_scores_regionales
+)
 
 # ============================================================================
 # CONFIGURACIÓN DE LA PÁGINA
@@ -30,401 +45,26 @@ st.set_page_config(
 # ESTILOS CSS PERSONALIZADOS - ESTILO CONFLUENCE
 # ============================================================================
 
-st.markdown("""
-<style>
-    /* Tipografía clara y profesional estilo Confluence */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    html, body, [class*="css"] {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        color: #172B4D;
-    }
-    
-    /* Títulos limpios estilo Confluence */
-    h1 {
-        font-weight: 600 !important;
-        color: #172B4D !important;
-        margin-bottom: 0.5rem !important;
-        font-size: 2rem !important;
-    }
-    
-    h2 {
-        font-weight: 600 !important;
-        color: #172B4D !important;
-        margin-top: 2rem !important;
-        font-size: 1.5rem !important;
-    }
-    
-    h3 {
-        font-weight: 500 !important;
-        color: #172B4D !important;
-        font-size: 1.2rem !important;
-    }
-    
-    /* Subtítulo principal */
-    .subtitle-main {
-        font-size: 1.2rem;
-        color: #5E6C84;
-        font-weight: 400;
-        margin-bottom: 2rem;
-        letter-spacing: 0.2px;
-    }
-    
-    /* Sidebar estilo Confluence */
-    [data-testid="stSidebar"] {
-        background-color: #F4F5F7;
-        border-right: 1px solid #DFE1E6;
-    }
-    
-    [data-testid="stSidebar"] h1 {
-        color: #172B4D !important;
-        font-size: 1.3rem !important;
-        font-weight: 600 !important;
-        padding-bottom: 1rem;
-    }
-    
-    /* Radio buttons en sidebar estilo Confluence */
-    [data-testid="stSidebar"] .stRadio > label {
-        font-weight: 500;
-        color: #172B4D;
-    }
-    
-    /* Cards limpias estilo Confluence */
-    .stMetric {
-        background-color: #FAFBFC;
-        padding: 1.2rem;
-        border-radius: 3px;
-        border: 1px solid #DFE1E6;
-    }
-    
-    /* Info boxes estilo Confluence */
-    .info-box {
-        background-color: #DEEBFF;
-        border-left: 3px solid #0052CC;
-        padding: 1rem 1.5rem;
-        border-radius: 3px;
-        margin: 1rem 0;
-    }
-    
-    .info-box h3 {
-        color: #0747A6 !important;
-        margin-top: 0 !important;
-    }
-    
-    .info-box p, .info-box ul {
-        color: #172B4D;
-    }
-    
-    /* Indicator boxes estilo Confluence */
-    .indicator-box {
-        background-color: #FAFBFC;
-        border: 1px solid #DFE1E6;
-        border-radius: 3px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        transition: all 0.2s ease;
-    }
-    
-    .indicator-box:hover {
-        border-color: #B3D4FF;
-        box-shadow: 0 1px 2px rgba(9, 30, 66, 0.08);
-    }
-    
-    .indicator-title {
-        font-weight: 600;
-        color: #172B4D;
-        margin-bottom: 0.4rem;
-        font-size: 1rem;
-    }
-    
-    .indicator-desc {
-        font-size: 0.9rem;
-        color: #5E6C84;
-        line-height: 1.5;
-    }
-    
-    /* Botones estilo Confluence */
-    .stButton>button {
-        background-color: #0052CC;
-        color: white;
-        border: none;
-        border-radius: 3px;
-        padding: 0.5rem 1.5rem;
-        font-weight: 500;
-        transition: all 0.2s ease;
-        font-size: 0.95rem;
-    }
-    
-    .stButton>button:hover {
-        background-color: #0747A6;
-        box-shadow: 0 2px 4px rgba(9, 30, 66, 0.15);
-    }
-    
-    /* Espaciado generoso estilo Confluence */
-    .block-container {
-        padding-top: 3rem;
-        padding-bottom: 3rem;
-        max-width: 1200px;
-    }
-    
-    /* Selectbox y inputs estilo Confluence */
-    .stSelectbox, .stMultiSelect, .stTextInput {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Tablas estilo Confluence */
-    .dataframe {
-        border: 1px solid #DFE1E6 !important;
-        border-radius: 3px;
-    }
-    
-    /* Líneas divisorias más sutiles */
-    hr {
-        border-color: #DFE1E6 !important;
-        margin: 2rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+PERFIL_ETAPAS.nueva_ejecucion()
+with PERFIL_ETAPAS.etapa('estilos'):
+    st.markdown(etiqueta_estilos(), unsafe_allow_html=True)
 
 # ============================================================================
-# FUNCIONES AUXILIARES
+# PÁGINAS
 # ============================================================================
 
-# Configuration Constants for Sustainability Scoring System
-# These ranges are based on the dataset of 42 food products
-
-INDICATOR_RANGES: Dict[str, Tuple[float, float]] = {
-    'CF': (0.28, 60.0),      # Carbon Footprint: Min: Guayaba (0.28), Max: Res (60.0)
-    'WF': (131, 18900),      # Water Footprint: Min: Zanahoria (131), Max: Café (18,900)
-    'LU': (0.18, 326),       # Land Use: Min: Papaya (0.18), Max: Res (326)
-    'Origin': (0, 100),      # Origin Score: Local (0) to Imported (100)
-    'Waste': (0.4, 45.5),    # Waste Percentage: Min: Sandía (0.4), Max: Uva (45.5)
-    'NOVA': (1, 4)           # Processing Level: Unprocessed (1) to Ultra-processed (4)
-}
-
-# Weight configurations for different scenarios
-# Scenario A: Original Mexico methodology (Waste weight: 25%)
-SCENARIO_A_WEIGHTS: Dict[str, float] = {
-    'CF': 0.15,      # Carbon footprint
-    'WF': 0.15,      # Water footprint
-    'LU': 0.10,      # Land use
-    'Origin': 0.20,  # Origin
-    'Waste': 0.25,   # Waste percentage
-    'NOVA': 0.15     # Processing level
-}
-
-# Scenario B: Adjusted Mexico methodology (Waste weight: 30%)
-SCENARIO_B_WEIGHTS: Dict[str, float] = {
-    'CF': 0.14,      # Carbon footprint
-    'WF': 0.14,      # Water footprint
-    'LU': 0.09,      # Land use
-    'Origin': 0.18,  # Origin
-    'Waste': 0.30,   # Waste percentage (increased emphasis)
-    'NOVA': 0.15     # Processing level
-}
-
-# Scenario configuration mapping
-SCENARIOS: Dict[str, Dict[str, float]] = {
-    'A': SCENARIO_A_WEIGHTS,
-    'B': SCENARIO_B_WEIGHTS
-}
-
-@st.cache_data
-def cargar_datos():
-    """Carga el dataset de productos con scores de ambos escenarios"""
-    try:
-        rutas = [
-            'dataset_con_scores_A_y_B.csv',
-            '/mnt/user-data/outputs/dataset_con_scores_A_y_B.csv',
-            '/home/claude/dataset_con_scores_A_y_B.csv',
-            '/mnt/project/dataset_con_scores_A_y_B.csv'
-        ]
-
-        for ruta in rutas:
-            try:
-                df = pd.read_csv(ruta)
-                return df
-            except Exception:
-                continue
-
-        st.error("⚠️ No se pudo cargar el dataset. Asegúrate de tener el archivo CSV.")
-        return None
-    except Exception as e:
-        st.error(f"Error al cargar datos: {e}")
-        return None
-
-@st.cache_data
-def cargar_productos_robustos():
-    """Carga la lista de productos más sustentables"""
-    try:
-        rutas = [
-            'productos_robustos_consenso.csv',
-            '/mnt/user-data/outputs/productos_robustos_consenso.csv',
-            '/home/claude/productos_robustos_consenso.csv',
-            '/mnt/project/productos_robustos_consenso.csv'
-        ]
-        
-        for ruta in rutas:
-            try:
-                df = pd.read_csv(ruta)
-                return df
-            except Exception:
-                continue
-
-        return None
-    except Exception:
-        return None
-
-def normalizar_inverso(valor: float, min_val: float, max_val: float) -> float:
-    """
-    Normalize values where lower is better, using inverse scaling (0-100).
-
-    This function converts raw indicator values to a 0-100 scale where:
-    - 100 = best (lowest raw value)
-    - 0 = worst (highest raw value)
-
-    Args:
-        valor: The raw value to normalize
-        min_val: Minimum value in the range (best case)
-        max_val: Maximum value in the range (worst case)
-
-    Returns:
-        Normalized score on 0-100 scale (higher is better)
-
-    Example:
-        >>> normalizar_inverso(5.0, 0.0, 10.0)  # Value halfway between min and max
-        50.0
-    """
-    if max_val == min_val:
-        return 50.0
-    return 100.0 - ((valor - min_val) / (max_val - min_val) * 100.0)
-
-def calcular_score_producto(
-    cf: float,
-    wf: float,
-    lu: float,
-    origin: float,
-    waste: float,
-    nova: int,
-    escenario: str = 'A'
-) -> Tuple[float, Dict[str, float]]:
-    """
-    Calculate the sustainability score of a food product using a multi-criteria approach.
-
-    This function evaluates food sustainability across 6 environmental indicators:
-    - Carbon Footprint (CF): kg CO₂ emissions per kg of product
-    - Water Footprint (WF): Liters of water per kg of product
-    - Land Use (LU): Square meters of land per kg of product
-    - Origin: Origin score (0=Local, 50=Regional, 100=Imported)
-    - Waste: Waste percentage from farm to table
-    - NOVA: Processing level (1=Unprocessed to 4=Ultra-processed)
-
-    Each indicator is normalized to a 0-100 scale (where higher = more sustainable)
-    and weighted according to the selected scenario methodology.
-
-    Args:
-        cf: Carbon footprint in kg CO₂ equivalents per kg of product
-        wf: Water footprint in liters per kg of product
-        lu: Land use in square meters per kg of product
-        origin: Origin score (0=Local Sonora, 50=Regional Mexico, 100=Imported)
-        waste: Waste percentage (0-100)
-        nova: NOVA processing level (1=Natural, 2=Processed, 3=Highly processed, 4=Ultra-processed)
-        escenario: Scenario methodology ('A' for original weights, 'B' for adjusted weights)
-
-    Returns:
-        Tuple containing:
-        - score: Overall sustainability score (0-100, where higher is more sustainable)
-        - normalized_values: Dictionary with normalized scores for each indicator
-
-    Raises:
-        KeyError: If an invalid scenario is provided
-
-    Example:
-        >>> score, details = calcular_score_producto(
-        ...     cf=2.0, wf=500, lu=1.5, origin=0, waste=10.0, nova=1, escenario='A'
-        ... )
-        >>> print(f"Sustainability Score: {score:.2f}")
-        Sustainability Score: 85.30
-    """
-    # Validate scenario
-    if escenario not in SCENARIOS:
-        raise ValueError(f"Invalid scenario: {escenario}. Must be 'A' or 'B'.")
-
-    # Normalize each indicator using the global ranges
-    # Lower raw values are better, so we use inverse normalization (100 - normalized)
-    normalized_values = {
-        'CF': normalizar_inverso(cf, *INDICATOR_RANGES['CF']),
-        'WF': normalizar_inverso(wf, *INDICATOR_RANGES['WF']),
-        'LU': normalizar_inverso(lu, *INDICATOR_RANGES['LU']),
-        'Origin': normalizar_inverso(origin, *INDICATOR_RANGES['Origin']),
-        'Waste': normalizar_inverso(waste, *INDICATOR_RANGES['Waste']),
-        'NOVA': normalizar_inverso(nova, *INDICATOR_RANGES['NOVA'])
-    }
-
-    # Get the weight configuration for the selected scenario
-    weights = SCENARIOS[escenario]
-
-    # Calculate weighted score
-    score = sum(
-        normalized_values[indicator] * weights[indicator]
-        for indicator in weights.keys()
-    )
-
-    return score, normalized_values
-
-def clasificar_score(score: float) -> Tuple[str, str]:
-    """
-    Classify a sustainability score into categorical ratings.
-
-    Args:
-        score: Sustainability score (0-100)
-
-    Returns:
-        Tuple of (classification_label, emoji_indicator):
-        - 'Excelente' (🟢): score >= 90
-        - 'Muy Bueno' (🟢): score >= 80
-        - 'Bueno' (🟡): score >= 70
-        - 'Moderado' (🟠): score >= 60
-        - 'Bajo' (🔴): score < 60
-
-    Example:
-        >>> clasificar_score(85.5)
-        ('Muy Bueno', '🟢')
-    """
-    if score >= 90:
-        return 'Excelente', '🟢'
-    elif score >= 80:
-        return 'Muy Bueno', '🟢'
-    elif score >= 70:
-        return 'Bueno', '🟡'
-    elif score >= 60:
-        return 'Moderado', '🟠'
-    else:
-        return 'Bajo', '🔴'
-
-def exportar_resultados_excel(df, escenario='A'):
-    """Exporta resultados a Excel"""
-    output = BytesIO()
-    
-    score_col = 'Score_México' if escenario == 'A' else 'Score_México_B'
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Hoja 1: Ranking completo
-        df_export = df[['Producto', 'CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg',
-                       'Origin_Score', 'Waste_pct', 'NOVA', score_col]].copy()
-        df_export = df_export.sort_values(score_col, ascending=False)
-        df_export.to_excel(writer, sheet_name='Ranking_Completo', index=False)
-        
-        # Hoja 2: Top 15
-        top15 = df.nlargest(15, score_col)[['Producto', score_col]]
-        top15.to_excel(writer, sheet_name='Top_15', index=False)
-        
-        # Hoja 3: Bottom 10
-        bottom10 = df.nsmallest(10, score_col)[['Producto', score_col]]
-        bottom10.to_excel(writer, sheet_name='Menos_Sostenibles', index=False)
-    
-    output.seek(0)
-    return output
+# (script, title, icon); each script only imports what its page uses
+PAGINAS = [
+    ('paginas/inicio.py', "Inicio", "🏠"),
+    ('paginas/consultar_producto.py', "Consultar Producto", "🔍"),
+    ('paginas/evaluar_producto.py', "Evaluar Nuevo Producto", "➕"),
+    ('paginas/comparar_productos.py', "Comparar Productos", "🆚"),
+    ('paginas/evaluar_canasta.py', "Evaluar Canasta", "🧺"),
+    ('paginas/mas_sustentables.py', "Los Más Sustentables", "⭐"),
+    ('paginas/frente_pareto.py', "Frente de Pareto", "🧭"),
+    ('paginas/rankings.py', "Ver Rankings", "📊"),
+    ('paginas/acerca_de.py', "Acerca de", "ℹ️")
+]
 
 # ============================================================================
 # INTERFAZ PRINCIPAL
@@ -432,25 +72,17 @@ def exportar_resultados_excel(df, escenario='A'):
 
 def main():
     
+    # SIDEBAR - NAVEGACIÓN
+    navegacion = st.navigation(
+        [st.Page(script, title=titulo, icon=icono) for script, titulo, icono in PAGINAS]
+    )
+    
     # TÍTULO Y SUBTÍTULO PRINCIPAL
     st.title("¿Qué tan sustentable es tu comida?")
     st.markdown('<p class="subtitle-main">Tu impacto alimentario, en números claros</p>', 
                 unsafe_allow_html=True)
     st.markdown("---")
     
-    # SIDEBAR - NAVEGACIÓN
-    st.sidebar.title("Navegación")
-    pagina = st.sidebar.radio(
-        "Selecciona una función:",
-        ["🏠 Inicio",
-         "🔍 Consultar Producto",
-         "➕ Evaluar Nuevo Producto",
-         "🆚 Comparar Productos",
-         "⭐ Los Más Sustentables",
-         "📊 Ver Rankings",
-         "ℹ️ Acerca de"]
-    )
-    
     # SIDEBAR - Selector de Escenario Global
     st.sidebar.markdown("---")
     st.sidebar.markdown("### ⚙️ Configuración")
@@ -473,954 +105,57 @@ def main():
     escenario = 'A' if 'Escenario A' in escenario_global else 'B'
     
     # Cargar datos
-    df = cargar_datos()
-    df_robustos = cargar_productos_robustos()
+    with PERFIL_ETAPAS.etapa('cargar_datos'):
+        datos = cargar_datos()
     
-    if df is None:
+    if datos is None:
         st.error("No se pudieron cargar los datos. Verifica que el archivo CSV esté disponible.")
         return
     
-    score_col = 'Score_México' if escenario == 'A' else 'Score_México_B'
-    
-    # ========================================================================
-    # PÁGINA: INICIO
-    # ========================================================================
-    if pagina == "🏠 Inicio":
-        
-        # Explicación de qué hace la calculadora
-        st.markdown("""
-        <div class="info-box">
-        <h3 style="margin-top:0;">¿Qué hace esta calculadora?</h3>
-        <p style="margin-bottom:0.5rem;">Esta herramienta te ayuda a entender y comparar el impacto ambiental de <strong>42 alimentos</strong> comunes en México. Puedes:</p>
-        <ul style="margin-bottom:0;">
-            <li><strong>Consultar cualquier producto</strong> y ver su impacto detallado</li>
-            <li><strong>Evaluar un alimento nuevo</strong> ingresando sus datos ambientales</li>
-            <li><strong>Comparar hasta 5 productos</strong> lado a lado</li>
-            <li><strong>Ver rankings</strong> de los mejores y peores según diferentes criterios</li>
-        </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("##")
-        
-        # Explicación de indicadores
-        st.subheader("Los 6 indicadores que medimos")
-        st.markdown("Evaluamos cada alimento con estos criterios ambientales:")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">🌡️ Huella de Carbono (Clima)</div>
-                <div class="indicator-desc">Kilogramos de CO₂ emitidos para producir 1 kg de este alimento</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">💧 Huella Hídrica (Agua)</div>
-                <div class="indicator-desc">Litros de agua necesarios para producir 1 kg de este alimento</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">🌱 Uso de Suelo (Tierra)</div>
-                <div class="indicator-desc">Metros cuadrados de tierra que se ocuparon para producir 1 kg de este alimento</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">🇲🇽 Origen</div>
-                <div class="indicator-desc">¿Se produce en México o se importa de otro país?</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">🗑️ Desperdicio</div>
-                <div class="indicator-desc">Qué porcentaje se desperdicia en el camino del campo a tu mesa</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="indicator-box">
-                <div class="indicator-title">🔬 Procesamiento (NOVA)</div>
-                <div class="indicator-desc">Qué tan transformado está: natural, procesado o ultra-procesado</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("##")
-        
-        # Estadísticas rápidas
-        st.subheader("Un vistazo a los datos")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Productos evaluados", len(df))
-        
-        with col2:
-            mejor = df.nlargest(1, score_col)['Producto'].values[0]
-            st.metric("Más sustentable", mejor)
-        
-        with col3:
-            peor = df.nsmallest(1, score_col)['Producto'].values[0]
-            st.metric("Menos sustentable", peor)
-        
-        with col4:
-            promedio = df[score_col].mean()
-            st.metric("Score promedio", f"{promedio:.1f}")
-        
-        st.markdown("##")
-        st.info("👈 Usa el menú de la izquierda para explorar las diferentes funciones")
-    
-    # ========================================================================
-    # PÁGINA: CONSULTAR PRODUCTO
-    # ========================================================================
-    elif pagina == "🔍 Consultar Producto":
-        st.header("🔍 Consultar Producto")
-        st.markdown("Selecciona un alimento para ver su evaluación completa")
-        st.markdown("##")
-        
-        producto_sel = st.selectbox(
-            "Selecciona un producto:",
-            options=sorted(df['Producto'].unique()),
-            index=None,
-            placeholder="Elige un producto de la lista..."
-        )
-        
-        if producto_sel:
-            prod_data = df[df['Producto'] == producto_sel].iloc[0]
-            
-            st.markdown("---")
-            
-            # Score principal
-            col1, col2, col3 = st.columns([2, 1, 1])
-            
-            with col1:
-                st.subheader(f"📋 {producto_sel}")
-                clasificacion, emoji = clasificar_score(prod_data[score_col])
-                st.markdown(f"**Clasificación:** {clasificacion} {emoji}")
-            
-            with col2:
-                st.metric("Score", f"{prod_data[score_col]:.1f}")
-            
-            with col3:
-                ranking = (df[score_col] >= prod_data[score_col]).sum()
-                st.metric("Posición", f"#{ranking}")
-            
-            st.markdown("##")
-            
-            # Indicadores detallados
-            st.subheader("📊 Indicadores Ambientales")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric(
-                    "🌡️ Huella de Carbono",
-                    f"{prod_data['CF_kgCO2eq_kg']:.2f} kg CO₂"
-                )
-                st.metric(
-                    "💧 Huella Hídrica",
-                    f"{prod_data['WF_L_kg']:,.0f} L"
-                )
-            
-            with col2:
-                st.metric(
-                    "🌱 Uso de Suelo",
-                    f"{prod_data['LU_m2_kg']:.2f} m²"
-                )
-                origen_texto = {0: "Local (Sonora)", 50: "Regional (México)", 100: "Importado"}
-                st.metric(
-                    "🇲🇽 Origen",
-                    origen_texto.get(prod_data['Origin_Score'], "N/D")
-                )
-            
-            with col3:
-                st.metric(
-                    "🗑️ Desperdicio",
-                    f"{prod_data['Waste_pct']:.1f}%"
-                )
-                nova_texto = {1: "Natural", 2: "Procesado", 3: "Muy procesado", 4: "Ultra-procesado"}
-                st.metric(
-                    "🔬 Nivel NOVA",
-                    nova_texto.get(int(prod_data['NOVA']), "N/D")
-                )
-            
-            st.markdown("##")
-            
-            # Gráfico de radar
-            st.subheader("🎯 Perfil de Sustentabilidad")
-            
-            # Calcular scores normalizados
-            _, scores_norm = calcular_score_producto(
-                prod_data['CF_kgCO2eq_kg'],
-                prod_data['WF_L_kg'],
-                prod_data['LU_m2_kg'],
-                prod_data['Origin_Score'],
-                prod_data['Waste_pct'],
-                prod_data['NOVA'],
-                escenario
-            )
-            
-            categorias = ['Carbono', 'Agua', 'Suelo', 'Origen', 'Desperdicio', 'Procesamiento']
-            valores = [scores_norm['CF'], scores_norm['WF'], scores_norm['LU'],
-                      scores_norm['Origin'], scores_norm['Waste'], scores_norm['NOVA']]
-            
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatterpolar(
-                r=valores,
-                theta=categorias,
-                fill='toself',
-                name=producto_sel,
-                line_color='#2ecc71'
-            ))
-            
-            fig.update_layout(
-                polar=dict(
-                    radialaxis=dict(visible=True, range=[0, 100])
-                ),
-                showlegend=False,
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-    
-    # ========================================================================
-    # PÁGINA: EVALUAR NUEVO PRODUCTO
-    # ========================================================================
-    elif pagina == "➕ Evaluar Nuevo Producto":
-        st.header("➕ Evaluar Nuevo Producto")
-        st.markdown("Ingresa los datos de un alimento que no está en nuestra base de datos")
-        st.markdown("##")
-        
-        nombre_nuevo = st.text_input(
-            "Nombre del producto:",
-            placeholder="Ejemplo: Quinoa, Pescado blanco, Kiwi..."
-        )
-        
-        st.markdown("### 📊 Ingresa los indicadores ambientales")
-        st.markdown("*Si no conoces algún valor exacto, puedes usar estimaciones basadas en productos similares*")
-        st.markdown("##")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**🌡️ Huella de Carbono (Clima)**")
-            st.caption("Kilogramos de CO₂ emitidos para producir 1 kg de este alimento")
-            cf = st.number_input(
-                "kg CO₂ / kg producto",
-                min_value=0.0,
-                max_value=100.0,
-                value=2.0,
-                step=0.1,
-                label_visibility="collapsed"
-            )
-            st.caption("📝 Ejemplo: Guayaba = 0.28, Pollo = 6.9, Res = 60")
-            
-            st.markdown("##")
-            
-            st.markdown("**💧 Huella Hídrica (Agua)**")
-            st.caption("Litros de agua necesarios para producir 1 kg de este alimento")
-            wf = st.number_input(
-                "Litros / kg producto",
-                min_value=0,
-                max_value=50000,
-                value=1000,
-                step=50,
-                label_visibility="collapsed"
-            )
-            st.caption("📝 Ejemplo: Zanahoria = 131, Manzana = 822, Café = 18,900")
-            
-            st.markdown("##")
-            
-            st.markdown("**🌱 Uso de Suelo (Tierra)**")
-            st.caption("Metros cuadrados de tierra que se ocuparon para producir 1 kg")
-            lu = st.number_input(
-                "m² / kg producto",
-                min_value=0.0,
-                max_value=500.0,
-                value=5.0,
-                step=0.5,
-                label_visibility="collapsed"
-            )
-            st.caption("📝 Ejemplo: Papaya = 0.18, Pollo = 7.1, Res = 326")
-        
-        with col2:
-            st.markdown("**🇲🇽 Origen**")
-            st.caption("¿Se produce en México o se importa de otro país?")
-            origin = st.selectbox(
-                "Origen del producto",
-                options=[0, 50, 100],
-                format_func=lambda x: "Local (Sonora)" if x == 0 else 
-                                     "Regional (México)" if x == 50 else "Importado",
-                label_visibility="collapsed"
-            )
-            
-            st.markdown("##")
-            
-            st.markdown("**🗑️ Desperdicio**")
-            st.caption("Qué porcentaje se desperdicia en el camino del campo a tu mesa")
-            waste = st.number_input(
-                "Porcentaje (%)",
-                min_value=0.0,
-                max_value=100.0,
-                value=10.0,
-                step=1.0,
-                label_visibility="collapsed"
-            )
-            st.caption("📝 Ejemplo: Sandía = 0.4%, Uva = 45.5%, Promedio = 15%")
-            
-            st.markdown("##")
-            
-            st.markdown("**🔬 Procesamiento (NOVA)**")
-            st.caption("Qué tan transformado está: natural, procesado o ultra-procesado")
-            nova = st.selectbox(
-                "Nivel NOVA",
-                options=[1, 2, 3, 4],
-                format_func=lambda x: f"{x} - {'Natural' if x == 1 else 'Procesado' if x == 2 else 'Muy procesado' if x == 3 else 'Ultra-procesado'}",
-                label_visibility="collapsed"
-            )
-        
-        st.markdown("##")
-        
-        if st.button("🔍 Calcular Score de Sustentabilidad", type="primary"):
-            if not nombre_nuevo:
-                st.warning("⚠️ Por favor ingresa un nombre para el producto")
-            else:
-                st.markdown("---")
-                
-                # Calcular scores
-                score_a, _ = calcular_score_producto(cf, wf, lu, origin, waste, nova, 'A')
-                score_b, _ = calcular_score_producto(cf, wf, lu, origin, waste, nova, 'B')
-                
-                score_actual = score_a if escenario == 'A' else score_b
-                clasificacion, emoji = clasificar_score(score_actual)
-                
-                # Resultados
-                st.success(f"✅ Evaluación completada para: **{nombre_nuevo}**")
-                st.markdown("##")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Score de Sustentabilidad", f"{score_actual:.1f}")
-                
-                with col2:
-                    st.metric("Clasificación", f"{clasificacion} {emoji}")
-                
-                with col3:
-                    # Comparar con promedio
-                    promedio = df[score_col].mean()
-                    diferencia = score_actual - promedio
-                    st.metric("vs. Promedio", f"{diferencia:+.1f}", 
-                             delta_color="normal" if diferencia > 0 else "inverse")
-                
-                st.markdown("##")
-                
-                # Comparación con productos existentes
-                st.subheader("📊 Comparación con productos similares")
-                
-                # Encontrar los 5 productos más cercanos en score
-                df_temp = df.copy()
-                df_temp['diferencia'] = abs(df_temp[score_col] - score_actual)
-                similares = df_temp.nsmallest(5, 'diferencia')
-                
-                fig = go.Figure()
-                
-                # Agregar productos similares
-                fig.add_trace(go.Bar(
-                    x=similares['Producto'],
-                    y=similares[score_col],
-                    name='Productos existentes',
-                    marker_color='lightblue'
-                ))
-                
-                # Agregar el nuevo producto
-                fig.add_trace(go.Bar(
-                    x=[nombre_nuevo],
-                    y=[score_actual],
-                    name='Tu producto',
-                    marker_color='#2ecc71'
-                ))
-                
-                fig.update_layout(
-                    title="Comparación de Scores",
-                    xaxis_title="Producto",
-                    yaxis_title="Score de Sustentabilidad",
-                    showlegend=True,
-                    height=400
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
-    
-    # ========================================================================
-    # PÁGINA: COMPARAR PRODUCTOS
-    # ========================================================================
-    elif pagina == "🆚 Comparar Productos":
-        st.header("🆚 Comparar Productos")
-        st.markdown("Selecciona hasta 5 productos para compararlos lado a lado")
-        st.markdown("##")
-        
-        productos_comparar = st.multiselect(
-            "Selecciona productos:",
-            options=sorted(df['Producto'].unique()),
-            max_selections=5,
-            placeholder="Elige hasta 5 productos para comparar..."
-        )
-        
-        if len(productos_comparar) >= 2:
-            df_comp = df[df['Producto'].isin(productos_comparar)]
-            
-            st.markdown("---")
-            st.subheader("📊 Comparación de Scores")
-            
-            # Gráfico de barras
-            fig = px.bar(
-                df_comp,
-                x='Producto',
-                y=score_col,
-                color=score_col,
-                color_continuous_scale='RdYlGn',
-                text=score_col
-            )
-            
-            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-            fig.update_layout(
-                xaxis_title="",
-                yaxis_title="Score de Sustentabilidad",
-                showlegend=False,
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("##")
-            
-            # Tabla comparativa
-            st.subheader("📋 Detalle de Indicadores")
-            
-            columnas_mostrar = ['Producto', 'CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg',
-                               'Origin_Score', 'Waste_pct', 'NOVA', score_col]
-            
-            df_tabla = df_comp[columnas_mostrar].copy()
-            df_tabla = df_tabla.rename(columns={
-                'CF_kgCO2eq_kg': 'Carbono (kg CO₂)',
-                'WF_L_kg': 'Agua (L)',
-                'LU_m2_kg': 'Suelo (m²)',
-                'Origin_Score': 'Origen',
-                'Waste_pct': 'Desperdicio (%)',
-                'NOVA': 'NOVA',
-                score_col: 'Score'
-            })
-            
-            # Formatear valores
-            df_tabla['Carbono (kg CO₂)'] = df_tabla['Carbono (kg CO₂)'].round(2)
-            df_tabla['Agua (L)'] = df_tabla['Agua (L)'].apply(lambda x: f"{x:,.0f}")
-            df_tabla['Suelo (m²)'] = df_tabla['Suelo (m²)'].round(2)
-            df_tabla['Desperdicio (%)'] = df_tabla['Desperdicio (%)'].round(1)
-            df_tabla['Score'] = df_tabla['Score'].round(1)
-            
-            # Aplicar formato de origen
-            df_tabla['Origen'] = df_tabla['Origen'].apply(
-                lambda x: 'Local' if x == 0 else 'Regional' if x == 50 else 'Importado'
-            )
-            
-            st.dataframe(df_tabla, use_container_width=True, hide_index=True)
-            
-            st.markdown("##")
-            
-            # Gráfico de radar comparativo
-            st.subheader("🎯 Perfiles de Sustentabilidad")
-            
-            fig = go.Figure()
-            
-            categorias = ['Carbono', 'Agua', 'Suelo', 'Origen', 'Desperdicio', 'Procesamiento']
-            
-            colores = ['#2ecc71', '#3498db', '#e74c3c', '#f39c12', '#9b59b6']
-            
-            for idx, producto in enumerate(productos_comparar):
-                prod_data = df[df['Producto'] == producto].iloc[0]
-                
-                _, scores_norm = calcular_score_producto(
-                    prod_data['CF_kgCO2eq_kg'],
-                    prod_data['WF_L_kg'],
-                    prod_data['LU_m2_kg'],
-                    prod_data['Origin_Score'],
-                    prod_data['Waste_pct'],
-                    prod_data['NOVA'],
-                    escenario
-                )
-                
-                valores = [scores_norm['CF'], scores_norm['WF'], scores_norm['LU'],
-                          scores_norm['Origin'], scores_norm['Waste'], scores_norm['NOVA']]
-                
-                fig.add_trace(go.Scatterpolar(
-                    r=valores,
-                    theta=categorias,
-                    fill='toself',
-                    name=producto,
-                    line_color=colores[idx % len(colores)]
-                ))
-            
-            fig.update_layout(
-                polar=dict(
-                    radialaxis=dict(visible=True, range=[0, 100])
-                ),
-                showlegend=True,
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-        
-        elif len(productos_comparar) == 1:
-            st.info("👆 Selecciona al menos 2 productos para compararlos")
-        else:
-            st.info("👆 Selecciona productos del menú de arriba para comenzar la comparación")
-    
-    # ========================================================================
-    # PÁGINA: LOS MÁS SUSTENTABLES
-    # ========================================================================
-    elif pagina == "⭐ Los Más Sustentables":
-        st.header("⭐ Los Más Sustentables")
-        
-        # Identificar productos robustos dinámicamente
-        top10_a = set(df.nlargest(10, 'Score_México')['Producto'])
-        top10_b = set(df.nlargest(10, 'Score_México_B')['Producto'])
-        productos_robustos_lista = list(top10_a & top10_b)
-        
-        if len(productos_robustos_lista) > 0:
-            
-            # Explicación clara
-            st.markdown(f"""
-            <div class="info-box">
-            <p style="margin:0;"><strong>Estos {len(productos_robustos_lista)} alimentos tienen el mejor impacto ambiental en todas las metodologías.</strong></p>
-            <p style="margin:0.5rem 0 0 0;">Consideran huella de carbono, agua, tierra, origen mexicano, desperdicio y nivel de procesamiento. 
-            Sin importar qué metodología uses, estos productos siempre están en el top 10.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("##")
-            
-            # Lista de productos con sus scores
-            st.subheader(f"🏆 Los {len(productos_robustos_lista)} Campeones")
-            
-            # Obtener datos de los productos robustos
-            df_top = df[df['Producto'].isin(productos_robustos_lista)].copy()
-            df_top = df_top.sort_values(score_col, ascending=False)
-            
-            # Crear cards para cada producto
-            for idx, row in df_top.iterrows():
-                col1, col2, col3 = st.columns([3, 1, 1])
-                
-                with col1:
-                    st.markdown(f"### {row['Producto']}")
-                
-                with col2:
-                    clasificacion, emoji = clasificar_score(row[score_col])
-                    st.markdown(f"**{clasificacion}** {emoji}")
-                
-                with col3:
-                    st.metric("Score", f"{row[score_col]:.1f}")
-                
-                # Mini resumen de indicadores
-                with st.expander("Ver detalles"):
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("🌡️ Carbono", f"{row['CF_kgCO2eq_kg']:.2f} kg")
-                        st.metric("💧 Agua", f"{row['WF_L_kg']:,.0f} L")
-                    
-                    with col2:
-                        st.metric("🌱 Suelo", f"{row['LU_m2_kg']:.2f} m²")
-                        origen_texto = {0: "Local", 50: "Regional", 100: "Importado"}
-                        st.metric("🇲🇽 Origen", origen_texto.get(row['Origin_Score'], "N/D"))
-                    
-                    with col3:
-                        st.metric("🗑️ Desperdicio", f"{row['Waste_pct']:.1f}%")
-                        nova_texto = {1: "Natural", 2: "Procesado", 3: "Muy procesado", 4: "Ultra-procesado"}
-                        st.metric("🔬 NOVA", nova_texto.get(int(row['NOVA']), "N/D"))
-                
-                st.markdown("---")
-            
-            st.markdown("##")
-            
-            # Visualización
-            st.subheader("📊 Comparación Visual")
-            
-            fig = px.bar(
-                df_top,
-                x='Producto',
-                y=score_col,
-                color=score_col,
-                color_continuous_scale='Greens',
-                text=score_col
-            )
-            
-            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-            fig.update_layout(
-                xaxis_title="",
-                yaxis_title="Score de Sustentabilidad",
-                showlegend=False,
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-        else:
-            st.warning("⚠️ No se encontraron productos robustos en común entre ambos escenarios.")
-    
-    # ========================================================================
-    # PÁGINA: VER RANKINGS
-    # ========================================================================
-    elif pagina == "📊 Ver Rankings":
-        st.header("📊 Rankings de Sustentabilidad")
-        st.markdown("Explora los rankings de productos según diferentes criterios")
-        st.markdown("##")
-        
-        # Selector de tipo de ranking
-        tipo_ranking = st.radio(
-            "Selecciona el tipo de ranking:",
-            ["🏆 Top 15 - Más Sustentables",
-             "⚠️ Bottom 10 - Menos Sustentables",
-             "🔥 Ranking Completo"]
-        )
-        
-        st.markdown("---")
-        
-        if "Top 15" in tipo_ranking:
-            st.subheader("🏆 Top 15 - Los Más Sustentables")
-            
-            top15 = df.nlargest(15, score_col)[['Producto', score_col, 'CF_kgCO2eq_kg', 
-                                                  'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
-            top15['Posición'] = range(1, 16)
-            top15 = top15[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
-                          'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
-            
-            # Renombrar columnas
-            top15.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
-            
-            # Formatear
-            top15['Score'] = top15['Score'].round(1)
-            top15['Carbono'] = top15['Carbono'].round(2)
-            top15['Agua (L)'] = top15['Agua (L)'].apply(lambda x: f"{x:,.0f}")
-            top15['Suelo (m²)'] = top15['Suelo (m²)'].round(2)
-            top15['Desperdicio (%)'] = top15['Desperdicio (%)'].round(1)
-            
-            st.dataframe(top15, use_container_width=True, hide_index=True)
-            
-            # Gráfico
-            fig = px.bar(
-                top15,
-                x='Producto',
-                y='Score',
-                color='Score',
-                color_continuous_scale='Greens',
-                text='Score'
-            )
-            
-            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-            fig.update_layout(
-                xaxis_title="",
-                yaxis_title="Score de Sustentabilidad",
-                showlegend=False,
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-        elif "Bottom 10" in tipo_ranking:
-            st.subheader("⚠️ Bottom 10 - Los Menos Sustentables")
-            
-            bottom10 = df.nsmallest(10, score_col)[['Producto', score_col, 'CF_kgCO2eq_kg', 
-                                                     'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
-            bottom10['Posición'] = range(len(df), len(df)-10, -1)
-            bottom10 = bottom10[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
-                                'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
-            
-            # Renombrar columnas
-            bottom10.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
-            
-            # Formatear
-            bottom10['Score'] = bottom10['Score'].round(1)
-            bottom10['Carbono'] = bottom10['Carbono'].round(2)
-            bottom10['Agua (L)'] = bottom10['Agua (L)'].apply(lambda x: f"{x:,.0f}")
-            bottom10['Suelo (m²)'] = bottom10['Suelo (m²)'].round(2)
-            bottom10['Desperdicio (%)'] = bottom10['Desperdicio (%)'].round(1)
-            
-            st.dataframe(bottom10, use_container_width=True, hide_index=True)
-            
-            # Gráfico
-            fig = px.bar(
-                bottom10,
-                x='Producto',
-                y='Score',
-                color='Score',
-                color_continuous_scale='Reds',
-                text='Score'
-            )
-            
-            fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-            fig.update_layout(
-                xaxis_title="",
-                yaxis_title="Score de Sustentabilidad",
-                showlegend=False,
-                height=500
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-        else:  # Ranking completo
-            st.subheader("🔥 Ranking Completo - Todos los Productos")
-            
-            ranking_completo = df[['Producto', score_col, 'CF_kgCO2eq_kg', 
-                                   'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
-            ranking_completo = ranking_completo.sort_values(score_col, ascending=False)
-            ranking_completo['Posición'] = range(1, len(ranking_completo) + 1)
-            ranking_completo = ranking_completo[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
-                                                'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
-            
-            # Renombrar columnas
-            ranking_completo.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
-            
-            # Formatear
-            ranking_completo['Score'] = ranking_completo['Score'].round(1)
-            ranking_completo['Carbono'] = ranking_completo['Carbono'].round(2)
-            ranking_completo['Agua (L)'] = ranking_completo['Agua (L)'].apply(lambda x: f"{x:,.0f}")
-            ranking_completo['Suelo (m²)'] = ranking_completo['Suelo (m²)'].round(2)
-            ranking_completo['Desperdicio (%)'] = ranking_completo['Desperdicio (%)'].round(1)
-            
-            st.dataframe(ranking_completo, use_container_width=True, hide_index=True, height=600)
-        
-        st.markdown("##")
-        
-        # Botón de descarga
-        st.subheader("💾 Exportar Datos")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            excel_data = exportar_resultados_excel(df, escenario)
-            st.download_button(
-                label="📥 Descargar en Excel",
-                data=excel_data,
-                file_name=f"ranking_sustentabilidad_{escenario}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        with col2:
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Descargar en CSV",
-                data=csv,
-                file_name=f"datos_completos_{escenario}.csv",
-                mime="text/csv"
-            )
-    
-    # ========================================================================
-    # PÁGINA: ACERCA DE
-    # ========================================================================
-    elif pagina == "ℹ️ Acerca de":
-        st.header("ℹ️ Acerca de esta Calculadora")
-        
-        st.markdown("""
-        ## 📊 Ecuación de Sustentabilidad Alimentaria
-        
-        **Proyecto:** Evaluación multi-dimensional de sostenibilidad alimentaria  
-        **Investigadora:** Laura Ochoa M.  
-        **LinkedIn:** [linkedin.com/in/lauraochoam](https://www.linkedin.com/in/lauraochoam/)  
-        **Región:** México / Sonora  
-        **Fecha:** Enero 2026  
-        **Versión:** 3.0 (42 productos)
-        
-        ---
-        
-        ### 🎯 Objetivo del Proyecto
-        
-        Desarrollar una herramienta científica que permite evaluar y comparar el impacto 
-        ambiental de alimentos, con el fin de:
-        
-        - Generar recomendaciones dietéticas basadas en evidencia
-        - Cuantificar el impacto ambiental de decisiones alimentarias
-        - Informar políticas públicas de sostenibilidad alimentaria en Sonora
-        - Facilitar decisiones de consumo consciente
-        
-        ---
-        
-        ### 📐 Metodología
-        
-        Esta calculadora evalúa **42 productos alimenticios** usando **6 indicadores ambientales:**
-        
-        **1. Huella de Carbono (kg CO₂eq/kg)**
-        - Mide las emisiones de gases de efecto invernadero
-        - Incluye producción, transporte y procesamiento
-        - Rango: 0.28 (Guayaba) - 60.0 (Res) kg CO₂eq/kg
-        
-        **2. Huella Hídrica (L/kg)**
-        - Consumo total de agua dulce (azul, verde, gris)
-        - Considera toda la cadena de producción
-        - Rango: 131 (Zanahoria) - 18,900 (Café) L/kg
-        
-        **3. Uso de Suelo (m²/kg)**
-        - Área de tierra requerida para producción
-        - Incluye pastoreo, cultivos y procesamiento
-        - Rango: 0.18 (Papaya) - 326 (Res) m²/kg
-        
-        **4. Origen (Local/Regional/Importado)**
-        - Distancia desde el lugar de producción
-        - Prioriza productos mexicanos y sonorenses
-        
-        **5. Desperdicio (%)**
-        - Porcentaje de pérdida y desperdicio alimentario
-        - Del campo al consumidor (datos específicos de México cuando disponibles)
-        - Rango: 0.4% (Sandía) - 45.5% (Uva)
-        
-        **6. Procesamiento (Clasificación NOVA)**
-        - Nivel 1: Alimentos naturales o mínimamente procesados
-        - Nivel 2: Ingredientes culinarios procesados
-        - Nivel 3: Alimentos procesados
-        - Nivel 4: Productos ultra-procesados
-        
-        ---
-        
-        ### 🆕 Novedades en v3.0
-        
-        **Productos nuevos agregados:**
-        - 🍉 Sandía, 🍍 Piña, 🥝 Guayaba, 🍈 Melón, 🍇 Uva, 🥭 Papaya
-        - 🫘 Lenteja, 🌾 Avena
-        
-        **Rangos recalculados** para mejor precisión con el dataset expandido.
-        
-        ---
-        
-        ### ⚖️ Sistemas de Pesos (Escenarios)
-        
-        Se desarrollaron dos metodologías de análisis para evaluar la robustez de las recomendaciones:
-        
-        **Escenario A - Metodología Original (Desperdicio 25%):**
-        ```
-        • Desperdicio: 25%
-        • Origen: 20%
-        • Procesamiento (NOVA): 15%
-        • Carbono: 15%
-        • Agua: 15%
-        • Suelo: 10%
-        ```
-        
-        **Escenario B - Metodología Ajustada (Desperdicio 30%):**
-        ```
-        • Desperdicio: 30%
-        • Origen: 18%
-        • Procesamiento (NOVA): 15%
-        • Carbono: 14%
-        • Agua: 14%
-        • Suelo: 9%
-        ```
-        
-        **Justificación del Escenario B:**  
-        El desperdicio tiene un efecto multiplicador: cuando se desperdicia comida, 
-        se desperdician TODOS los recursos invertidos en su producción (agua, tierra, 
-        energía, carbono). El Escenario B captura parcialmente este efecto manteniendo 
-        transparencia metodológica.
-        
-        **Validación:**  
-        La correlación entre ambos escenarios es r > 0.99 (casi perfecta), lo que valida 
-        la robustez de las recomendaciones.
-        
-        ---
-        
-        ### 📚 Fuentes de Datos
-        
-        Todos los datos provienen de fuentes científicas verificadas y publicadas:
-        
-        **1. Huella de Carbono:**
-        
-        López-Olmedo, N., Popkin, B. M., & Taillie, L. S. (2022). The carbon footprint of the 
-        Mexican diet. *Environmental Research Letters*, 17(5), 054028. 
-        https://doi.org/10.1088/1748-9326/ac6b03
-        
-        **2. Huella Hídrica:**
-        
-        - SU-EATABLE LIFE Database (2020). *Food Footprint Database*. 
-          https://www.rintracciabilita.it/su-eatable/
-        
-        - Mekonnen, M. M., & Hoekstra, A. Y. (2011). The green, blue and grey water footprint 
-          of crops and derived crop products. *Hydrology and Earth System Sciences*, 15(5), 
-          1577-1600. https://doi.org/10.5194/hess-15-1577-2011
-        
-        **3. Uso de Suelo:**
-        
-        Food and Agriculture Organization (FAO). (2021). *FAOSTAT - Mexico Production Data* 
-        (2008-2013). https://www.fao.org/faostat/
-        
-        **4. Desperdicio Alimentario:**
-        
-        Food and Agriculture Organization (FAO). (2021). *Food Loss and Waste Database - Mexico*. 
-        https://www.fao.org/platform-food-loss-waste/flw-data/
-        
-        **5. Clasificación NOVA:**
-        
-        Monteiro, C. A., Cannon, G., Levy, R. B., Moubarac, J. C., Louzada, M. L., Rauber, F., 
-        ... & Jaime, P. C. (2019). Ultra-processed foods: What they are and how to identify them. 
-        *Public Health Nutrition*, 22(5), 936-941. https://doi.org/10.1017/S1368980018003762
-        
-        ---
-        
-        ### 📈 Interpretación de Scores
-        
-        Los scores de sustentabilidad van de 0 a 100, donde 100 es el máximo nivel de 
-        sustentabilidad:
-        
-        - **90-100:** 🟢 Excelente - Altamente sostenible, elección óptima
-        - **80-89:**  🟢 Muy Bueno - Recomendado para consumo regular
-        - **70-79:**  🟡 Bueno - Aceptable, moderación recomendada
-        - **60-69:**  🟠 Moderado - Considerar alternativas más sostenibles
-        - **< 60:**   🔴 Bajo - Limitar consumo, buscar opciones mejores
-        
-        ---
-        
-        ### ✅ Validación Científica
-        
-        **Robustez del Modelo:**
-        - ✓ 100% de datos verificados con fuentes científicas publicadas
-        - ✓ Dataset expandido a 42 productos
-        - ✓ Modelo validado con análisis de sensibilidad (múltiples escenarios)
-        - ✓ Correlación entre escenarios >0.99
-        - ✓ Consistencia en recomendaciones: productos top idénticos en ambos escenarios
-        
-        **Limitaciones Reconocidas:**
-        - Muestra de 42 productos (ampliable en futuras versiones)
-        - Indicadores de nutrición y precio no incluidos (datos no verificables)
-        - Variabilidad estacional no capturada
-        - Optimizado para contexto México/Sonora (requiere adaptación para otras regiones)
-        - No considera factores socioculturales o preferencias individuales
-        
-        ---
-        
-        ### 📧 Contacto
-        
-        **Laura Ochoa M.**  
-        LinkedIn: [linkedin.com/in/lauraochoam](https://www.linkedin.com/in/lauraochoam/)
-        
-        Para más información sobre:
-        - Metodología detallada
-        - Colaboraciones científicas
-        - Datos y fuentes
-        - Publicación académica
-        - Adaptación a otras regiones
-        
-        No dudes en contactarme a través de LinkedIn.
-        
-        ---
-        
-        *Última actualización: Enero 2026 - Versión 3.0*
-        """)
+    # La versión se calculó al cargar: no se vuelve a recorrer el dataset
+    df, version = datos
+    score_col = COLUMNAS_SCORE[escenario]
+    with PERFIL_ETAPAS.etapa('indice_productos'):
+        indice = obtener_indice_productos(df, version)
+    
+    # SIDEBAR - Región del consumidor (si hay tabla de distancias)
+    with PERFIL_ETAPAS.etapa('region'):
+        distancias = cargar_distancias_regionales()
+        if distancias is not None:
+            tabla_distancias, version_distancias = distancias
+            regionales = obtener_scores_regionales(df, version, tabla_distancias, version_distancias)
+            region = st.sidebar.selectbox(
+                "Región del consumidor:",
+                options=[REGION_BASE] + regionales.regiones,
+                help="El score de origen se recalcula según la distancia entre la zona de producción y tu región."
+            )
+            if region != REGION_BASE:
+                df = regionales.aplicar(df, region)
+                version = f"{version}:{region}"
+    
+    # SIDEBAR - Catálogo compartido de productos evaluados (común a todas las sesiones)
+    with PERFIL_ETAPAS.etapa('registro'):
+        registro = obtener_registro()
+        rankings = None
+        if len(registro) > 0 and st.sidebar.checkbox(
+            f"Incluir productos evaluados por los usuarios ({len(registro)})",
+            help="Agrega al catálogo los productos que cualquier usuario guardó desde 'Evaluar Nuevo Producto'."
+        ):
+            # Los rankings del dataset reciben solo los productos nuevos; el catálogo
+            # combinado se arma una vez por versión del registro, no en cada ejecución
+            rankings = obtener_rankings_incrementales(df, version)
+            registro.sincronizar(rankings)
+            resumen = obtener_resumen_catalogo(df, version)
+            version_registro = registro.version
+            df = obtener_catalogo_combinado(df, version, registro, version_registro)
+            version = f"{version}+{version_registro}"
+            indice = obtener_indice_productos(df, version)
+            # El resumen de Inicio extiende una copia del resumen del dataset
+            obtener_resumen_catalogo(df, version, resumen)
+    
+    fijar_contexto_pagina(ContextoPagina(df, version, escenario, score_col, indice, registro, rankings))
+    with PERFIL_ETAPAS.etapa(f'pagina: {navegacion.title}'):
+        navegacion.run()
 
 # ============================================================================
 # EJECUTAR APLICACIÓN
@@ -0,0 +1,381 @@
+"""
+Benchmarks de rendimiento para la calculadora de sostenibilidad.
+
+Mide el costo por lote de los componentes vectorizados sobre catálogos
+sintéticos grandes. Uso:
+
+    python benchmark_rendimiento.py [n_productos]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from calculadora_graficos import CacheComparaciones, construir_comparacion, limpiar_figuras, obtener_figura
+from calculadora_nucleo import (
+    BACKEND_FUSIONADO,
+    COLUMNAS_INDICADORES,
+    INDICATOR_RANGES,
+    INDICADORES,
+    KERNELS_NORMALIZACION,
+    adjuntar_catalogo,
+    calcular_capas_pareto,
+    calcular_score_producto,
+    clasificar_scores,
+    compilar_scorer,
+    congelar_dataframe,
+    correlacion_kendall,
+    correlacion_spearman,
+    etiqueta_estilos,
+    normalizar_indicadores,
+    publicar_catalogo,
+    RUTA_ESTILOS,
+    puntuar_y_clasificar,
+    validar_esquema
+)
+
+
+def catalogo_sintetico(n: int, semilla: int = 0) -> pd.DataFrame:
+    """Create a synthetic catalog with realistic indicator distributions."""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'Producto': [f'Producto {i}' for i in range(n)],
+        'CF_kgCO2eq_kg': rng.lognormal(0.5, 1.0, n),
+        'WF_L_kg': rng.lognormal(7.0, 1.0, n),
+        'LU_m2_kg': rng.lognormal(1.0, 1.2, n),
+        'Origin_Score': rng.choice([0, 50, 100], n),
+        'Waste_pct': rng.uniform(0.4, 45.5, n),
+        'NOVA': rng.integers(1, 5, n)
+    })
+
+
+def medir(funcion, repeticiones: int = 5) -> float:
+    """Return the best wall-clock time (seconds) over ``repeticiones`` runs."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def benchmark_normalizacion(df: pd.DataFrame) -> pd.DataFrame:
+    """Batch cost of every normalization kernel over all six indicators."""
+    valores = {i: df[COLUMNAS_INDICADORES[i]].to_numpy(dtype=float) for i in INDICADORES}
+    filas = []
+    for nombre, kernel in KERNELS_NORMALIZACION.items():
+        segundos = medir(lambda: [kernel(valores[i], *INDICATOR_RANGES[i]) for i in INDICADORES])
+        filas.append({
+            'kernel': nombre,
+            'ms_por_lote': segundos * 1000,
+            'ns_por_valor': segundos * 1e9 / (len(df) * len(INDICADORES))
+        })
+    return pd.DataFrame(filas)
+
+
+def _leer_catalogo(ruta: str) -> pd.DataFrame:
+    return congelar_dataframe(pd.read_csv(ruta))
+
+
+def benchmark_sesiones_concurrentes(df: pd.DataFrame, n_sesiones: int = 200) -> pd.DataFrame:
+    """
+    Load test: ``n_sesiones`` concurrent sessions fetch the cached catalog.
+
+    Compares st.cache_data (the result is unpickled for every caller) with
+    st.cache_resource (one shared read-only object). Each simulated session
+    keeps its frame alive, as a real session does during a rerun; memory is
+    the traced peak of NumPy/Python allocations during the burst.
+    """
+    estrategias = {
+        'cache_data (copia por sesión)': st.cache_data(show_spinner=False)(_leer_catalogo),
+        'cache_resource (compartido)': st.cache_resource(show_spinner=False)(_leer_catalogo)
+    }
+    filas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'catalogo.csv')
+        df.to_csv(ruta, index=False)
+
+        for nombre, cargar in estrategias.items():
+            cargar(ruta)  # Primera carga fuera de la medición
+            barrera = threading.Barrier(n_sesiones)
+            latencias = []
+            sesiones = []
+
+            def sesion(_):
+                barrera.wait()
+                inicio = time.perf_counter()
+                datos = cargar(ruta)
+                latencias.append(time.perf_counter() - inicio)
+                sesiones.append(datos)
+
+            tracemalloc.start()
+            with ThreadPoolExecutor(max_workers=n_sesiones) as executor:
+                list(executor.map(sesion, range(n_sesiones)))
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            filas.append({
+                'estrategia': nombre,
+                'sesiones': n_sesiones,
+                'copias_distintas': len({id(d) for d in sesiones}),
+                'memoria_pico_MB': pico / 1e6,
+                'latencia_p50_ms': np.percentile(latencias, 50) * 1000,
+                'latencia_p95_ms': np.percentile(latencias, 95) * 1000
+            })
+            cargar.clear()
+    return pd.DataFrame(filas)
+
+
+def benchmark_catalogo_compartido(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Worker startup: read and freeze the CSV vs attach to the published catalog.
+
+    Memory is the traced allocation held by one worker after startup; with
+    the shared catalog the numeric pages belong to the mapped files and are
+    shared by every worker on the node.
+    """
+    filas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'catalogo.csv')
+        df.to_csv(ruta, index=False)
+        publicar_catalogo(df, os.path.join(directorio, 'compartido'))
+
+        arranques = {
+            'leer CSV por worker': lambda: _leer_catalogo(ruta),
+            'adjuntar catálogo compartido': lambda: adjuntar_catalogo(
+                os.path.join(directorio, 'compartido')).df
+        }
+        for nombre, arrancar in arranques.items():
+            segundos = medir(arrancar, repeticiones=3)
+            tracemalloc.start()
+            datos = arrancar()
+            memoria, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del datos
+            filas.append({
+                'arranque': nombre,
+                'ms': segundos * 1000,
+                'memoria_privada_MB': memoria / 1e6
+            })
+    return pd.DataFrame(filas)
+
+
+def benchmark_pareto(tamanos=(1_000, 10_000, 50_000)) -> pd.DataFrame:
+    """
+    Sorted binary-search layering vs repeated peeling over the six normalized indicators.
+
+    Both are quadratic in the worst case. Peeling compares every remaining
+    product against every other one once per layer, O(L n²); it is only
+    timed on the smaller catalogs. calcular_capas_pareto places each
+    product once, against O(log L) fronts.
+    """
+    def peeling(valores):
+        restantes = np.arange(len(valores))
+        while len(restantes):
+            sub = valores[restantes]
+            dominados = np.zeros(len(sub), dtype=bool)
+            for j in range(len(sub)):
+                dominados |= ((sub[j] >= sub).all(axis=1) & (sub[j] != sub).any(axis=1))
+            restantes = restantes[dominados]
+
+    filas = []
+    for n in tamanos:
+        valores = normalizar_indicadores(catalogo_sintetico(n))
+        capas = calcular_capas_pareto(valores)
+        filas.append({
+            'productos': n,
+            'capas': int(capas.max()),
+            'frente': int((capas == 1).sum()),
+            'capas_ms': medir(lambda: calcular_capas_pareto(valores), repeticiones=1) * 1000,
+            'pares_ms': (medir(lambda: peeling(valores), repeticiones=1) * 1000
+                         if n <= 10_000 else float('nan'))
+        })
+    return pd.DataFrame(filas)
+
+
+def benchmark_estabilidad(n: int) -> pd.DataFrame:
+    """Rank correlations between two correlated synthetic scenarios."""
+    rng = np.random.default_rng(0)
+    x = rng.random(n)
+    y = x + rng.normal(0, 0.3, n)
+    return pd.DataFrame([
+        {'métrica': 'Spearman', 'ms': medir(lambda: correlacion_spearman(x, y), 3) * 1000},
+        {'métrica': 'Kendall tau-b', 'ms': medir(lambda: correlacion_kendall(x, y), 3) * 1000}
+    ])
+
+
+def benchmark_validacion(df: pd.DataFrame) -> pd.DataFrame:
+    """Schema validation of a clean catalog and of one with 1% bad NOVA values."""
+    df = df.assign(Score_México=50.0, Score_México_B=50.0)
+    erroneo = df.assign(NOVA=np.where(np.arange(len(df)) % 100 == 0, 7, df['NOVA']))
+    return pd.DataFrame([
+        {'dataset': 'válido', 'ms': medir(lambda: validar_esquema(df), 3) * 1000},
+        {'dataset': '1% NOVA inválido', 'ms': medir(lambda: validar_esquema(erroneo), 3) * 1000}
+    ])
+
+
+def benchmark_scorer_compilado(df: pd.DataFrame, llamadas: int = 20_000) -> pd.DataFrame:
+    """
+    calcular_score_producto vs the compiled scorer, per call and per batch.
+
+    The batch baseline calls calcular_score_producto row by row on a
+    ``llamadas``-row slice and is scaled to the full catalog.
+    """
+    valores = df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=float)
+    filas = [tuple(f) for f in valores[:llamadas].tolist()]
+    scorer = compilar_scorer('A')
+
+    def original():
+        for fila in filas:
+            calcular_score_producto(*fila, 'A')
+
+    def compilado():
+        for fila in filas:
+            scorer(*fila)
+
+    por_llamada_original = medir(original, 3) / len(filas)
+    por_llamada_compilado = medir(compilado, 3) / len(filas)
+    lote = medir(lambda: scorer.lote(valores), 3)
+    return pd.DataFrame([
+        {'modo': 'por llamada', 'original_us': por_llamada_original * 1e6,
+         'compilado_us': por_llamada_compilado * 1e6,
+         'aceleración': por_llamada_original / por_llamada_compilado},
+        {'modo': f'lote ({len(df):,} filas)', 'original_us': por_llamada_original * len(df) * 1e6,
+         'compilado_us': lote * 1e6,
+         'aceleración': por_llamada_original * len(df) / lote}
+    ])
+
+
+def benchmark_kernel_fusionado(df: pd.DataFrame) -> pd.DataFrame:
+    """Compiled scorer batch + classification vs the fused float32 kernel."""
+    valores = df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=np.float32)
+    scorer = compilar_scorer('A')
+    tracemalloc.start()
+    puntuar_y_clasificar(valores, 'A')
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pd.DataFrame([
+        {'ruta': 'lote + clasificar_scores',
+         'ms': medir(lambda: clasificar_scores(scorer.lote(valores)), 3) * 1000},
+        {'ruta': 'kernel fusionado (float32)',
+         'ms': medir(lambda: puntuar_y_clasificar(valores, 'A'), 3) * 1000,
+         'memoria_pico_MB': pico / 1e6}
+    ])
+
+
+def benchmark_graficos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Plotly payload of the full ranking: one bar per product vs the
+    pre-aggregated histogram and downsampled ranking curve.
+    """
+    df = df.assign(Score_México=compilar_scorer('A').dataframe(df))
+    df = df.assign(Score_México_B=df['Score_México'])
+
+    def barras_completas():
+        return px.bar(df.sort_values('Score_México', ascending=False),
+                      x='Producto', y='Score_México').to_json()
+
+    def agregados():
+        limpiar_figuras()
+        return [obtener_figura(df, 'benchmark', 'A', g) for g in ('distribucion', 'curva_ranking')]
+
+    filas = [
+        {'gráfico': 'barra por producto', 'ms': medir(barras_completas, 1) * 1000,
+         'payload_KB': len(barras_completas()) / 1e3},
+        {'gráfico': 'histograma + curva reducida', 'ms': medir(agregados, 1) * 1000,
+         'payload_KB': sum(map(len, agregados())) / 1e3},
+        {'gráfico': 'histograma + curva (caché)',
+         'ms': medir(lambda: [obtener_figura(df, 'benchmark', 'A', g)
+                              for g in ('distribucion', 'curva_ranking')], 3) * 1000,
+         'payload_KB': sum(map(len, agregados())) / 1e3}
+    ]
+    limpiar_figuras()
+    return pd.DataFrame(filas)
+
+
+def benchmark_estilos(reruns: int = 100) -> pd.DataFrame:
+    """
+    Stylesheet bytes a session receives over ``reruns`` script runs.
+
+    Inline styles are re-sent on every run; the static stylesheet sends a
+    short <link> per run and is downloaded once.
+    """
+    with open(RUTA_ESTILOS, encoding='utf-8') as f:
+        css = f.read()
+    inline = len(etiqueta_estilos(estatico=False).encode('utf-8'))
+    enlace = len(etiqueta_estilos(estatico=True).encode('utf-8'))
+    return pd.DataFrame([
+        {'modo': '<style> en cada ejecución', 'KB_por_sesión': inline * reruns / 1e3},
+        {'modo': '<link> a app/static', 'KB_por_sesión': (enlace * reruns + len(css.encode('utf-8'))) / 1e3}
+    ])
+
+
+def benchmark_comparacion() -> pd.DataFrame:
+    """
+    Cost of one 'Comparar Productos' rerun (table, bar and radar charts) on
+    the bundled dataset: rebuilt on every widget interaction vs the session
+    cache hit for a reordered selection of the same products.
+    """
+    df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+    productos = df['Producto'].head(5).tolist()
+    cache = CacheComparaciones()
+    cache.obtener(df, 'benchmark', 'A', productos)
+    return pd.DataFrame([
+        {'modo': 'reconstruir', 'ms': medir(
+            lambda: construir_comparacion(df, 'benchmark', 'A', productos)) * 1000},
+        {'modo': 'caché de sesión (orden distinto)', 'ms': medir(
+            lambda: cache.obtener(df, 'benchmark', 'A', productos[::-1]), 100) * 1000}
+    ])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = catalogo_sintetico(n)
+    print(f"Catálogo sintético: {n:,} productos\n")
+
+    print("Kernels de normalización (6 indicadores por lote)")
+    print(benchmark_normalizacion(df).to_string(index=False, float_format='%.2f'))
+
+    print("\nCarga de datos compartida: 200 sesiones concurrentes (50,000 productos)")
+    print(benchmark_sesiones_concurrentes(catalogo_sintetico(50_000)).to_string(
+        index=False, float_format='%.2f'))
+
+    print(f"\nArranque de un worker ({n:,} productos)")
+    print(benchmark_catalogo_compartido(df).to_string(index=False, float_format='%.2f'))
+
+    print("\nScorer compilado vs calcular_score_producto (escenario A)")
+    print(benchmark_scorer_compilado(df).to_string(index=False, float_format='%.2f'))
+
+    print(f"\nKernel fusionado ({n:,} productos, backend {BACKEND_FUSIONADO})")
+    print(benchmark_kernel_fusionado(df).to_string(index=False, float_format='%.2f'))
+
+    print(f"\nGráficos del ranking completo ({min(n, 200_000):,} productos)")
+    print(benchmark_graficos(df.head(200_000)).to_string(index=False, float_format='%.2f'))
+
+    print(f"\nValidación de esquema ({n:,} productos)")
+    print(benchmark_validacion(df).to_string(index=False, float_format='%.2f'))
+
+    print(f"\nEstabilidad de rankings A vs B ({n:,} productos)")
+    print(benchmark_estabilidad(n).to_string(index=False, float_format='%.2f'))
+
+    print("\nHoja de estilos (100 ejecuciones por sesión)")
+    print(benchmark_estilos().to_string(index=False, float_format='%.2f'))
+
+    print("\nFrente de Pareto y capas (6 indicadores)")
+    print(benchmark_pareto().to_string(index=False, float_format='%.2f'))
+
+    print("\nComparar Productos (5 productos, una ejecución del script)")
+    print(benchmark_comparacion().to_string(index=False, float_format='%.3f'))
+
+
+if __name__ == "__main__":
+    main()
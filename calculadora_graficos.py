@@ -0,0 +1,533 @@
+"""
+CALCULADORA DE SOSTENIBILIDAD ALIMENTARIA - GRÁFICOS
+Datos agregados para gráficos y figuras Plotly en caché por escenario.
+
+Autor: Laura Ochoa M.
+Fecha: Enero 2026
+Versión: 3.0 (42 productos)
+"""
+
+import json
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from calculadora_nucleo import (
+    COLUMNAS_SCORE,
+    clave_normalizacion,
+    congelar_dataframe,
+    mayores_cambios,
+    obtener_capas_pareto,
+    obtener_contribuciones,
+    obtener_estabilidad,
+    obtener_indice_productos,
+    obtener_normalizados,
+    obtener_resumen_catalogo
+)
+
+# ============================================================================
+# DATOS DE GRÁFICOS
+# ============================================================================
+
+# Largest number of bars / points sent to the browser by one chart
+MAX_BARRAS_GRAFICO = 25
+MAX_PUNTOS_GRAFICO = 1000
+
+COLORES_CLASES = ['#27ae60', '#2ecc71', '#f1c40f', '#e67e22', '#e74c3c']
+
+# Axis labels of the six indicators, in INDICADORES order
+ETIQUETAS_INDICADORES = ['Carbono', 'Agua', 'Suelo', 'Origen', 'Desperdicio', 'Procesamiento']
+
+def top_n_con_otros(
+    etiquetas: Sequence,
+    valores: Sequence[float],
+    n: int = MAX_BARRAS_GRAFICO,
+    pesos: Optional[Sequence[float]] = None,
+    ordenar: bool = True,
+    etiqueta_otros: str = 'Otros'
+) -> pd.DataFrame:
+    """
+    Keep the n largest values and fold the rest into a single row.
+
+    Without ``pesos`` the folded row holds the sum of the rest (counts);
+    with ``pesos`` it holds their weighted mean (e.g. mean score per food
+    group, weighted by the products in each group).
+
+    Args:
+        etiquetas: Label of each entry
+        valores: Value of each entry
+        n: Entries kept before folding
+        pesos: Optional weight of each entry
+        ordenar: Keep the n largest values; if False, keep the first n
+        etiqueta_otros: Label of the folded row
+
+    Returns:
+        DataFrame with columns Etiqueta, Valor and Elementos (summed weight,
+        or number of entries), at most n + 1 rows
+    """
+    ponderado = pesos is not None
+    valores = np.asarray(valores, dtype=float)
+    pesos = np.asarray(pesos, dtype=float) if ponderado else np.ones(len(valores))
+    orden = np.argsort(-valores, kind='stable') if ordenar else np.arange(len(valores))
+    etiquetas = np.asarray(etiquetas, dtype=object)[orden]
+    valores, pesos = valores[orden], pesos[orden]
+
+    tabla = pd.DataFrame({'Etiqueta': etiquetas[:n], 'Valor': valores[:n], 'Elementos': pesos[:n]})
+    if len(valores) > n:
+        resto, peso_resto = valores[n:], pesos[n:]
+        valor = (float(np.dot(resto, peso_resto) / peso_resto.sum()) if ponderado
+                 else float(resto.sum()))
+        tabla.loc[n] = [etiqueta_otros, valor, float(peso_resto.sum())]
+    return tabla
+
+def histograma_scores(
+    valores: Sequence[float],
+    bins: int = 20,
+    rango: Tuple[float, float] = (0.0, 100.0)
+) -> pd.DataFrame:
+    """
+    Bin scores into equal-width intervals (missing values are skipped).
+
+    Returns:
+        DataFrame with columns Desde, Hasta and Productos, one row per bin
+    """
+    valores = np.asarray(valores, dtype=float)
+    conteo, bordes = np.histogram(valores[np.isfinite(valores)], bins=bins, range=rango)
+    return pd.DataFrame({'Desde': bordes[:-1], 'Hasta': bordes[1:], 'Productos': conteo})
+
+def reducir_serie(valores: Sequence[float], max_puntos: int = MAX_PUNTOS_GRAFICO) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series to at most ``max_puntos`` points, keeping its shape.
+
+    The series is cut into max_puntos / 2 equal buckets and the minimum and
+    maximum of each bucket are kept (plus both ends), so peaks and plateaus
+    survive, unlike plain striding.
+
+    Args:
+        valores: Series to plot (e.g. scores in ranking order)
+        max_puntos: Largest number of points returned
+
+    Returns:
+        Tuple (positions, values) in increasing position order
+    """
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    if n <= max_puntos:
+        return np.arange(n), valores
+
+    cubetas = max(1, (max_puntos - 2) // 2)
+    tamano = -(-n // cubetas)
+    relleno = np.full(cubetas * tamano, np.nan)
+    relleno[:n] = valores
+    bloques = relleno.reshape(cubetas, tamano)
+    validos = ~np.isnan(bloques).all(axis=1)
+    base = np.arange(cubetas)[validos] * tamano
+    bloques = np.where(np.isnan(bloques[validos]), np.inf, bloques[validos])
+    minimos = base + bloques.argmin(axis=1)
+    bloques[np.isinf(bloques)] = -np.inf
+    maximos = base + bloques.argmax(axis=1)
+    posiciones = np.unique(np.concatenate([[0, n - 1], minimos, maximos]))
+    return posiciones, valores[posiciones]
+
+def _figura_barras_score(productos: pd.DataFrame, columna: str, escala: str, altura: int) -> go.Figure:
+    fig = px.bar(
+        productos,
+        x='Producto',
+        y=columna,
+        color=columna,
+        color_continuous_scale=escala,
+        text=columna
+    )
+    fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="",
+        yaxis_title="Score de Sustentabilidad",
+        showlegend=False,
+        height=altura
+    )
+    return fig
+
+def _figura_clases(df: pd.DataFrame, version: str, escenario: str, parametro=None) -> go.Figure:
+    clases = obtener_resumen_catalogo(df, version).clases(escenario)
+    fig = px.bar(
+        x=list(clases.keys()),
+        y=list(clases.values()),
+        text=list(clases.values()),
+        color=list(clases.keys()),
+        color_discrete_sequence=COLORES_CLASES
+    )
+    fig.update_layout(
+        title="Productos por clasificación",
+        xaxis_title="",
+        yaxis_title="Productos",
+        showlegend=False,
+        height=350
+    )
+    return fig
+
+def _figura_categorias(df: pd.DataFrame, version: str, escenario: str, parametro=None) -> go.Figure:
+    resumen = obtener_resumen_catalogo(df, version)
+    promedios = resumen.promedios_categoria(escenario)
+    productos = resumen.productos_categoria(escenario)
+    tabla = top_n_con_otros(
+        list(promedios), list(promedios.values()),
+        pesos=[productos[g] for g in promedios]
+    ).sort_values('Valor')
+    fig = px.bar(
+        x=tabla['Valor'].to_numpy(),
+        y=tabla['Etiqueta'].to_numpy(),
+        orientation='h',
+        text=np.round(tabla['Valor'].to_numpy(), 1),
+        color_discrete_sequence=['#2ecc71']
+    )
+    fig.update_layout(
+        title="Score promedio por grupo de alimentos",
+        xaxis_title="Score",
+        yaxis_title="",
+        showlegend=False,
+        height=350
+    )
+    return fig
+
+def _figura_top(df: pd.DataFrame, version: str, escenario: str, parametro: int = 15) -> go.Figure:
+    columna = COLUMNAS_SCORE[escenario]
+    return _figura_barras_score(df.nlargest(parametro, columna), columna, 'Greens', 500)
+
+def _figura_bottom(df: pd.DataFrame, version: str, escenario: str, parametro: int = 10) -> go.Figure:
+    columna = COLUMNAS_SCORE[escenario]
+    return _figura_barras_score(df.nsmallest(parametro, columna), columna, 'Reds', 500)
+
+def _figura_distribucion(df: pd.DataFrame, version: str, escenario: str, parametro=None) -> go.Figure:
+    tabla = histograma_scores(df[COLUMNAS_SCORE[escenario]].to_numpy(dtype=float))
+    fig = go.Figure(go.Bar(
+        x=(tabla['Desde'] + tabla['Hasta']).to_numpy() / 2,
+        y=tabla['Productos'].to_numpy(),
+        width=(tabla['Hasta'] - tabla['Desde']).to_numpy(),
+        marker_color='#2ecc71',
+        customdata=tabla[['Desde', 'Hasta']].to_numpy(),
+        hovertemplate="%{customdata[0]:.0f}–%{customdata[1]:.0f}: %{y} productos<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Distribución de scores",
+        xaxis_title="Score",
+        yaxis_title="Productos",
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+def _figura_curva_ranking(df: pd.DataFrame, version: str, escenario: str, parametro=None) -> go.Figure:
+    scores = np.sort(df[COLUMNAS_SCORE[escenario]].to_numpy(dtype=float))[::-1]
+    posiciones, valores = reducir_serie(scores)
+    fig = go.Figure(go.Scatter(
+        x=posiciones + 1,
+        y=valores,
+        mode='lines',
+        line_color='#2ecc71',
+        hovertemplate="#%{x}: %{y:.1f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Score por posición en el ranking",
+        xaxis_title="Posición",
+        yaxis_title="Score",
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+def _figura_capas_pareto(df: pd.DataFrame, version: str, escenario: str, parametro=None) -> go.Figure:
+    conteo = pd.Series(obtener_capas_pareto(df, version)).value_counts().sort_index()
+    tabla = top_n_con_otros(
+        conteo.index.astype(str), conteo.to_numpy(), ordenar=False,
+        etiqueta_otros=f"{MAX_BARRAS_GRAFICO + 1}+"
+    )
+    fig = px.bar(
+        x=tabla['Etiqueta'].to_numpy(),
+        y=tabla['Valor'].to_numpy(),
+        text=tabla['Valor'].to_numpy(),
+        color_discrete_sequence=['#2ecc71']
+    )
+    fig.update_layout(
+        xaxis_title="Capa (1 = frente de Pareto)",
+        yaxis_title="Productos",
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+def _figura_movimientos(df: pd.DataFrame, version: str, escenario: str, parametro: int = 10) -> go.Figure:
+    _, cambios = obtener_estabilidad(df, version)
+    movimientos = mayores_cambios(cambios, parametro).copy()
+    movimientos['Dirección'] = np.where(movimientos['Cambio'] > 0, 'Sube en B', 'Baja en B')
+    fig = px.bar(
+        movimientos,
+        x='Cambio',
+        y='Producto',
+        orientation='h',
+        color='Dirección',
+        color_discrete_map={'Sube en B': '#2ecc71', 'Baja en B': '#e74c3c'},
+        text='Cambio'
+    )
+    fig.update_layout(
+        xaxis_title="Cambio de posición (A → B)",
+        yaxis_title="",
+        yaxis={'categoryorder': 'total ascending'},
+        height=450
+    )
+    return fig
+
+def _figura_radar(df: pd.DataFrame, version: str, escenario: str, parametro: str = None) -> go.Figure:
+    posicion = obtener_indice_productos(df, version).posicion(parametro)
+    valores = obtener_normalizados(df, version, escenario).iloc[posicion].tolist()
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=valores,
+        theta=ETIQUETAS_INDICADORES,
+        fill='toself',
+        name=parametro,
+        line_color='#2ecc71'
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100])
+        ),
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+def _figura_contribuciones(df: pd.DataFrame, version: str, escenario: str, parametro: str = None) -> go.Figure:
+    posicion = obtener_indice_productos(df, version).posicion(parametro)
+    contribuciones = obtener_contribuciones(df, version)[escenario].iloc[posicion]
+    fig = go.Figure(go.Bar(
+        x=contribuciones.tolist(),
+        y=ETIQUETAS_INDICADORES,
+        orientation='h',
+        marker_color='#2ecc71',
+        text=[f"{v:.1f}" for v in contribuciones],
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title=f"Score recalculado: {contribuciones.sum():.1f}",
+        xaxis_title="Puntos aportados al score",
+        yaxis=dict(autorange="reversed"),
+        showlegend=False,
+        height=350
+    )
+    return fig
+
+# Chart builders: f(df, version, escenario, parametro) -> go.Figure
+FIGURAS: Dict[str, Callable[..., go.Figure]] = {
+    'clases': _figura_clases,
+    'categorias': _figura_categorias,
+    'top': _figura_top,
+    'bottom': _figura_bottom,
+    'distribucion': _figura_distribucion,
+    'curva_ranking': _figura_curva_ranking,
+    'capas_pareto': _figura_capas_pareto,
+    'movimientos': _figura_movimientos,
+    'radar': _figura_radar,
+    'contribuciones': _figura_contribuciones
+}
+
+# Per-product charts (parametro = product name): they get their own bounded
+# cache so browsing products never evicts the catalog-wide charts
+FIGURAS_PRODUCTO = frozenset({'radar', 'contribuciones'})
+
+# Charts that do not depend on the selected scenario (one entry for both)
+FIGURAS_SIN_ESCENARIO = frozenset({'capas_pareto', 'movimientos'})
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _figura_catalogo(_df: pd.DataFrame, version: str, escenario: Optional[str], grafico: str,
+                     parametro) -> str:
+    return FIGURAS[grafico](_df, version, escenario, parametro).to_json()
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+def _figura_producto(_df: pd.DataFrame, version: str, escenario: str, grafico: str,
+                     parametro: str, normalizacion: str) -> str:
+    return FIGURAS[grafico](_df, version, escenario, parametro).to_json()
+
+def obtener_figura(_df: pd.DataFrame, version: str, escenario: str, grafico: str, parametro=None) -> str:
+    """
+    Cached Plotly JSON of one chart for a dataset version and scenario.
+
+    The JSON string is immutable, so every session shares it; building it
+    runs the (aggregated) Plotly figure code once per version and scenario
+    (once per version for FIGURAS_SIN_ESCENARIO). FIGURAS_PRODUCTO live in
+    a separate bounded cache, also keyed on clave_normalizacion since they
+    use normalized data.
+    """
+    if grafico not in FIGURAS:
+        raise ValueError(f"Unknown chart: {grafico}. Available: {list(FIGURAS)}")
+    if grafico in FIGURAS_PRODUCTO:
+        return _figura_producto(_df, version, escenario, grafico, parametro, clave_normalizacion())
+    if grafico in FIGURAS_SIN_ESCENARIO:
+        escenario = None
+    return _figura_catalogo(_df, version, escenario, grafico, parametro)
+
+def limpiar_figuras():
+    """Drop every cached figure."""
+    _figura_catalogo.clear()
+    _figura_producto.clear()
+
+def mostrar_figura(figura_json: str):
+    """Render cached figure JSON (already validated when it was built)."""
+    st.plotly_chart(go.Figure(json.loads(figura_json), _validate=False), use_container_width=True)
+
+# ============================================================================
+# COMPARACIÓN DE PRODUCTOS
+# ============================================================================
+
+COLORES_COMPARACION = ['#2ecc71', '#3498db', '#e74c3c', '#f39c12', '#9b59b6']
+
+# Indicator columns of the comparison table and their display names
+COLUMNAS_COMPARACION = {
+    'CF_kgCO2eq_kg': 'Carbono (kg CO₂)',
+    'WF_L_kg': 'Agua (L)',
+    'LU_m2_kg': 'Suelo (m²)',
+    'Origin_Score': 'Origen',
+    'Waste_pct': 'Desperdicio (%)',
+    'NOVA': 'NOVA'
+}
+
+class Comparacion(NamedTuple):
+    """Rendered comparison of a set of products (table and figure JSON)."""
+    productos: Tuple[str, ...]
+    tabla: pd.DataFrame
+    barras: str
+    radar: str
+
+def tabla_comparacion(df_comp: pd.DataFrame, score_col: str) -> pd.DataFrame:
+    """
+    Display table of the compared products.
+
+    Rounds the indicators, formats water with thousands separators and maps
+    the origin score to Local / Regional / Importado.
+    """
+    tabla = df_comp[['Producto', *COLUMNAS_COMPARACION, score_col]].rename(
+        columns={**COLUMNAS_COMPARACION, score_col: 'Score'}
+    )
+    origen = tabla['Origen'].to_numpy()
+    return tabla.assign(**{
+        'Carbono (kg CO₂)': tabla['Carbono (kg CO₂)'].round(2),
+        'Agua (L)': [f"{x:,.0f}" for x in tabla['Agua (L)']],
+        'Suelo (m²)': tabla['Suelo (m²)'].round(2),
+        'Origen': np.select([origen == 0, origen == 50], ['Local', 'Regional'], 'Importado'),
+        'Desperdicio (%)': tabla['Desperdicio (%)'].round(1),
+        'Score': tabla['Score'].round(1)
+    })
+
+def construir_comparacion(df: pd.DataFrame, version: str, escenario: str,
+                          productos: Iterable[str]) -> Comparacion:
+    """
+    Build the comparison of ``productos`` in canonical order.
+
+    Products are ordered by score (best first, ties by name), so every
+    selection order of the same set yields the same table and figures.
+    """
+    score_col = COLUMNAS_SCORE[escenario]
+    indice = obtener_indice_productos(df, version)
+    df_comp = indice.filas(df, productos)
+    df_comp = df_comp.iloc[np.lexsort((df_comp['Producto'].to_numpy(), -df_comp[score_col].to_numpy()))]
+    nombres = tuple(df_comp['Producto'])
+
+    barras = px.bar(
+        df_comp,
+        x='Producto',
+        y=score_col,
+        color=score_col,
+        color_continuous_scale='RdYlGn',
+        text=score_col
+    )
+    barras.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    barras.update_layout(
+        xaxis_title="",
+        yaxis_title="Score de Sustentabilidad",
+        showlegend=False,
+        height=400
+    )
+
+    normalizados = obtener_normalizados(df, version, escenario)
+    radar = go.Figure()
+    for idx, producto in enumerate(nombres):
+        radar.add_trace(go.Scatterpolar(
+            r=normalizados.iloc[indice.posicion(producto)].tolist(),
+            theta=ETIQUETAS_INDICADORES,
+            fill='toself',
+            name=producto,
+            line_color=COLORES_COMPARACION[idx % len(COLORES_COMPARACION)]
+        ))
+    radar.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=True,
+        height=500
+    )
+
+    tabla = congelar_dataframe(tabla_comparacion(df_comp, score_col).reset_index(drop=True))
+    return Comparacion(nombres, tabla, barras.to_json(), radar.to_json())
+
+class CacheComparaciones:
+    """
+    Bounded LRU of rendered comparisons for one session.
+
+    Keys are the dataset version, the scenario, the frozenset of selected
+    products and clave_normalizacion (the radar uses normalized data), so
+    reordering or re-selecting the same products is a lookup.
+    The least recently used entry is evicted once ``max_entradas`` is reached.
+    Streamlit runs one script at a time per session, so no lock is needed.
+    """
+
+    def __init__(self, max_entradas: int = 16):
+        if max_entradas < 1:
+            raise ValueError("max_entradas must be positive")
+        self.max_entradas = max_entradas
+        self._datos: OrderedDict = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, df: pd.DataFrame, version: str, escenario: str,
+                productos: Iterable[str]) -> Comparacion:
+        """Cached construir_comparacion (same arguments and return value)."""
+        productos = frozenset(productos)
+        clave = (version, escenario, productos, clave_normalizacion())
+        comparacion = self._datos.get(clave)
+        if comparacion is not None:
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return comparacion
+
+        self.fallos += 1
+        comparacion = construir_comparacion(df, version, escenario, productos)
+        self._datos[clave] = comparacion
+        while len(self._datos) > self.max_entradas:
+            self._datos.popitem(last=False)
+            self.desalojos += 1
+        return comparacion
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Counters, current size and hit rate."""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'entradas': len(self._datos),
+            'max_entradas': self.max_entradas,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+        }
+
+    def limpiar(self):
+        """Drop every entry."""
+        self._datos.clear()
+
+def cache_comparaciones() -> CacheComparaciones:
+    """Comparison cache of the current session (created on first use)."""
+    if 'cache_comparaciones' not in st.session_state:
+        st.session_state['cache_comparaciones'] = CacheComparaciones()
+    return st.session_state['cache_comparaciones']
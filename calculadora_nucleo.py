@@ -0,0 +1,3413 @@
+"""
+CALCULADORA DE SOSTENIBILIDAD ALIMENTARIA - NÚCLEO
+Cálculo de scores, índices, rankings y carga de datos (sin interfaz).
+
+Lo comparten el punto de entrada (app_calculadora_sostenibilidad_v2.py) y las
+páginas de paginas/. No construye figuras: Plotly Express y graph_objects solo
+los cargan calculadora_graficos.py y las páginas con gráficos.
+
+Autor: Laura Ochoa M.
+Fecha: Enero 2026
+Versión: 3.0 (42 productos)
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import atexit
+import bisect
+import difflib
+import hashlib
+import heapq
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from io import BytesIO
+from itertools import combinations, islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+try:  # Optional accelerated backend for batch scoring
+    import numba
+except ImportError:
+    numba = None
+
+# ============================================================================
+# ESTILOS CSS
+# ============================================================================
+
+# Stylesheet served from ./static when server.enableStaticServing is on
+# (see .streamlit/config.toml); otherwise it is inlined
+RUTA_ESTILOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'estilos_confluence.css')
+
+@st.cache_resource(show_spinner=False)
+def cargar_estilos(ruta: str = RUTA_ESTILOS) -> Tuple[str, str]:
+    """Read the stylesheet once per process: (css, short content hash)."""
+    with open(ruta, encoding='utf-8') as f:
+        css = f.read()
+    return css, hashlib.sha1(css.encode('utf-8')).hexdigest()[:12]
+
+def etiqueta_estilos(ruta: str = RUTA_ESTILOS, estatico: Optional[bool] = None) -> str:
+    """
+    HTML that applies the app stylesheet on every script run.
+
+    With static serving the page gets a ~100-byte <link> to the file, which
+    the browser fetches once and keeps in its cache (the content hash in the
+    URL changes whenever the CSS does); otherwise the CSS is inlined.
+
+    Args:
+        ruta: Stylesheet inside the app's static directory
+        estatico: Force static serving on/off (default: server config)
+
+    Returns:
+        <link> or <style> tag
+    """
+    css, huella = cargar_estilos(ruta)
+    if estatico is None:
+        estatico = bool(st.get_option('server.enableStaticServing'))
+    if estatico:
+        return f'<link rel="stylesheet" href="app/static/{os.path.basename(ruta)}?v={huella}">'
+    return f"<style>\n{css}</style>"
+
+# ============================================================================
+# FUNCIONES AUXILIARES
+# ============================================================================
+
+# Configuration Constants for Sustainability Scoring System
+# These ranges are based on the dataset of 42 food products
+
+INDICATOR_RANGES: Dict[str, Tuple[float, float]] = {
+    'CF': (0.28, 60.0),      # Carbon Footprint: Min: Guayaba (0.28), Max: Res (60.0)
+    'WF': (131, 18900),      # Water Footprint: Min: Zanahoria (131), Max: Café (18,900)
+    'LU': (0.18, 326),       # Land Use: Min: Papaya (0.18), Max: Res (326)
+    'Origin': (0, 100),      # Origin Score: Local (0) to Imported (100)
+    'Waste': (0.4, 45.5),    # Waste Percentage: Min: Sandía (0.4), Max: Uva (45.5)
+    'NOVA': (1, 4)           # Processing Level: Unprocessed (1) to Ultra-processed (4)
+}
+
+# Indicator order used by the vectorized (bulk) computations
+INDICADORES: Tuple[str, ...] = ('CF', 'WF', 'LU', 'Origin', 'Waste', 'NOVA')
+
+# Dataset column holding the raw value of each indicator
+COLUMNAS_INDICADORES: Dict[str, str] = {
+    'CF': 'CF_kgCO2eq_kg',
+    'WF': 'WF_L_kg',
+    'LU': 'LU_m2_kg',
+    'Origin': 'Origin_Score',
+    'Waste': 'Waste_pct',
+    'NOVA': 'NOVA'
+}
+
+# Catch-all group of unrelated and unknown products; its members are not
+# interchangeable, so the substitution optimizer never swaps within it
+CATEGORIA_OTROS = 'Otros'
+
+# Food group of each product (same labels as productos_robustos_consenso.csv);
+# a 'Categoría' column in the dataset takes precedence
+CATEGORIAS_PRODUCTO: Dict[str, str] = {
+    **dict.fromkeys(['Tomate', 'Cebolla', 'Papa', 'Lechuga', 'Zanahoria', 'Calabaza',
+                     'Chile', 'Pepino'], 'Vegetales'),
+    **dict.fromkeys(['Manzana', 'Naranja', 'Plátano', 'Limón', 'Aguacate', 'Mango',
+                     'Sandía', 'Piña', 'Guayaba', 'Melón', 'Uva', 'Papaya'], 'Frutas'),
+    **dict.fromkeys(['Frijol', 'Lenteja', 'Garbanzo', 'Soya'], 'Leguminosas'),
+    **dict.fromkeys(['Maíz tortilla', 'Arroz', 'Trigo pan', 'Avena', 'Pasta'], 'Cereales'),
+    **dict.fromkeys(['Leche', 'Queso fresco', 'Queso maduro', 'Yogurt', 'Mantequilla'], 'Lácteos'),
+    **dict.fromkeys(['Pollo', 'Res', 'Cerdo', 'Pescado', 'Huevo'], 'Proteína Animal'),
+    **dict.fromkeys(['Aceite vegetal', 'Azúcar', 'Café'], CATEGORIA_OTROS)
+}
+
+# Weight configurations for different scenarios
+# Scenario A: Original Mexico methodology (Waste weight: 25%)
+SCENARIO_A_WEIGHTS: Dict[str, float] = {
+    'CF': 0.15,      # Carbon footprint
+    'WF': 0.15,      # Water footprint
+    'LU': 0.10,      # Land use
+    'Origin': 0.20,  # Origin
+    'Waste': 0.25,   # Waste percentage
+    'NOVA': 0.15     # Processing level
+}
+
+# Scenario B: Adjusted Mexico methodology (Waste weight: 30%)
+SCENARIO_B_WEIGHTS: Dict[str, float] = {
+    'CF': 0.14,      # Carbon footprint
+    'WF': 0.14,      # Water footprint
+    'LU': 0.09,      # Land use
+    'Origin': 0.18,  # Origin
+    'Waste': 0.30,   # Waste percentage (increased emphasis)
+    'NOVA': 0.15     # Processing level
+}
+
+# Scenario configuration mapping
+SCENARIOS: Dict[str, Dict[str, float]] = {
+    'A': SCENARIO_A_WEIGHTS,
+    'B': SCENARIO_B_WEIGHTS
+}
+
+# Dataset column holding the precomputed score of each scenario
+COLUMNAS_SCORE: Dict[str, str] = {
+    'A': 'Score_México',
+    'B': 'Score_México_B'
+}
+
+def congelar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a DataFrame backed by read-only NumPy arrays.
+
+    Used for objects shared by every session of a worker through
+    ``st.cache_resource``: an accidental in-place write to a numeric column
+    raises ``ValueError`` instead of silently changing the data of other
+    sessions. Callers derive new frames (``copy``, ``assign``, filters).
+
+    Args:
+        df: DataFrame to freeze
+
+    Returns:
+        New DataFrame sharing no writable numeric buffers with ``df``
+    """
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if isinstance(serie.dtype, np.dtype):
+            valores = serie.to_numpy(copy=True)
+            valores.flags.writeable = False
+            columnas[columna] = valores
+        else:
+            columnas[columna] = serie.array
+    return pd.DataFrame(columnas, index=df.index, copy=False)
+
+@st.cache_resource(show_spinner=False)
+def cargar_datos():
+    """
+    Carga el dataset de productos con scores de ambos escenarios.
+
+    Se comparte una sola copia de solo lectura entre todas las sesiones del
+    proceso (st.cache_resource no copia el resultado para cada sesión).
+    
+    Si CALCULADORA_CATALOGO_COMPARTIDO apunta a un directorio publicado con
+    publicar_catalogo.py, el catálogo se adjunta sin copia desde memoria
+    compartida en lugar de leer el CSV, y los índices de ranking de esa
+    versión se construyen con los órdenes publicados.
+    
+    Si CALCULADORA_SQLITE apunta a una base creada con
+    importar_catalogo_sqlite.py, el catálogo se lee completo de ahí (debe
+    caber en memoria, como el CSV).
+    
+    El CSV se valida contra ESQUEMA_DATASET antes de usarse; si falla, se
+    muestran todos los problemas encontrados y no se carga.
+    
+    Devuelve (df, versión) o None. La versión (version_dataset) se calcula
+    una sola vez al cargar, no en cada ejecución del script.
+    """
+    try:
+        directorio_compartido = os.environ.get('CALCULADORA_CATALOGO_COMPARTIDO')
+        if directorio_compartido:
+            catalogo = adjuntar_catalogo(directorio_compartido)
+            if catalogo is not None:
+                # Los rankings publicados se adjuntan también: no se vuelven a ordenar
+                obtener_indices_ranking(catalogo.df, catalogo.version, catalogo.rankings)
+                return catalogo.df, catalogo.version
+        
+        ruta_sqlite = os.environ.get('CALCULADORA_SQLITE')
+        if ruta_sqlite:
+            df = obtener_almacen(ruta_sqlite).cargar_dataframe()
+            if len(df) > 0:
+                df = congelar_dataframe(exigir_esquema(df))
+                return df, version_dataset(df)
+        
+        rutas = [
+            'dataset_con_scores_A_y_B.csv',
+            '/mnt/user-data/outputs/dataset_con_scores_A_y_B.csv',
+            '/home/claude/dataset_con_scores_A_y_B.csv',
+            '/mnt/project/dataset_con_scores_A_y_B.csv'
+        ]
+
+        for ruta in rutas:
+            try:
+                df = pd.read_csv(ruta)
+            except Exception:
+                continue
+            
+            reporte = validar_esquema(df)
+            if len(reporte) > 0:
+                st.error(f"⚠️ El dataset {ruta} no pasó la validación ({len(reporte)} problemas):\n\n"
+                         f"{resumir_reporte(reporte)}")
+                return None
+            df = congelar_dataframe(df)
+            return df, version_dataset(df)
+
+        st.error("⚠️ No se pudo cargar el dataset. Asegúrate de tener el archivo CSV.")
+        return None
+    except Exception as e:
+        st.error(f"Error al cargar datos: {e}")
+        return None
+
+def normalizar_inverso(valor: float, min_val: float, max_val: float) -> float:
+    """
+    Normalize values where lower is better, using inverse scaling (0-100).
+
+    This function converts raw indicator values to a 0-100 scale where:
+    - 100 = best (lowest raw value)
+    - 0 = worst (highest raw value)
+
+    Args:
+        valor: The raw value to normalize
+        min_val: Minimum value in the range (best case)
+        max_val: Maximum value in the range (worst case)
+
+    Returns:
+        Normalized score on 0-100 scale (higher is better)
+
+    Example:
+        >>> normalizar_inverso(5.0, 0.0, 10.0)  # Value halfway between min and max
+        50.0
+    """
+    if max_val == min_val:
+        return 50.0
+    return 100.0 - ((valor - min_val) / (max_val - min_val) * 100.0)
+
+def calcular_score_producto(
+    cf: float,
+    wf: float,
+    lu: float,
+    origin: float,
+    waste: float,
+    nova: int,
+    escenario: str = 'A'
+) -> Tuple[float, Dict[str, float]]:
+    """
+    Calculate the sustainability score of a food product using a multi-criteria approach.
+
+    This function evaluates food sustainability across 6 environmental indicators:
+    - Carbon Footprint (CF): kg CO₂ emissions per kg of product
+    - Water Footprint (WF): Liters of water per kg of product
+    - Land Use (LU): Square meters of land per kg of product
+    - Origin: Origin score (0=Local, 50=Regional, 100=Imported)
+    - Waste: Waste percentage from farm to table
+    - NOVA: Processing level (1=Unprocessed to 4=Ultra-processed)
+
+    Each indicator is normalized to a 0-100 scale (where higher = more sustainable)
+    and weighted according to the selected scenario methodology.
+
+    Args:
+        cf: Carbon footprint in kg CO₂ equivalents per kg of product
+        wf: Water footprint in liters per kg of product
+        lu: Land use in square meters per kg of product
+        origin: Origin score (0=Local Sonora, 50=Regional Mexico, 100=Imported)
+        waste: Waste percentage (0-100)
+        nova: NOVA processing level (1=Natural, 2=Processed, 3=Highly processed, 4=Ultra-processed)
+        escenario: Scenario methodology ('A' for original weights, 'B' for adjusted weights)
+
+    Returns:
+        Tuple containing:
+        - score: Overall sustainability score (0-100, where higher is more sustainable)
+        - normalized_values: Dictionary with normalized scores for each indicator
+
+    Raises:
+        KeyError: If an invalid scenario is provided
+
+    Example:
+        >>> score, details = calcular_score_producto(
+        ...     cf=2.0, wf=500, lu=1.5, origin=0, waste=10.0, nova=1, escenario='A'
+        ... )
+        >>> print(f"Sustainability Score: {score:.2f}")
+        Sustainability Score: 85.30
+    """
+    # Validate scenario
+    if escenario not in SCENARIOS:
+        raise ValueError(f"Invalid scenario: {escenario}. Must be 'A' or 'B'.")
+
+    # Normalize each indicator using the global ranges
+    # Lower raw values are better, so we use inverse normalization (100 - normalized)
+    normalized_values = {
+        'CF': normalizar_inverso(cf, *INDICATOR_RANGES['CF']),
+        'WF': normalizar_inverso(wf, *INDICATOR_RANGES['WF']),
+        'LU': normalizar_inverso(lu, *INDICATOR_RANGES['LU']),
+        'Origin': normalizar_inverso(origin, *INDICATOR_RANGES['Origin']),
+        'Waste': normalizar_inverso(waste, *INDICATOR_RANGES['Waste']),
+        'NOVA': normalizar_inverso(nova, *INDICATOR_RANGES['NOVA'])
+    }
+
+    # Get the weight configuration for the selected scenario
+    weights = SCENARIOS[escenario]
+
+    # Calculate weighted score
+    score = sum(
+        normalized_values[indicator] * weights[indicator]
+        for indicator in weights.keys()
+    )
+
+    return score, normalized_values
+
+def clasificar_score(score: float) -> Tuple[str, str]:
+    """
+    Classify a sustainability score into categorical ratings.
+
+    Args:
+        score: Sustainability score (0-100)
+
+    Returns:
+        Tuple of (classification_label, emoji_indicator):
+        - 'Excelente' (🟢): score >= 90
+        - 'Muy Bueno' (🟢): score >= 80
+        - 'Bueno' (🟡): score >= 70
+        - 'Moderado' (🟠): score >= 60
+        - 'Bajo' (🔴): score < 60
+
+    Example:
+        >>> clasificar_score(85.5)
+        ('Muy Bueno', '🟢')
+    """
+    if score >= 90:
+        return 'Excelente', '🟢'
+    elif score >= 80:
+        return 'Muy Bueno', '🟢'
+    elif score >= 70:
+        return 'Bueno', '🟡'
+    elif score >= 60:
+        return 'Moderado', '🟠'
+    else:
+        return 'Bajo', '🔴'
+
+def exportar_resultados_excel(df, escenario='A'):
+    """Exporta resultados a Excel"""
+    output = BytesIO()
+    
+    score_col = 'Score_México' if escenario == 'A' else 'Score_México_B'
+    
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        # Hoja 1: Ranking completo
+        df_export = df[['Producto', 'CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg',
+                       'Origin_Score', 'Waste_pct', 'NOVA', score_col]].copy()
+        df_export = df_export.sort_values(score_col, ascending=False)
+        df_export.to_excel(writer, sheet_name='Ranking_Completo', index=False)
+        
+        # Hoja 2: Top 15
+        top15 = df.nlargest(15, score_col)[['Producto', score_col]]
+        top15.to_excel(writer, sheet_name='Top_15', index=False)
+        
+        # Hoja 3: Bottom 10
+        bottom10 = df.nsmallest(10, score_col)[['Producto', score_col]]
+        bottom10.to_excel(writer, sheet_name='Menos_Sostenibles', index=False)
+    
+    output.seek(0)
+    return output
+
+# ============================================================================
+# MEMO DE SCORES
+# ============================================================================
+
+class MemoScores:
+    """
+    Bounded, thread-safe LRU memo around calcular_score_producto.
+
+    Keys are the six indicators rounded to ``decimales`` places plus the
+    scenario, and the score is computed from those rounded inputs, so a key
+    always maps to the same result. The least recently used entry is evicted
+    once ``max_entradas`` is reached. Hit, miss and eviction counters are
+    cumulative; one lock guards the table, and scoring runs outside it.
+    """
+
+    def __init__(self, max_entradas: int = 4096, decimales: int = 6):
+        if max_entradas < 1:
+            raise ValueError("max_entradas must be positive")
+        self.max_entradas = max_entradas
+        self.decimales = decimales
+        self._datos: OrderedDict = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def clave(self, cf: float, wf: float, lu: float, origin: float, waste: float,
+              nova: int, escenario: str = 'A') -> Tuple:
+        """Quantized cache key of one product evaluation."""
+        d = self.decimales
+        return (round(float(cf), d), round(float(wf), d), round(float(lu), d),
+                round(float(origin), d), round(float(waste), d), round(float(nova), d), escenario)
+
+    def calcular(self, cf: float, wf: float, lu: float, origin: float, waste: float,
+                 nova: int, escenario: str = 'A') -> Tuple[float, Dict[str, float]]:
+        """Memoized calcular_score_producto (same arguments and return value)."""
+        clave = self.clave(cf, wf, lu, origin, waste, nova, escenario)
+        with self._candado:
+            resultado = self._datos.get(clave)
+            if resultado is not None:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return resultado[0], dict(resultado[1])
+            self.fallos += 1
+
+        resultado = calcular_score_producto(*clave)
+        with self._candado:
+            self._datos[clave] = resultado
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+        return resultado[0], dict(resultado[1])
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Counters, current size and hit rate."""
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+                'entradas': len(self._datos),
+                'max_entradas': self.max_entradas,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+            }
+
+    def limpiar(self):
+        """Drop every entry (e.g. after the indicator ranges change)."""
+        with self._candado:
+            self._datos.clear()
+
+# Process-wide memo shared by every session
+MEMO_SCORES = MemoScores()
+
+def calcular_score_memo(cf: float, wf: float, lu: float, origin: float, waste: float,
+                        nova: int, escenario: str = 'A') -> Tuple[float, Dict[str, float]]:
+    """calcular_score_producto through the shared LRU memo."""
+    return MEMO_SCORES.calcular(cf, wf, lu, origin, waste, nova, escenario)
+
+# ============================================================================
+# SCORER COMPILADO
+# ============================================================================
+
+class ScorerCompilado:
+    """
+    calcular_score_producto folded into one affine function per scenario.
+
+    With the linear inverse normalization each weighted term is affine in
+    its raw indicator, so the whole score is ``offset + dot(raw, coef)``
+    with constants computed once from INDICATOR_RANGES and the scenario
+    weights. Raw values are ordered as INDICADORES (CF, WF, LU, Origin,
+    Waste, NOVA); results match calcular_score_producto up to float rounding.
+
+    Example:
+        >>> scorer = compilar_scorer('A')
+        >>> scorer(2.0, 500, 1.5, 0, 10.0, 1)   # one product
+        >>> scorer.dataframe(df)                 # every row of a dataset
+    """
+
+    def __init__(self, escenario: str = 'A', rangos: Optional[Dict[str, Tuple[float, float]]] = None):
+        if escenario not in SCENARIOS:
+            raise ValueError(f"Invalid scenario: {escenario}. Must be one of {list(SCENARIOS)}.")
+        if rangos is None:
+            rangos = INDICATOR_RANGES
+        pesos = SCENARIOS[escenario]
+
+        self.escenario = escenario
+        offset = 0.0
+        coef = []
+        base = []
+        for indicador in INDICADORES:
+            minimo, maximo = rangos[indicador]
+            peso = pesos[indicador]
+            if maximo == minimo:
+                base.append(50.0 * peso)
+                coef.append(0.0)
+            else:
+                escala = 100.0 / (maximo - minimo)
+                base.append(peso * (100.0 + minimo * escala))
+                coef.append(-peso * escala)
+            offset += base[-1]
+
+        self.offset = offset
+        self.coef = np.array(coef)
+        self.coef.flags.writeable = False
+        self._c = tuple(coef)
+
+        # Per-indicator weighted terms for the fused kernel:
+        # weight * clip(normalized, 0, 100) = clip(base + coef * raw, 0, techo)
+        self._base32 = np.array(base, dtype=np.float32)
+        self._coef32 = self.coef.astype(np.float32)
+        self._techo32 = np.array([100.0 * pesos[i] for i in INDICADORES], dtype=np.float32)
+
+    def __call__(self, cf: float, wf: float, lu: float, origin: float, waste: float, nova: float) -> float:
+        """Score one product (plain Python arithmetic, no array overhead)."""
+        c = self._c
+        return (self.offset + c[0] * cf + c[1] * wf + c[2] * lu
+                + c[3] * origin + c[4] * waste + c[5] * nova)
+
+    def lote(self, valores: np.ndarray) -> np.ndarray:
+        """Score many products: ``valores`` has shape (n_products, 6)."""
+        return self.offset + np.asarray(valores, dtype=float) @ self.coef
+
+    def dataframe(self, df: pd.DataFrame) -> np.ndarray:
+        """Score every row of a dataset with the COLUMNAS_INDICADORES columns."""
+        return self.lote(df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=float))
+
+    def lote_fusionado(
+        self,
+        valores: np.ndarray,
+        recortar: bool = True,
+        backend: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalize, clip, weight and classify a batch in one fused pass.
+
+        Works on a C-contiguous float32 copy of ``valores`` (shape
+        (n_products, 6), INDICADORES order). With ``recortar`` each
+        normalized indicator is clipped to 0-100, so out-of-range raw values
+        cannot push a score beyond its bounds; without it the result equals
+        ``lote`` in float32.
+
+        Args:
+            valores: Raw indicators, one row per product
+            recortar: Clip normalized indicators to 0-100
+            backend: 'numba' or 'numpy' (default: BACKEND_FUSIONADO)
+
+        Returns:
+            Tuple (float32 scores, int8 class codes indexing CLASES_SCORE)
+
+        Raises:
+            ValueError: If the backend is unknown or unavailable
+        """
+        backend = backend or BACKEND_FUSIONADO
+        valores = np.ascontiguousarray(valores, dtype=np.float32)
+        if valores.ndim != 2 or valores.shape[1] != len(INDICADORES):
+            raise ValueError(f"Expected an array of shape (n, {len(INDICADORES)}), got {valores.shape}")
+        scores = np.empty(len(valores), dtype=np.float32)
+        clases = np.empty(len(valores), dtype=np.int8)
+
+        if backend == 'numba':
+            if _kernel_fusionado_numba is None:
+                raise ValueError("The numba backend requires the optional 'numba' package")
+            _kernel_fusionado_numba(valores, self._base32, self._coef32, self._techo32,
+                                    recortar, scores, clases)
+        elif backend == 'numpy':
+            _kernel_fusionado_numpy(valores, self._base32, self._coef32, self._techo32,
+                                    recortar, scores, clases)
+        else:
+            raise ValueError(f"Unknown backend: {backend}. Must be 'numba' or 'numpy'.")
+        return scores, clases
+
+def _kernel_fusionado(valores, base, coef, techo, recortar, scores, clases):
+    """
+    Fused loop: one pass over the rows, no temporaries (compiled with numba).
+
+    Class codes follow CLASES_SCORE: 0 Excelente ... 4 Bajo (also for NaN,
+    as clasificar_score).
+    """
+    for i in range(valores.shape[0]):
+        total = np.float32(0.0)
+        for j in range(valores.shape[1]):
+            termino = base[j] + coef[j] * valores[i, j]
+            if recortar:
+                if termino < 0:
+                    termino = np.float32(0.0)
+                elif termino > techo[j]:
+                    termino = techo[j]
+            total += termino
+        scores[i] = total
+        if total >= 90:
+            clases[i] = 0
+        elif total >= 80:
+            clases[i] = 1
+        elif total >= 70:
+            clases[i] = 2
+        elif total >= 60:
+            clases[i] = 3
+        else:
+            clases[i] = 4
+
+def _kernel_fusionado_numpy(valores, base, coef, techo, recortar, scores, clases, bloque=65536):
+    """
+    NumPy fallback of _kernel_fusionado.
+
+    Works block by block with preallocated buffers and in-place ufuncs, so
+    memory stays at a few block-sized float32 arrays whatever the batch size.
+    """
+    termino = np.empty(bloque, dtype=np.float32)
+    umbral = np.empty(bloque, dtype=bool)
+    for inicio in range(0, len(valores), bloque):
+        fin = min(inicio + bloque, len(valores))
+        total = scores[inicio:fin]
+        t = termino[:fin - inicio]
+        total.fill(0.0)
+        for j in range(valores.shape[1]):
+            np.multiply(valores[inicio:fin, j], coef[j], out=t)
+            t += base[j]
+            if recortar:
+                np.clip(t, 0.0, techo[j], out=t)
+            total += t
+
+        codigo = clases[inicio:fin]
+        codigo.fill(4)
+        u = umbral[:fin - inicio]
+        for limite in (60, 70, 80, 90):
+            np.greater_equal(total, limite, out=u)
+            codigo -= u
+
+_kernel_fusionado_numba = numba.njit(cache=True)(_kernel_fusionado) if numba is not None else None
+
+# Default backend of ScorerCompilado.lote_fusionado
+BACKEND_FUSIONADO = 'numba' if numba is not None else 'numpy'
+
+def puntuar_y_clasificar(
+    valores: np.ndarray,
+    escenario: str = 'A',
+    recortar: bool = True,
+    backend: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fused batch scoring and classification with the scenario's compiled scorer."""
+    return compilar_scorer(escenario).lote_fusionado(valores, recortar, backend)
+
+_SCORERS_COMPILADOS: Dict[str, ScorerCompilado] = {}
+
+def compilar_scorer(escenario: str = 'A') -> ScorerCompilado:
+    """Compiled scorer of a scenario for the current ranges (built once, reused)."""
+    scorer = _SCORERS_COMPILADOS.get(escenario)
+    if scorer is None:
+        scorer = _SCORERS_COMPILADOS[escenario] = ScorerCompilado(escenario)
+    return scorer
+
+# ============================================================================
+# ÍNDICE DE PRODUCTOS
+# ============================================================================
+
+def version_dataset(df: pd.DataFrame) -> str:
+    """
+    Return a content fingerprint that identifies a dataset version.
+
+    Derived caches (lookup indexes, rankings, ...) are keyed on this value so
+    they are rebuilt only when the data actually changes.
+
+    Args:
+        df: Product dataset
+
+    Returns:
+        Short hexadecimal digest of the row hashes (order-sensitive)
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+# Maximum number of options sent to a product selector on each rerun
+MAX_OPCIONES_SELECTOR = 200
+
+def _clave_busqueda(nombre: str) -> str:
+    """
+    Normalize a product name for case-, accent- and whitespace-insensitive search.
+
+    Example:
+        >>> _clave_busqueda('  Plátano ')
+        'platano'
+    """
+    descompuesto = unicodedata.normalize('NFKD', str(nombre).casefold())
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_acentos.split())
+
+def _trigramas(clave: str) -> set:
+    """Return the padded character trigrams of a search key."""
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+class IndiceProductos:
+    """
+    Read-only lookup index over the product names of a dataset.
+
+    Maps each product name to the position of its first row, so single
+    lookups and multi-product selections are O(1) per product instead of a
+    boolean mask over the whole ``Producto`` column. It also supports prefix
+    search (bisect over sorted keys), fuzzy search (trigram candidates
+    ranked by similarity) and ranked autocomplete for large catalogs. All
+    searches ignore case and accents ("limon" finds "Limón").
+
+    Example:
+        >>> indice = IndiceProductos(['Tomate', 'Papa', 'Papaya'])
+        >>> indice.posicion('Papa')
+        1
+        >>> indice.buscar_prefijo('pap')
+        ['Papa', 'Papaya']
+    """
+
+    def __init__(self, productos: Sequence[str]):
+        self._posiciones: Dict[str, int] = {}
+        for posicion, nombre in enumerate(productos):
+            self._posiciones.setdefault(nombre, posicion)
+
+        # Sorted names feed the selectboxes without re-sorting on every rerun
+        self.nombres: List[str] = sorted(self._posiciones)
+
+        pares = sorted((_clave_busqueda(nombre), nombre) for nombre in self.nombres)
+        self._claves: List[str] = [clave for clave, _ in pares]
+        self._nombres_por_clave: List[str] = [nombre for _, nombre in pares]
+
+        # Every word of every name, so "tortilla" finds "Maíz tortilla"
+        palabras = sorted(
+            (palabra, i)
+            for i, clave in enumerate(self._claves)
+            for palabra in set(clave.split())
+        )
+        self._palabras: List[str] = [palabra for palabra, _ in palabras]
+        self._palabras_pos: List[int] = [i for _, i in palabras]
+
+        self._trigramas: Dict[str, List[int]] = defaultdict(list)
+        for i, clave in enumerate(self._claves):
+            for trigrama in _trigramas(clave):
+                self._trigramas[trigrama].append(i)
+
+    def __len__(self) -> int:
+        return len(self._posiciones)
+
+    def __contains__(self, nombre: object) -> bool:
+        return nombre in self._posiciones
+
+    def posicion(self, nombre: str) -> Optional[int]:
+        """Return the row position of a product, or None if it is unknown."""
+        return self._posiciones.get(nombre)
+
+    def posiciones(self, nombres: Iterable[str]) -> List[int]:
+        """Return the row positions of the known products, in input order."""
+        return [self._posiciones[n] for n in nombres if n in self._posiciones]
+
+    def fila(self, df: pd.DataFrame, nombre: str) -> pd.Series:
+        """
+        Return the dataset row of a product.
+
+        Raises:
+            KeyError: If the product is not in the index
+        """
+        return df.iloc[self._posiciones[nombre]]
+
+    def filas(self, df: pd.DataFrame, nombres: Iterable[str]) -> pd.DataFrame:
+        """Return the dataset rows of the known products, in input order."""
+        return df.iloc[self.posiciones(nombres)]
+
+    def buscar_prefijo(self, prefijo: str, limite: int = 20) -> List[str]:
+        """
+        Return product names starting with ``prefijo`` (case-insensitive).
+
+        Runs in O(log n + limite) using bisection over the sorted keys.
+        """
+        clave = _clave_busqueda(prefijo)
+        inicio = bisect.bisect_left(self._claves, clave)
+        resultados = []
+        for i in range(inicio, len(self._claves)):
+            if len(resultados) >= limite or not self._claves[i].startswith(clave):
+                break
+            resultados.append(self._nombres_por_clave[i])
+        return resultados
+
+    def buscar_similar(self, texto: str, limite: int = 10, umbral: float = 0.6) -> List[str]:
+        """
+        Return product names similar to ``texto``, best match first.
+
+        Candidates sharing the most trigrams with the query are shortlisted
+        through the inverted index and then ranked with a similarity ratio,
+        so the catalog is never scanned pairwise.
+
+        Args:
+            texto: Free-text query (may contain typos)
+            limite: Maximum number of results
+            umbral: Minimum similarity ratio (0-1) for a match
+
+        Returns:
+            List of matching product names
+        """
+        clave = _clave_busqueda(texto)
+        if not clave:
+            return []
+
+        comunes: Counter = Counter()
+        for trigrama in _trigramas(clave):
+            comunes.update(self._trigramas.get(trigrama, ()))
+
+        candidatos = [i for i, _ in comunes.most_common(max(limite * 5, 50))]
+        puntuados = []
+        for i in candidatos:
+            ratio = difflib.SequenceMatcher(None, clave, self._claves[i]).ratio()
+            if ratio >= umbral:
+                puntuados.append((-ratio, self._claves[i], self._nombres_por_clave[i]))
+        puntuados.sort()
+        return [nombre for _, _, nombre in puntuados[:limite]]
+
+    def autocompletar(self, texto: str, limite: int = 20) -> List[str]:
+        """
+        Return ranked matches for a partially typed product name.
+
+        Matches are ranked by tier and then by name length:
+        exact match, name prefix, word prefix, substring and finally fuzzy
+        matches when fewer than ``limite`` results were found. Prefix tiers
+        use bisection and substrings are resolved through the trigram index,
+        so the cost does not grow with a full scan of the catalog.
+
+        Args:
+            texto: Text typed by the user
+            limite: Maximum number of results
+
+        Returns:
+            List of product names, best match first
+
+        Example:
+            >>> IndiceProductos(['Limón', 'Melón', 'Lima']).autocompletar('lim')
+            ['Lima', 'Limón']
+        """
+        clave = _clave_busqueda(texto)
+        if not clave:
+            return self.nombres[:limite]
+
+        niveles: Dict[int, int] = {}
+
+        def agregar(i: int, nivel: int) -> None:
+            if nivel < niveles.get(i, 99):
+                niveles[i] = nivel
+
+        # Name prefix (includes the exact match)
+        inicio = bisect.bisect_left(self._claves, clave)
+        for i in range(inicio, len(self._claves)):
+            if not self._claves[i].startswith(clave):
+                break
+            agregar(i, 0 if self._claves[i] == clave else 1)
+
+        # Word prefix
+        inicio = bisect.bisect_left(self._palabras, clave)
+        for j in range(inicio, len(self._palabras)):
+            if not self._palabras[j].startswith(clave):
+                break
+            agregar(self._palabras_pos[j], 2)
+
+        # Substring: names containing every trigram of the query
+        if len(clave) >= 3:
+            listas = sorted(
+                (self._trigramas.get(clave[k:k + 3], []) for k in range(len(clave) - 2)),
+                key=len
+            )
+            candidatos = set(listas[0])
+            for lista in listas[1:]:
+                candidatos.intersection_update(lista)
+                if not candidatos:
+                    break
+            for i in candidatos:
+                if clave in self._claves[i]:
+                    agregar(i, 3)
+
+        ordenados = sorted(niveles, key=lambda i: (niveles[i], len(self._claves[i]), self._claves[i]))
+        resultados = [self._nombres_por_clave[i] for i in ordenados[:limite]]
+
+        if len(resultados) < limite:
+            vistos = set(resultados)
+            for nombre in self.buscar_similar(texto, limite=limite):
+                if nombre not in vistos:
+                    resultados.append(nombre)
+                    if len(resultados) >= limite:
+                        break
+        return resultados
+
+def opciones_producto(
+    indice: IndiceProductos,
+    busqueda: str,
+    seleccionados: Sequence[str] = (),
+    limite: int = MAX_OPCIONES_SELECTOR
+) -> List[str]:
+    """
+    Build the option list of a product selector from a search query.
+
+    Only the best ``limite`` matches are sent to the browser instead of the
+    whole catalog. Already selected products are kept first so multiselect
+    widgets do not lose their state when the query changes.
+
+    Args:
+        indice: Product lookup index
+        busqueda: Text typed in the search box (may be empty)
+        seleccionados: Products currently selected in the widget
+        limite: Maximum number of search matches
+
+    Returns:
+        List of product names for the widget options
+    """
+    opciones = [nombre for nombre in seleccionados if nombre in indice]
+    vistos = set(opciones)
+    for nombre in indice.autocompletar(busqueda, limite=limite):
+        if nombre not in vistos:
+            opciones.append(nombre)
+            vistos.add(nombre)
+    return opciones
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_indice_productos(_df: pd.DataFrame, version: str) -> IndiceProductos:
+    """
+    Build (once per dataset version) the shared product lookup index.
+
+    Args:
+        _df: Product dataset (not hashed; identified by ``version``)
+        version: Dataset fingerprint from ``version_dataset``
+
+    Returns:
+        IndiceProductos shared by all sessions
+    """
+    return IndiceProductos(_df['Producto'].tolist())
+
+# ============================================================================
+# KERNELS DE NORMALIZACIÓN
+# ============================================================================
+
+def _kernel_lineal(valores: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """Inverse min-max scaling, identical to ``normalizar_inverso`` (no clipping)."""
+    if max_val == min_val:
+        return np.full(valores.shape, 50.0)
+    return 100.0 - ((valores - min_val) / (max_val - min_val) * 100.0)
+
+def _kernel_lineal_recortado(valores: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """Inverse min-max scaling clipped to 0-100 for values outside the range."""
+    return np.clip(_kernel_lineal(valores, min_val, max_val), 0.0, 100.0)
+
+def _kernel_log(valores: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """
+    Inverse log scaling for heavy-tailed indicators (water, land use).
+
+    Uses log1p of the distance to the minimum, so the range bounds still map
+    to 100 and 0 while differences among small values are spread out.
+    """
+    if max_val == min_val:
+        return np.full(valores.shape, 50.0)
+    desplazados = np.clip(valores, min_val, max_val) - min_val
+    return 100.0 - (np.log1p(desplazados) / np.log1p(max_val - min_val) * 100.0)
+
+def _kernel_zscore(valores: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """
+    Inverse z-score relative to the batch: the mean maps to 50 and ±3
+    standard deviations map to 0/100 (clipped). The range is not used.
+
+    The result depends on the whole batch, so it is only meaningful for a
+    catalog; a single product always maps to 50.
+    """
+    if len(valores) == 0:
+        return np.full(valores.shape, 50.0)
+    desviacion = valores.std()
+    if desviacion == 0:
+        return np.full(valores.shape, 50.0)
+    z = (valores - valores.mean()) / desviacion
+    return np.clip(50.0 - z * (50.0 / 3.0), 0.0, 100.0)
+
+def _kernel_percentil(valores: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
+    """
+    Inverse percentile rank relative to the batch (ties share their average
+    rank): the lowest value maps to 100 and the highest to 0. The range is
+    not used.
+
+    The result depends on the whole batch, so it is only meaningful for a
+    catalog; a single product always maps to 50.
+    """
+    if len(valores) < 2:
+        return np.full(valores.shape, 50.0)
+    rangos = pd.Series(valores).rank(method='average').to_numpy()
+    return 100.0 - ((rangos - 1.0) / (len(valores) - 1.0) * 100.0)
+
+# Registry of vectorized normalization kernels: f(values, min, max) -> 0-100
+KERNELS_NORMALIZACION: Dict[str, Callable[[np.ndarray, float, float], np.ndarray]] = {
+    'lineal': _kernel_lineal,
+    'lineal_recortado': _kernel_lineal_recortado,
+    'log': _kernel_log,
+    'zscore': _kernel_zscore,
+    'percentil': _kernel_percentil
+}
+
+# Per-scenario kernel overrides ({indicator: kernel}); unlisted indicators
+# use 'lineal'. Example: {'A': {'WF': 'log', 'LU': 'log'}}
+# They apply to the batch tables only (normalized indicators, contributions,
+# category and regional scores, radar charts), never to calcular_score_producto
+# or the dataset scores; 'zscore' and 'percentil' need a whole catalog.
+NORMALIZACION_ESCENARIOS: Dict[str, Dict[str, str]] = {
+    'A': {},
+    'B': {}
+}
+
+def registrar_kernel_normalizacion(
+    nombre: str,
+    kernel: Callable[[np.ndarray, float, float], np.ndarray]
+) -> None:
+    """Register a custom vectorized normalization kernel under ``nombre``."""
+    KERNELS_NORMALIZACION[nombre] = kernel
+
+def clave_normalizacion() -> str:
+    """
+    Fingerprint of the current normalization configuration.
+
+    Covers INDICATOR_RANGES, NORMALIZACION_ESCENARIOS and the kernel object
+    registered under every name in use, so caches of normalized data keyed
+    on it (with the dataset version) are rebuilt when the configuration
+    changes at runtime.
+    """
+    partes = [f"{i}:{INDICATOR_RANGES[i][0]!r}:{INDICATOR_RANGES[i][1]!r}" for i in INDICADORES]
+    for escenario, estrategias in sorted(NORMALIZACION_ESCENARIOS.items()):
+        for indicador, nombre in sorted(estrategias.items()):
+            partes.append(f"{escenario}.{indicador}={nombre}@{id(KERNELS_NORMALIZACION.get(nombre)):x}")
+    partes.append(f"lineal@{id(KERNELS_NORMALIZACION.get('lineal')):x}")
+    return hashlib.sha1(';'.join(partes).encode('utf-8')).hexdigest()[:16]
+
+# ============================================================================
+# DESGLOSE DE CONTRIBUCIONES (CÁLCULO MASIVO)
+# ============================================================================
+
+def normalizar_indicadores(
+    df: pd.DataFrame,
+    estrategias: Optional[Dict[str, str]] = None
+) -> np.ndarray:
+    """
+    Normalize the six indicators of every product in one vectorized pass.
+
+    By default applies exactly the same inverse min-max formula as
+    ``normalizar_inverso`` (including the 50.0 value for degenerate ranges)
+    using ``INDICATOR_RANGES``.
+
+    Args:
+        df: Dataset with the raw indicator columns (see COLUMNAS_INDICADORES)
+        estrategias: Optional {indicator: kernel name} overrides; see
+            KERNELS_NORMALIZACION. Unlisted indicators use 'lineal'.
+
+    Returns:
+        Array of shape (n_products, 6) in INDICADORES order
+
+    Raises:
+        ValueError: If an unknown kernel is requested
+    """
+    estrategias = estrategias or {}
+    desconocidos = set(estrategias.values()) - set(KERNELS_NORMALIZACION)
+    if desconocidos:
+        raise ValueError(f"Unknown normalization kernel(s): {sorted(desconocidos)}")
+
+    valores = df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=float)
+
+    if not estrategias:
+        minimos = np.array([INDICATOR_RANGES[i][0] for i in INDICADORES], dtype=float)
+        maximos = np.array([INDICATOR_RANGES[i][1] for i in INDICADORES], dtype=float)
+        amplitud = maximos - minimos
+        degenerado = amplitud == 0
+        normalizado = 100.0 - ((valores - minimos) / np.where(degenerado, 1.0, amplitud) * 100.0)
+        normalizado[:, degenerado] = 50.0
+        return normalizado
+
+    normalizado = np.empty_like(valores)
+    for j, indicador in enumerate(INDICADORES):
+        kernel = KERNELS_NORMALIZACION[estrategias.get(indicador, 'lineal')]
+        normalizado[:, j] = kernel(valores[:, j], *INDICATOR_RANGES[indicador])
+    return normalizado
+
+def calcular_contribuciones(
+    df: pd.DataFrame,
+    escenarios: Optional[Sequence[str]] = None
+) -> np.ndarray:
+    """
+    Compute each indicator's weighted contribution for every product and scenario.
+
+    The contribution of an indicator is its normalized value times its
+    scenario weight, so contributions add up to the score recomputed with
+    calcular_score_producto under the current INDICATOR_RANGES. That is not
+    necessarily the score stored in the dataset: the published
+    Score_México_B column differs from the recomputed B score by up to ~3
+    points. This explains "why is this product ranked here" for the whole
+    catalog in a single vectorized computation. Each scenario is normalized
+    with its NORMALIZACION_ESCENARIOS kernels.
+
+    Args:
+        df: Dataset with the raw indicator columns
+        escenarios: Scenario keys (defaults to every scenario in SCENARIOS)
+
+    Returns:
+        Array of shape (n_scenarios, n_products, 6) in INDICADORES order
+
+    Raises:
+        ValueError: If an invalid scenario is provided
+
+    Example:
+        >>> tensor = calcular_contribuciones(df, ['A', 'B'])
+        >>> scores_a = tensor[0].sum(axis=1)
+    """
+    escenarios = list(SCENARIOS) if escenarios is None else list(escenarios)
+    for escenario in escenarios:
+        if escenario not in SCENARIOS:
+            raise ValueError(f"Invalid scenario: {escenario}. Must be one of {list(SCENARIOS)}.")
+
+    pesos = np.array(
+        [[SCENARIOS[e][i] for i in INDICADORES] for e in escenarios], dtype=float
+    )
+
+    # Scenarios sharing the same kernels share one normalization pass
+    normalizados: Dict[Tuple, np.ndarray] = {}
+    tensor = np.empty((len(escenarios), len(df), len(INDICADORES)))
+    for k, escenario in enumerate(escenarios):
+        estrategias = NORMALIZACION_ESCENARIOS.get(escenario, {})
+        clave = tuple(sorted(estrategias.items()))
+        if clave not in normalizados:
+            normalizados[clave] = normalizar_indicadores(df, estrategias)
+        tensor[k] = normalizados[clave] * pesos[k]
+    return tensor
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _normalizados(_df: pd.DataFrame, version: str, escenario: str, normalizacion: str) -> pd.DataFrame:
+    estrategias = NORMALIZACION_ESCENARIOS.get(escenario, {})
+    return congelar_dataframe(pd.DataFrame(
+        normalizar_indicadores(_df, estrategias), columns=list(INDICADORES),
+        index=_df['Producto'].to_numpy()
+    ))
+
+def obtener_normalizados(_df: pd.DataFrame, version: str, escenario: str = 'A') -> pd.DataFrame:
+    """
+    Cached, shared normalized indicators (products x INDICADORES) for a
+    dataset version and the current clave_normalizacion.
+    """
+    return _normalizados(_df, version, escenario, clave_normalizacion())
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _contribuciones(_df: pd.DataFrame, version: str, normalizacion: str) -> Dict[str, pd.DataFrame]:
+    escenarios = list(SCENARIOS)
+    tensor = calcular_contribuciones(_df, escenarios)
+    productos = _df['Producto'].to_numpy()
+    return {
+        escenario: congelar_dataframe(
+            pd.DataFrame(tensor[k], columns=list(INDICADORES), index=productos)
+        )
+        for k, escenario in enumerate(escenarios)
+    }
+
+def obtener_contribuciones(_df: pd.DataFrame, version: str) -> Dict[str, pd.DataFrame]:
+    """
+    Cached, shared contribution tables for every scenario of a dataset version.
+
+    Keyed on the dataset version and the current clave_normalizacion, so a
+    kernel or range change at runtime never serves stale tables.
+
+    Args:
+        _df: Product dataset (not hashed; identified by ``version``)
+        version: Dataset fingerprint from ``version_dataset``
+
+    Returns:
+        Dict mapping each scenario to a products x INDICADORES DataFrame
+        (indexed by product name) whose rows sum to the recomputed score
+        (see calcular_contribuciones), not necessarily the dataset score
+    """
+    return _contribuciones(_df, version, clave_normalizacion())
+
+# ============================================================================
+# CALIBRACIÓN DE RANGOS
+# ============================================================================
+
+# Schema version of the range config files written by CalibradorRangos
+VERSION_CONFIG_RANGOS = 1
+
+# Indicators whose range is fixed by definition, not by the data
+RANGOS_FIJOS: Tuple[str, ...] = ('Origin', 'NOVA')
+
+class CalibradorRangos:
+    """
+    One-pass streaming calibrator for INDICATOR_RANGES.
+
+    Consumes the catalog in chunks (DataFrames with the raw indicator
+    columns) and keeps, per indicator, the exact min/max plus a fixed-size
+    reservoir sample used to estimate robust quantile ranges. Memory is
+    bounded by ``tamano_muestra`` regardless of the catalog size.
+
+    Example:
+        >>> calibrador = CalibradorRangos()
+        >>> for chunk in pd.read_csv('catalogo.csv', chunksize=100_000):
+        ...     calibrador.actualizar(chunk)
+        >>> config = calibrador.config(metodo='cuantiles')
+    """
+
+    def __init__(self, tamano_muestra: int = 10_000, semilla: int = 0):
+        if tamano_muestra <= 0:
+            raise ValueError("tamano_muestra must be positive")
+        self.tamano_muestra = tamano_muestra
+        self.n = 0
+        self._rng = np.random.default_rng(semilla)
+        self._minimos = np.full(len(INDICADORES), np.inf)
+        self._maximos = np.full(len(INDICADORES), -np.inf)
+        self._muestra = np.empty((tamano_muestra, len(INDICADORES)))
+
+    def actualizar(self, df: pd.DataFrame) -> 'CalibradorRangos':
+        """
+        Add a chunk of products to the running statistics.
+
+        Rows with a missing indicator value are ignored.
+
+        Args:
+            df: Chunk with the raw indicator columns (see COLUMNAS_INDICADORES)
+
+        Returns:
+            The calibrator itself, to allow chaining
+        """
+        valores = df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=float)
+        valores = valores[~np.isnan(valores).any(axis=1)]
+        if len(valores) == 0:
+            return self
+
+        np.minimum(self._minimos, valores.min(axis=0), out=self._minimos)
+        np.maximum(self._maximos, valores.max(axis=0), out=self._maximos)
+
+        # Fill the reservoir first, then replace slots with probability k/(t+1)
+        libres = max(self.tamano_muestra - self.n, 0)
+        directos = valores[:libres]
+        self._muestra[self.n:self.n + len(directos)] = directos
+
+        resto = valores[libres:]
+        if len(resto):
+            t = self.n + len(directos) + np.arange(len(resto))
+            ranuras = self._rng.integers(0, t + 1)
+            aceptados = ranuras < self.tamano_muestra
+            self._muestra[ranuras[aceptados]] = resto[aceptados]
+
+        self.n += len(valores)
+        return self
+
+    def rangos(
+        self,
+        metodo: str = 'minmax',
+        q_bajo: float = 0.01,
+        q_alto: float = 0.99,
+        fijos: Sequence[str] = RANGOS_FIJOS
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Return the calibrated range of every indicator.
+
+        Args:
+            metodo: 'minmax' for exact extremes or 'cuantiles' for robust
+                ranges between the ``q_bajo`` and ``q_alto`` quantiles
+            q_bajo: Lower quantile (only for 'cuantiles')
+            q_alto: Upper quantile (only for 'cuantiles')
+            fijos: Indicators that keep their current INDICATOR_RANGES value
+
+        Returns:
+            Dictionary with the same structure as INDICATOR_RANGES
+
+        Raises:
+            ValueError: If no data was added or the method is unknown
+        """
+        if self.n == 0:
+            raise ValueError("No data: call actualizar() before rangos()")
+        if metodo == 'minmax':
+            bajos, altos = self._minimos, self._maximos
+        elif metodo == 'cuantiles':
+            if not 0.0 <= q_bajo < q_alto <= 1.0:
+                raise ValueError("Quantiles must satisfy 0 <= q_bajo < q_alto <= 1")
+            muestra = self._muestra[:min(self.n, self.tamano_muestra)]
+            bajos, altos = np.quantile(muestra, [q_bajo, q_alto], axis=0)
+        else:
+            raise ValueError(f"Invalid method: {metodo}. Must be 'minmax' or 'cuantiles'.")
+
+        return {
+            indicador: INDICATOR_RANGES[indicador] if indicador in fijos
+            else (float(bajos[j]), float(altos[j]))
+            for j, indicador in enumerate(INDICADORES)
+        }
+
+    def config(self, metodo: str = 'minmax', **kwargs) -> Dict:
+        """
+        Return a versioned range config ready to be saved as JSON.
+
+        The ``huella`` field fingerprints the ranges so caches and reports
+        can tell which calibration produced a score.
+        """
+        rangos = self.rangos(metodo, **kwargs)
+        serializados = {k: [v[0], v[1]] for k, v in rangos.items()}
+        huella = hashlib.sha1(
+            json.dumps(serializados, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        return {
+            'version': VERSION_CONFIG_RANGOS,
+            'huella': huella,
+            'metodo': metodo,
+            'productos': self.n,
+            'creado': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'rangos': serializados
+        }
+
+def calibrar_rangos_csv(ruta: str, chunksize: int = 100_000, **kwargs) -> CalibradorRangos:
+    """Stream a CSV catalog of any size through a CalibradorRangos."""
+    calibrador = CalibradorRangos(**kwargs)
+    for chunk in pd.read_csv(ruta, chunksize=chunksize):
+        calibrador.actualizar(chunk)
+    return calibrador
+
+def guardar_config_rangos(config: Dict, ruta: str) -> None:
+    """Write a range config produced by CalibradorRangos.config() to JSON."""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+def cargar_config_rangos(ruta: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Read and validate a range config file.
+
+    Args:
+        ruta: Path of a JSON file written by guardar_config_rangos
+
+    Returns:
+        Dictionary with the same structure as INDICATOR_RANGES
+
+    Raises:
+        ValueError: If the schema version, indicators or ranges are invalid
+    """
+    with open(ruta, encoding='utf-8') as f:
+        config = json.load(f)
+
+    if config.get('version') != VERSION_CONFIG_RANGOS:
+        raise ValueError(f"Unsupported range config version: {config.get('version')}")
+
+    rangos = config.get('rangos', {})
+    faltantes = set(INDICADORES) - set(rangos)
+    if faltantes:
+        raise ValueError(f"Range config is missing indicators: {sorted(faltantes)}")
+
+    resultado = {}
+    for indicador in INDICADORES:
+        minimo, maximo = (float(v) for v in rangos[indicador])
+        if not minimo <= maximo:
+            raise ValueError(f"Invalid range for {indicador}: ({minimo}, {maximo})")
+        resultado[indicador] = (minimo, maximo)
+    return resultado
+
+def aplicar_config_rangos(ruta: str) -> None:
+    """Load a range config file into INDICATOR_RANGES (used by every scorer)."""
+    INDICATOR_RANGES.update(cargar_config_rangos(ruta))
+    MEMO_SCORES.limpiar()
+    _SCORERS_COMPILADOS.clear()
+
+# Optional recalibrated ranges, e.g. CALCULADORA_RANGOS=rangos_indicadores.json
+if os.environ.get('CALCULADORA_RANGOS'):
+    aplicar_config_rangos(os.environ['CALCULADORA_RANGOS'])
+
+# ============================================================================
+# ORIGEN POR REGIÓN
+# ============================================================================
+
+# Region whose viewpoint the dataset Origin_Score already reflects
+REGION_BASE = 'Sonora (datos base)'
+
+# Distance thresholds (km) between the producing area and the consumer region
+UMBRAL_LOCAL_KM = 300.0       # Local: 0
+UMBRAL_REGIONAL_KM = 3500.0   # Regional (México): 50, farther: Imported (100)
+
+@st.cache_resource(show_spinner=False)
+def cargar_distancias_regionales():
+    """
+    Carga la tabla de distancias producto-región (opcional).
+
+    Formato largo con columnas Producto, Región, Distancia_km y opcionalmente
+    Importado (bool). Devuelve (tabla, versión) o None si no existe.
+    """
+    rutas = [
+        'distancias_regiones.csv',
+        '/mnt/user-data/outputs/distancias_regiones.csv',
+        '/home/claude/distancias_regiones.csv',
+        '/mnt/project/distancias_regiones.csv'
+    ]
+
+    for ruta in rutas:
+        try:
+            tabla = congelar_dataframe(pd.read_csv(ruta))
+            return tabla, version_dataset(tabla)
+        except Exception:
+            continue
+
+    return None
+
+def origen_por_distancia(
+    distancias_km: np.ndarray,
+    importado: Optional[np.ndarray] = None,
+    umbral_local: float = UMBRAL_LOCAL_KM,
+    umbral_regional: float = UMBRAL_REGIONAL_KM
+) -> np.ndarray:
+    """
+    Convert supply distances into Origin scores (0=Local, 50=Regional, 100=Imported).
+
+    Args:
+        distancias_km: Array of distances in km (NaN = unknown)
+        importado: Optional boolean array; True forces 100 (Imported)
+        umbral_local: Maximum distance considered local
+        umbral_regional: Maximum distance considered regional
+
+    Returns:
+        Array with the same shape as ``distancias_km`` (NaN where unknown)
+    """
+    distancias_km = np.asarray(distancias_km, dtype=float)
+    origen = np.where(distancias_km <= umbral_local, 0.0,
+                      np.where(distancias_km <= umbral_regional, 50.0, 100.0))
+    if importado is not None:
+        origen = np.where(np.asarray(importado, dtype=bool), 100.0, origen)
+    origen[np.isnan(distancias_km)] = np.nan
+    return origen
+
+def matriz_origen_regional(df: pd.DataFrame, distancias: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the product x region Origin score matrix from a distance table.
+
+    Pairs missing from the table keep the product's dataset Origin_Score
+    (the REGION_BASE viewpoint).
+
+    Args:
+        df: Product dataset
+        distancias: Long table with Producto, Región, Distancia_km and
+            optionally Importado
+
+    Returns:
+        DataFrame aligned with ``df`` rows (index = Producto), one column per region
+    """
+    distancia = distancias.pivot_table(
+        index='Producto', columns='Región', values='Distancia_km', aggfunc='min'
+    )
+    importado = None
+    if 'Importado' in distancias.columns:
+        importado = distancias.pivot_table(
+            index='Producto', columns='Región', values='Importado', aggfunc='max'
+        ).reindex_like(distancia).fillna(False).to_numpy(dtype=bool)
+
+    origen = pd.DataFrame(
+        origen_por_distancia(distancia.to_numpy(), importado),
+        index=distancia.index, columns=distancia.columns
+    ).reindex(df['Producto'])
+
+    valores = origen.to_numpy(dtype=float, copy=True)
+    base = np.broadcast_to(df['Origin_Score'].to_numpy(dtype=float)[:, np.newaxis], valores.shape)
+    faltantes = np.isnan(valores)
+    valores[faltantes] = base[faltantes]
+    return pd.DataFrame(valores, index=df['Producto'].to_numpy(), columns=list(distancia.columns))
+
+def calcular_scores_regionales(
+    df: pd.DataFrame,
+    matriz_origen: pd.DataFrame,
+    escenarios: Optional[Sequence[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Score every product x region pair in vectorized form.
+
+    The five region-independent contributions are computed once per product;
+    only the Origin contribution is evaluated over the whole matrix.
+
+    Args:
+        df: Product dataset
+        matriz_origen: Output of ``matriz_origen_regional`` for ``df``
+        escenarios: Scenario keys (defaults to every scenario in SCENARIOS)
+
+    Returns:
+        Dict mapping each scenario to an (n_products, n_regions) score array
+    """
+    escenarios = list(SCENARIOS) if escenarios is None else list(escenarios)
+    tensor = calcular_contribuciones(df, escenarios)
+    o = INDICADORES.index('Origin')
+    sin_origen = np.delete(tensor, o, axis=2).sum(axis=2)
+
+    origen = matriz_origen.to_numpy(dtype=float)
+    resultado = {}
+    for k, escenario in enumerate(escenarios):
+        kernel = KERNELS_NORMALIZACION[NORMALIZACION_ESCENARIOS.get(escenario, {}).get('Origin', 'lineal')]
+        normalizado = kernel(origen.ravel(), *INDICATOR_RANGES['Origin']).reshape(origen.shape)
+        resultado[escenario] = sin_origen[k][:, np.newaxis] + SCENARIOS[escenario]['Origin'] * normalizado
+    return resultado
+
+class ScoresRegionales:
+    """
+    Precomputed region-aware scores and per-region rankings.
+
+    Holds the product x region Origin matrix, the score matrix of every
+    scenario and, per scenario, the row order of every region's ranking, so
+    switching regions is a column lookup instead of a recomputation.
+    """
+
+    def __init__(self, df: pd.DataFrame, distancias: pd.DataFrame):
+        self.origen = matriz_origen_regional(df, distancias)
+        self.regiones: List[str] = list(self.origen.columns)
+        self.scores: Dict[str, np.ndarray] = calcular_scores_regionales(df, self.origen)
+        self.rankings: Dict[str, np.ndarray] = {
+            escenario: np.argsort(-scores, axis=0, kind='stable')
+            for escenario, scores in self.scores.items()
+        }
+
+    def _columna(self, region: str) -> int:
+        try:
+            return self.regiones.index(region)
+        except ValueError:
+            raise KeyError(f"Unknown region: {region}") from None
+
+    def ranking(self, region: str, escenario: str = 'A') -> np.ndarray:
+        """Return the row positions of the products, best first, for a region."""
+        return self.rankings[escenario][:, self._columna(region)]
+
+    def aplicar(self, df: pd.DataFrame, region: str) -> pd.DataFrame:
+        """Return ``df`` with Origin_Score and scenario scores seen from ``region``."""
+        j = self._columna(region)
+        columnas = {'Origin_Score': self.origen.iloc[:, j].to_numpy()}
+        for escenario, scores in self.scores.items():
+            if escenario in COLUMNAS_SCORE:
+                columnas[COLUMNAS_SCORE[escenario]] = scores[:, j]
+        return df.assign(**columnas)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _scores_regionales(_df: pd.DataFrame, version: str, _distancias: pd.DataFrame,
+                       version_distancias: str, normalizacion: str) -> ScoresRegionales:
+    return ScoresRegionales(_df, _distancias)
+
+def obtener_scores_regionales(
+    _df: pd.DataFrame,
+    version: str,
+    _distancias: pd.DataFrame,
+    version_distancias: str
+) -> ScoresRegionales:
+    """
+    Build (once per dataset version, distance-table version and
+    clave_normalizacion) the regional scores.
+    """
+    return _scores_regionales(_df, version, _distancias, version_distancias, clave_normalizacion())
+
+# ============================================================================
+# CATÁLOGO EN MEMORIA COMPARTIDA (MODO MULTI-PROCESO)
+# ============================================================================
+
+# Schema version of the published catalog layout
+VERSION_CATALOGO_COMPARTIDO = 1
+
+# File holding the version currently published in a catalog directory
+ARCHIVO_PUNTERO = 'ACTUAL'
+
+def publicar_catalogo(df: pd.DataFrame, directorio: str, conservar: int = 2) -> str:
+    """
+    Publish a scored, indexed catalog as memory-mappable files.
+
+    Run once by a loader process; every Streamlit worker then attaches to it
+    with ``adjuntar_catalogo`` instead of loading and scoring the CSV on its
+    own. Each column is written as a ``.npy`` file together with the
+    per-scenario ranking orders. Placing ``directorio`` on a tmpfs such as
+    ``/dev/shm`` keeps a single copy of the pages in RAM for all workers.
+
+    Versions are written to a temporary directory, renamed into place and
+    then activated by atomically replacing the ``ACTUAL`` pointer file, so
+    workers never see a half-written catalog.
+
+    Args:
+        df: Scored catalog (dataset columns plus COLUMNAS_SCORE)
+        directorio: Publication directory (created if missing)
+        conservar: Number of versions kept on disk (older ones are removed)
+
+    Returns:
+        Published version (dataset fingerprint)
+    """
+    os.makedirs(directorio, exist_ok=True)
+    version = version_dataset(df)
+    destino = os.path.join(directorio, version)
+
+    if not os.path.isdir(destino):
+        temporal = tempfile.mkdtemp(prefix=f'.{version}-', dir=directorio)
+        columnas = []
+        for columna in df.columns:
+            serie = df[columna]
+            if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biuf':
+                valores = serie.to_numpy()
+            else:
+                # Text is stored as fixed-width unicode so it can be mapped too
+                valores = serie.astype(str).to_numpy(dtype=str)
+            archivo = f'columna_{len(columnas)}.npy'
+            np.save(os.path.join(temporal, archivo), valores, allow_pickle=False)
+            columnas.append({'nombre': columna, 'archivo': archivo, 'texto': valores.dtype.kind == 'U'})
+
+        rankings = {}
+        for escenario, columna in COLUMNAS_SCORE.items():
+            if columna in df.columns:
+                orden = np.argsort(-df[columna].to_numpy(dtype=float), kind='stable')
+                archivo = f'ranking_{escenario}.npy'
+                np.save(os.path.join(temporal, archivo), orden, allow_pickle=False)
+                rankings[escenario] = archivo
+
+        manifiesto = {
+            'version_esquema': VERSION_CATALOGO_COMPARTIDO,
+            'version': version,
+            'filas': len(df),
+            'columnas': columnas,
+            'rankings': rankings
+        }
+        with open(os.path.join(temporal, 'manifiesto.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, ensure_ascii=False)
+
+        try:
+            os.rename(temporal, destino)
+        except OSError:
+            # Another loader published the same version first
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    puntero_temporal = os.path.join(directorio, f'.{ARCHIVO_PUNTERO}.{os.getpid()}')
+    with open(puntero_temporal, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(puntero_temporal, os.path.join(directorio, ARCHIVO_PUNTERO))
+
+    # Workers that still map an old version keep their pages until they detach
+    versiones = sorted(
+        (e for e in os.scandir(directorio) if e.is_dir() and not e.name.startswith('.')),
+        key=lambda e: e.stat().st_mtime_ns, reverse=True
+    )
+    for entrada in [e for e in versiones if e.name != version][max(conservar - 1, 0):]:
+        shutil.rmtree(entrada.path, ignore_errors=True)
+
+    return version
+
+class CatalogoCompartido:
+    """
+    Catalog attached zero-copy from a directory written by ``publicar_catalogo``.
+
+    Numeric columns and ranking orders are read-only ``np.memmap`` arrays
+    shared by every process mapping the same files; only text columns
+    (product names) are materialized per process.
+
+    Attributes:
+        version: Dataset fingerprint of the attached catalog
+        df: DataFrame view over the mapped columns
+        rankings: Scenario -> row positions sorted by descending score
+    """
+
+    def __init__(self, directorio: str, manifiesto: Dict):
+        self.version: str = manifiesto['version']
+        carpeta = os.path.join(directorio, self.version)
+
+        columnas = {}
+        for columna in manifiesto['columnas']:
+            valores = np.load(os.path.join(carpeta, columna['archivo']), mmap_mode='r')
+            columnas[columna['nombre']] = pd.array(valores, dtype='str') if columna['texto'] else valores
+        self.df: pd.DataFrame = pd.DataFrame(columnas, copy=False)
+
+        self.rankings: Dict[str, np.ndarray] = {
+            escenario: np.load(os.path.join(carpeta, archivo), mmap_mode='r')
+            for escenario, archivo in manifiesto['rankings'].items()
+        }
+
+def adjuntar_catalogo(directorio: str) -> Optional[CatalogoCompartido]:
+    """
+    Attach to the catalog currently published in ``directorio``.
+
+    Returns:
+        CatalogoCompartido, or None if nothing has been published yet
+
+    Raises:
+        ValueError: If the published layout has an unsupported schema version
+    """
+    try:
+        with open(os.path.join(directorio, ARCHIVO_PUNTERO), encoding='utf-8') as f:
+            version = f.read().strip()
+        with open(os.path.join(directorio, version, 'manifiesto.json'), encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if manifiesto.get('version_esquema') != VERSION_CATALOGO_COMPARTIDO:
+        raise ValueError(
+            f"Unsupported shared catalog version: {manifiesto.get('version_esquema')}"
+        )
+    return CatalogoCompartido(directorio, manifiesto)
+
+# ============================================================================
+# CANASTAS Y RECETAS
+# ============================================================================
+
+def cestas_desde_dict(cestas: Dict[str, Dict[str, float]]) -> pd.DataFrame:
+    """
+    Convert {basket: {product: kg}} into the long format used by the engine.
+
+    Example:
+        >>> cestas_desde_dict({'Ensalada': {'Lechuga': 0.2, 'Tomate': 0.3}})
+    """
+    filas = [
+        (cesta, producto, kg)
+        for cesta, productos in cestas.items()
+        for producto, kg in productos.items()
+    ]
+    return pd.DataFrame(filas, columns=['Cesta', 'Producto', 'Kg'])
+
+def calcular_scores_cestas(
+    df: pd.DataFrame,
+    cestas: pd.DataFrame,
+    escenarios: Optional[Sequence[str]] = None,
+    nova: str = 'promedio'
+) -> pd.DataFrame:
+    """
+    Score many baskets (meals, recipes, menus) in one vectorized call.
+
+    Baskets are weighted mixes of dataset products by kilogram. They are
+    handled as a sparse basket x product matrix in COO form (one entry per
+    basket line), so the per-kg indicators of every basket are computed with
+    one weighted ``np.bincount`` per indicator. CF, WF, LU, Origin and Waste
+    are kg-weighted means (i.e. values per kg of basket, comparable with
+    single products); NOVA is the kg-weighted mean or, with
+    ``nova='maximo'``, the most processed ingredient. Baskets are then
+    scored with the same INDICATOR_RANGES and SCENARIOS as products.
+
+    Args:
+        df: Product dataset with the raw indicator columns
+        cestas: Long table with columns Cesta, Producto and Kg
+        escenarios: Scenario keys (defaults to every scenario in SCENARIOS)
+        nova: 'promedio' or 'maximo'
+
+    Returns:
+        DataFrame indexed by basket with Kg_total, the aggregated indicator
+        columns and one score column per scenario (COLUMNAS_SCORE names,
+        ``Score_<escenario>`` for other scenarios)
+
+    Raises:
+        ValueError: If a product is unknown, a quantity is not positive or
+            the NOVA aggregation is invalid
+    """
+    if nova not in ('promedio', 'maximo'):
+        raise ValueError(f"Invalid NOVA aggregation: {nova}. Must be 'promedio' or 'maximo'.")
+
+    kg = cestas['Kg'].to_numpy(dtype=float)
+    if (~(kg > 0)).any():
+        raise ValueError("Basket quantities (Kg) must be positive")
+
+    # Hash join product name -> dataset row (first occurrence)
+    mapa = pd.Series(np.arange(len(df)), index=df['Producto'].to_numpy())
+    mapa = mapa[~mapa.index.duplicated()]
+    productos = cestas['Producto'].map(mapa)
+    if productos.isna().any():
+        desconocidos = sorted(set(cestas.loc[productos.isna(), 'Producto']))
+        raise ValueError(f"Unknown products in baskets: {desconocidos}")
+    filas = productos.to_numpy(dtype=np.int64)
+
+    codigos, nombres = pd.factorize(cestas['Cesta'])
+    n_cestas = len(nombres)
+    kg_total = np.bincount(codigos, weights=kg, minlength=n_cestas)
+
+    valores = df[[COLUMNAS_INDICADORES[i] for i in INDICADORES]].to_numpy(dtype=float)[filas]
+    agregado = {'Kg_total': kg_total}
+    for j, indicador in enumerate(INDICADORES):
+        columna = COLUMNAS_INDICADORES[indicador]
+        if indicador == 'NOVA' and nova == 'maximo':
+            maximo = np.full(n_cestas, -np.inf)
+            np.maximum.at(maximo, codigos, valores[:, j])
+            agregado[columna] = maximo
+        else:
+            agregado[columna] = np.bincount(codigos, weights=kg * valores[:, j], minlength=n_cestas) / kg_total
+
+    resultado = pd.DataFrame(agregado, index=pd.Index(nombres, name='Cesta'))
+
+    escenarios = list(SCENARIOS) if escenarios is None else list(escenarios)
+    scores = calcular_contribuciones(resultado, escenarios).sum(axis=2)
+    for k, escenario in enumerate(escenarios):
+        resultado[COLUMNAS_SCORE.get(escenario, f'Score_{escenario}')] = scores[k]
+    return resultado
+
+# ============================================================================
+# SUGERENCIAS DE SUSTITUCIÓN
+# ============================================================================
+
+def categorias_productos(df: pd.DataFrame) -> np.ndarray:
+    """
+    Return the food group of every dataset row.
+
+    Uses the dataset 'Categoría' column when present, otherwise
+    CATEGORIAS_PRODUCTO; unknown products fall into CATEGORIA_OTROS.
+    """
+    if 'Categoría' in df.columns:
+        categorias = df['Categoría']
+    else:
+        categorias = df['Producto'].map(CATEGORIAS_PRODUCTO)
+    return categorias.fillna(CATEGORIA_OTROS).astype(str).to_numpy()
+
+class IndiceCategorias:
+    """
+    Per-category ranking index used by the substitution optimizer.
+
+    For one scenario, stores every product's score and, per category, the
+    row positions sorted by descending score. Finding the best substitute of
+    a product is then a walk from the top of its category that usually stops
+    at the first entry.
+    """
+
+    def __init__(self, df: pd.DataFrame, escenario: str = 'A'):
+        self.escenario = escenario
+        self.productos = df['Producto'].to_numpy()
+        self.scores = calcular_contribuciones(df, [escenario])[0].sum(axis=1)
+        self.categorias = categorias_productos(df)
+        self.kcal = df['Kcal_100g'].to_numpy(dtype=float) if 'Kcal_100g' in df.columns else None
+
+        mapa = pd.Series(np.arange(len(df)), index=self.productos)
+        self.posiciones: Dict[str, int] = mapa[~mapa.index.duplicated()].to_dict()
+
+        orden = np.lexsort((-self.scores, self.categorias))
+        self.ranking: Dict[str, np.ndarray] = {}
+        limites = np.flatnonzero(self.categorias[orden][1:] != self.categorias[orden][:-1]) + 1
+        for grupo in np.split(orden, limites):
+            if len(grupo):
+                self.ranking[self.categorias[grupo[0]]] = grupo
+
+    def mejor_sustituto(
+        self,
+        posicion: int,
+        tolerancia_kcal: Optional[float] = None,
+        excluir: Iterable[int] = ()
+    ) -> Optional[int]:
+        """
+        Return the best-scoring product of the same category that beats ``posicion``.
+
+        Products in CATEGORIA_OTROS (including unknown ones) have no substitute.
+
+        Args:
+            posicion: Row position of the product to replace
+            tolerancia_kcal: Optional relative calorie tolerance (0.2 = ±20%
+                of the original kcal per 100 g); requires a Kcal_100g column
+            excluir: Row positions that cannot be suggested
+
+        Returns:
+            Row position of the substitute, or None if nothing is better or
+            the product has no food group
+
+        Raises:
+            ValueError: If a calorie tolerance is requested without calorie data
+        """
+        if tolerancia_kcal is not None and self.kcal is None:
+            raise ValueError("Calorie bounds require a 'Kcal_100g' column in the dataset")
+
+        if self.categorias[posicion] == CATEGORIA_OTROS:
+            return None
+
+        excluidos = set(excluir)
+        score_actual = self.scores[posicion]
+        for candidato in self.ranking[self.categorias[posicion]]:
+            if self.scores[candidato] <= score_actual:
+                return None
+            if candidato == posicion or candidato in excluidos:
+                continue
+            if self.productos[candidato] == self.productos[posicion]:
+                continue
+            if tolerancia_kcal is not None:
+                base = self.kcal[posicion]
+                if not abs(self.kcal[candidato] - base) <= tolerancia_kcal * abs(base):
+                    continue
+            return int(candidato)
+        return None
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _indice_categorias(_df: pd.DataFrame, version: str, escenario: str,
+                       normalizacion: str) -> IndiceCategorias:
+    return IndiceCategorias(_df, escenario)
+
+def obtener_indice_categorias(_df: pd.DataFrame, version: str, escenario: str) -> IndiceCategorias:
+    """
+    Build (once per dataset version, scenario and clave_normalizacion) the
+    per-category ranking index.
+    """
+    return _indice_categorias(_df, version, escenario, clave_normalizacion())
+
+def sugerir_sustituciones(
+    df: pd.DataFrame,
+    cesta: Dict[str, float],
+    escenario: str = 'A',
+    max_cambios: Optional[int] = None,
+    tolerancia_kcal: Optional[float] = None,
+    indice_categorias: Optional[IndiceCategorias] = None
+) -> pd.DataFrame:
+    """
+    Suggest same-category swaps that maximize a basket's scenario score.
+
+    Products without a food group (CATEGORIA_OTROS) are never swapped.
+
+    With linear normalization the basket score is the kg-share weighted mean
+    of its product scores, so each line's best swap is independent of the
+    others: the top of its category ranking (subject to the constraints).
+    Keeping the ``max_cambios`` largest gains is therefore optimal.
+
+    Args:
+        df: Product dataset
+        cesta: {product: kg}
+        escenario: Scenario to optimize
+        max_cambios: Maximum number of swaps (None = every improving swap)
+        tolerancia_kcal: Optional relative calorie tolerance per swap
+        indice_categorias: Prebuilt index for ``escenario`` (built if None)
+
+    Returns:
+        DataFrame with Producto, Sustituto, Categoría, Kg, Score_actual,
+        Score_sustituto and Mejora (basket score points), best first
+
+    Raises:
+        ValueError: If a product is unknown or a quantity is not positive
+    """
+    if indice_categorias is None or indice_categorias.escenario != escenario:
+        indice_categorias = IndiceCategorias(df, escenario)
+
+    desconocidos = sorted(p for p in cesta if p not in indice_categorias.posiciones)
+    if desconocidos:
+        raise ValueError(f"Unknown products in basket: {desconocidos}")
+    if any(not kg > 0 for kg in cesta.values()):
+        raise ValueError("Basket quantities (Kg) must be positive")
+
+    kg_total = sum(cesta.values())
+    en_cesta = [indice_categorias.posiciones[p] for p in cesta]
+    filas = []
+    for producto, kg in cesta.items():
+        posicion = indice_categorias.posiciones[producto]
+        sustituto = indice_categorias.mejor_sustituto(posicion, tolerancia_kcal, excluir=en_cesta)
+        if sustituto is None:
+            continue
+        score_actual = indice_categorias.scores[posicion]
+        score_sustituto = indice_categorias.scores[sustituto]
+        filas.append({
+            'Producto': producto,
+            'Sustituto': indice_categorias.productos[sustituto],
+            'Categoría': indice_categorias.categorias[posicion],
+            'Kg': kg,
+            'Score_actual': score_actual,
+            'Score_sustituto': score_sustituto,
+            'Mejora': kg / kg_total * (score_sustituto - score_actual)
+        })
+
+    sugerencias = pd.DataFrame(filas, columns=['Producto', 'Sustituto', 'Categoría', 'Kg',
+                                               'Score_actual', 'Score_sustituto', 'Mejora'])
+    sugerencias = sugerencias.sort_values('Mejora', ascending=False, kind='stable')
+    if max_cambios is not None:
+        sugerencias = sugerencias.head(max_cambios)
+    return sugerencias.reset_index(drop=True)
+
+# ============================================================================
+# CONSENSO ROBUSTO
+# ============================================================================
+
+class IndiceRanking:
+    """
+    Descending ranking of one scenario's scores.
+
+    ``orden`` holds the row positions best first (ties keep row order) and
+    ``rango`` the 0-based rank of every row, so top-k sets are slices and
+    rank lookups are O(1). A precomputed ``orden`` (such as the ranking
+    files of a shared catalog) is used as-is instead of sorting.
+    """
+
+    def __init__(self, scores: Iterable[float], orden: Optional[np.ndarray] = None):
+        self.scores = np.array(scores, dtype=float)
+        if orden is None:
+            orden = np.argsort(-self.scores, kind='stable')
+        elif len(orden) != len(self.scores):
+            raise ValueError(f"Ranking order has {len(orden)} rows, scores have {len(self.scores)}")
+        self.orden = orden
+        self.rango = np.empty(len(self.scores), dtype=np.int64)
+        self.rango[self.orden] = np.arange(len(self.scores))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def top(self, k: int) -> np.ndarray:
+        """Return the row positions of the ``k`` best products."""
+        return self.orden[:k]
+
+    def congelar(self) -> 'IndiceRanking':
+        """Make the index read-only so it can be shared across sessions."""
+        for arreglo in (self.scores, self.orden, self.rango):
+            arreglo.flags.writeable = False
+        return self
+
+def indices_ranking(
+    df: pd.DataFrame,
+    columnas: Optional[Dict[str, str]] = None,
+    ordenes: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, IndiceRanking]:
+    """
+    Build one ranking index per scenario.
+
+    Args:
+        df: Dataset with one score column per scenario
+        columnas: Scenario -> score column (defaults to COLUMNAS_SCORE,
+            restricted to the columns present in ``df``)
+        ordenes: Scenario -> precomputed best-first row order; scenarios
+            without one are sorted
+
+    Returns:
+        Dictionary scenario -> IndiceRanking
+    """
+    if columnas is None:
+        columnas = {e: c for e, c in COLUMNAS_SCORE.items() if c in df.columns}
+    ordenes = ordenes or {}
+    return {e: IndiceRanking(df[c].to_numpy(dtype=float), ordenes.get(e)) for e, c in columnas.items()}
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_indices_ranking(_df: pd.DataFrame, version: str,
+                            _ordenes: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, IndiceRanking]:
+    """
+    Build (once per dataset version) the shared, read-only scenario rankings.
+
+    ``_ordenes`` are the precomputed orders of this version (the mapped
+    ranking files of an attached shared catalog); they are not sorted again.
+    """
+    return {e: indice.congelar() for e, indice in indices_ranking(_df, ordenes=_ordenes).items()}
+
+class ConsensoRobusto:
+    """
+    Products that rank in the top ``k`` of every scenario.
+
+    Keeps, per product, the number of scenarios whose top ``k`` contains it;
+    the consensus is the set of products counted in all of them. Changing
+    ``k`` only touches the ranks between the old and the new cutoff.
+
+    The indexes are used as given (typically the shared cached ones, which
+    are rebuilt when the dataset version changes) and never modified.
+    """
+
+    def __init__(self, indices: Dict[str, IndiceRanking], k: int = 10):
+        if not indices:
+            raise ValueError("The consensus needs at least one scenario")
+        tamanos = {len(indice) for indice in indices.values()}
+        if len(tamanos) != 1:
+            raise ValueError("All scenario rankings must cover the same products")
+        self.indices = dict(indices)
+        self.k = 0
+        self.conteo = np.zeros(tamanos.pop(), dtype=np.int64)
+        self.fijar_k(k)
+
+    def fijar_k(self, k: int):
+        """Change the top-k cutoff."""
+        if k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        for indice in self.indices.values():
+            if k > self.k:
+                self.conteo[indice.orden[self.k:k]] += 1
+            else:
+                self.conteo[indice.orden[k:self.k]] -= 1
+        self.k = k
+
+    def productos(self) -> np.ndarray:
+        """Row positions in the consensus, best mean rank first."""
+        posiciones = np.flatnonzero(self.conteo == len(self.indices))
+        rangos = sum(indice.rango[posiciones] for indice in self.indices.values())
+        return posiciones[np.argsort(rangos, kind='stable')]
+
+# ============================================================================
+# ESTABILIDAD DE RANKINGS
+# ============================================================================
+
+def rangos_promedio(valores: Iterable[float]) -> np.ndarray:
+    """
+    Rank values in ascending order, giving tied values their average rank.
+
+    Args:
+        valores: 1-D values
+
+    Returns:
+        Float array of 1-based ranks aligned with ``valores``
+    """
+    valores = np.asarray(valores)
+    n = len(valores)
+    orden = np.argsort(valores, kind='stable')
+    ordenados = valores[orden]
+    nuevo = np.r_[True, ordenados[1:] != ordenados[:-1]] if n else np.zeros(0, dtype=bool)
+    inicios = np.flatnonzero(nuevo)
+    fines = np.r_[inicios[1:], n]
+    rangos = np.empty(n)
+    rangos[orden] = ((inicios + fines + 1) / 2)[np.cumsum(nuevo) - 1]
+    return rangos
+
+def contar_inversiones(valores: Iterable[int]) -> int:
+    """
+    Count pairs i < j with ``valores[i] > valores[j]`` (bottom-up merge sort).
+
+    Each pass merges adjacent sorted runs of the same width for the whole
+    array at once: the inversions contributed by a right run are found with
+    one ``searchsorted`` against its left run, and the runs are merged by a
+    stable sort keyed on (pair, value), which detects the existing runs.
+    log2(n) vectorized passes, no pairwise comparison.
+
+    Args:
+        valores: Non-negative integers (e.g. dense ranks)
+
+    Returns:
+        Number of inversions
+    """
+    valores = np.asarray(valores, dtype=np.int64)
+    n = len(valores)
+    if n < 2:
+        return 0
+
+    base = int(valores.max()) + 1
+    posicion = np.arange(n)
+    total = 0
+    ancho = 1
+    while ancho < n:
+        par = posicion // (2 * ancho)
+        derecha = (posicion // ancho) % 2 == 1
+        clave = par * base + valores
+
+        izquierda = clave[~derecha]
+        consultas = np.flatnonzero(derecha)
+        hasta = np.searchsorted(izquierda, clave[consultas], side='right')
+        fin_izquierda = np.minimum(par[consultas] * ancho + ancho, len(izquierda))
+        total += int((fin_izquierda - hasta).sum())
+
+        valores = np.sort(clave, kind='stable') - par * base
+        ancho *= 2
+    return total
+
+def _pares_empatados(*columnas: np.ndarray) -> int:
+    """Number of pairs tied on every column (columns already sorted jointly)."""
+    n = len(columnas[0])
+    if n < 2:
+        return 0
+    cambio = np.zeros(n - 1, dtype=bool)
+    for columna in columnas:
+        cambio |= columna[1:] != columna[:-1]
+    tamanos = np.diff(np.r_[0, np.flatnonzero(cambio) + 1, n])
+    return int((tamanos * (tamanos - 1) // 2).sum())
+
+def correlacion_spearman(x: Iterable[float], y: Iterable[float]) -> float:
+    """Spearman rank correlation (average ranks for ties); NaN if undefined."""
+    rx, ry = rangos_promedio(x), rangos_promedio(y)
+    if len(rx) < 2 or rx.std() == 0 or ry.std() == 0:
+        return float('nan')
+    return float(np.corrcoef(rx, ry)[0, 1])
+
+def correlacion_kendall(x: Iterable[float], y: Iterable[float]) -> float:
+    """
+    Kendall tau-b rank correlation in O(n log n) (Knight's algorithm).
+
+    Sorting by (x, y) turns the discordant pairs into the inversions of the
+    y sequence, which are counted by merge sort instead of comparing every
+    pair. Ties are corrected as in tau-b.
+
+    Args:
+        x: First ranking's values
+        y: Second ranking's values, aligned with ``x``
+
+    Returns:
+        Tau-b in [-1, 1], or NaN if either input is constant
+    """
+    _, dx = np.unique(np.asarray(x), return_inverse=True)
+    _, dy = np.unique(np.asarray(y), return_inverse=True)
+    n = len(dx)
+    if n < 2:
+        return float('nan')
+
+    orden = np.lexsort((dy, dx))
+    xs, ys = dx[orden], dy[orden]
+
+    total = n * (n - 1) // 2
+    empates_x = _pares_empatados(xs)
+    empates_xy = _pares_empatados(xs, ys)
+    conteo_y = np.bincount(dy)
+    empates_y = int((conteo_y * (conteo_y - 1) // 2).sum())
+    discordantes = contar_inversiones(ys)
+
+    denominador = np.sqrt(float(total - empates_x) * float(total - empates_y))
+    if denominador == 0:
+        return float('nan')
+    return float(total - empates_x - empates_y + empates_xy - 2 * discordantes) / denominador
+
+def tabla_cambios_ranking(
+    df: pd.DataFrame,
+    base: str = 'A',
+    comparado: str = 'B',
+    indices: Optional[Dict[str, IndiceRanking]] = None
+) -> pd.DataFrame:
+    """
+    Per-product rank positions in two scenarios and the change between them.
+
+    Args:
+        df: Dataset with a Producto column
+        base: Reference scenario
+        comparado: Scenario compared against ``base``
+        indices: Scenario ranking indexes (built from ``df`` if omitted)
+
+    Returns:
+        DataFrame with Producto, Posición_<base>, Posición_<comparado> and
+        Cambio (positive = climbs in ``comparado``)
+    """
+    if indices is None:
+        indices = indices_ranking(df)
+    posicion_base = indices[base].rango + 1
+    posicion_comparado = indices[comparado].rango + 1
+    return pd.DataFrame({
+        'Producto': df['Producto'].to_numpy(),
+        f'Posición_{base}': posicion_base,
+        f'Posición_{comparado}': posicion_comparado,
+        'Cambio': posicion_base - posicion_comparado
+    })
+
+def mayores_cambios(tabla: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """Return the ``n`` rows of a rank-change table with the largest |Cambio|."""
+    magnitud = np.abs(tabla['Cambio'].to_numpy())
+    if n < len(magnitud):
+        candidatos = np.argpartition(-magnitud, n - 1)[:n]
+    else:
+        candidatos = np.arange(len(magnitud))
+    candidatos = candidatos[np.lexsort((candidatos, -magnitud[candidatos]))]
+    return tabla.iloc[candidatos]
+
+def resumen_estabilidad(
+    df: pd.DataFrame,
+    columnas: Optional[Dict[str, str]] = None,
+    indices: Optional[Dict[str, IndiceRanking]] = None
+) -> pd.DataFrame:
+    """
+    Rank agreement between every pair of scenarios.
+
+    Args:
+        df: Dataset with one score column per scenario
+        columnas: Scenario -> score column (defaults to COLUMNAS_SCORE,
+            restricted to the columns present in ``df``)
+        indices: Scenario ranking indexes (built from ``df`` if omitted)
+
+    Returns:
+        One row per scenario pair with Spearman, Kendall, the mean and
+        maximum absolute rank change and the share of unchanged positions
+    """
+    if columnas is None:
+        columnas = {e: c for e, c in COLUMNAS_SCORE.items() if c in df.columns}
+    if indices is None:
+        indices = indices_ranking(df, columnas)
+
+    filas = []
+    for (e1, c1), (e2, c2) in combinations(columnas.items(), 2):
+        x = df[c1].to_numpy(dtype=float)
+        y = df[c2].to_numpy(dtype=float)
+        cambio = np.abs(indices[e1].rango - indices[e2].rango)
+        filas.append({
+            'Escenario_1': e1,
+            'Escenario_2': e2,
+            'Spearman': correlacion_spearman(x, y),
+            'Kendall': correlacion_kendall(x, y),
+            'Cambio_medio': float(cambio.mean()) if len(cambio) else 0.0,
+            'Cambio_máximo': int(cambio.max()) if len(cambio) else 0,
+            'Sin_cambio_pct': float((cambio == 0).mean() * 100) if len(cambio) else 100.0
+        })
+    return pd.DataFrame(filas, columns=['Escenario_1', 'Escenario_2', 'Spearman', 'Kendall',
+                                        'Cambio_medio', 'Cambio_máximo', 'Sin_cambio_pct'])
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_estabilidad(_df: pd.DataFrame, version: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Cached, shared stability summary and A-vs-B rank-change table."""
+    indices = obtener_indices_ranking(_df, version)
+    resumen = resumen_estabilidad(_df, indices=indices)
+    tabla = tabla_cambios_ranking(_df, 'A', 'B', indices)
+    return congelar_dataframe(resumen), congelar_dataframe(tabla)
+
+# ============================================================================
+# FRENTE DE PARETO
+# ============================================================================
+
+def _dominados_por(frente: np.ndarray, puntos: np.ndarray) -> np.ndarray:
+    """
+    Mask of ``puntos`` dominated by at least one column of ``frente``.
+
+    ``frente`` is stored column-major (criteria x points) so each criterion
+    is compared as one contiguous vector.
+    """
+    cubre = frente[0][None, :] >= puntos[:, 0][:, None]
+    mejor = frente[0][None, :] > puntos[:, 0][:, None]
+    for j in range(1, len(frente)):
+        cubre &= frente[j][None, :] >= puntos[:, j][:, None]
+        mejor |= frente[j][None, :] > puntos[:, j][:, None]
+    return (cubre & mejor).any(axis=1)
+
+def calcular_capas_pareto(valores: np.ndarray, bloque: int = 128) -> np.ndarray:
+    """
+    Assign every point to its skyline layer (non-dominated sorting).
+
+    Layer 1 is the Pareto front: points not dominated by any other point.
+    Layer k holds the points that become non-dominated once layers 1..k-1
+    are removed, i.e. one more than the deepest layer among its dominators.
+    A point dominates another when it is at least as good in every column
+    and strictly better in one (higher is better).
+
+    This is a presorted sweep with binary search over the layers (ENS-BS,
+    Zhang et al. 2015), vectorized in blocks. Points are visited in
+    descending order of their sum (ties broken lexicographically), so every
+    dominator is visited before the points it dominates. A vectorized binary
+    search over the layers built so far finds each point's layer (being
+    dominated by layer k implies being dominated by every earlier layer),
+    then a small block-by-block dominance matrix resolves chains inside the
+    block.
+
+    Complexity: the O(n log n) sort plus O(log L) layer checks per point,
+    where each check compares the point against that layer's whole front.
+    With few criteria the fronts stay small and this is close to
+    O(d n log n); in 6-D a single front can hold O(n) points, so the worst
+    case is O(d n²) comparisons (about 4 s for 50,000 products).
+
+    Scope: this is not an O(n log n) algorithm, and none is known for more
+    than three criteria. The divide-and-conquer sorts (Jensen 2003;
+    Buzdalov and Shalyto 2014) run in O(n log^(d-1) n). For d = 6 that is
+    O(n log⁵ n), which has more work than n² below a few million points.
+    The gain over repeated pairwise peeling is that each point is placed
+    once, against O(log L) fronts instead of all of them.
+
+    Args:
+        valores: Array of shape (n_points, n_criteria)
+        bloque: Points placed per vectorized step
+
+    Returns:
+        Integer array of 1-based layers, aligned with ``valores`` rows
+    """
+    valores = np.asarray(valores, dtype=float)
+    n, d = valores.shape
+    capas = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return capas
+
+    claves = [-valores[:, j] for j in range(d - 1, -1, -1)] + [-valores.sum(axis=1)]
+    orden = np.lexsort(claves)
+
+    frentes: List[np.ndarray] = []
+    tamanos: List[int] = []
+    for inicio in range(0, n, bloque):
+        filas = orden[inicio:inicio + bloque]
+        puntos = valores[filas]
+        m = len(filas)
+
+        bajo = np.zeros(m, dtype=np.int64)
+        alto = np.full(m, len(frentes), dtype=np.int64)
+        while True:
+            activos = bajo < alto
+            if not activos.any():
+                break
+            medio = (bajo + alto) // 2
+            for k in np.unique(medio[activos]):
+                sel = np.flatnonzero(activos & (medio == k))
+                dominados = _dominados_por(frentes[k][:, :tamanos[k]], puntos[sel])
+                bajo[sel[dominados]] = k + 1
+                alto[sel[~dominados]] = k
+
+        # Dominators inside the block always precede the point they dominate
+        domina = ((puntos[:, None, :] >= puntos[None, :, :]).all(axis=2)
+                  & (puntos[:, None, :] != puntos[None, :, :]).any(axis=2))
+        capa = bajo
+        for i in np.flatnonzero(domina.any(axis=0)):
+            capa[i] = max(capa[i], capa[:i][domina[:i, i]].max() + 1)
+
+        for k in np.unique(capa):
+            nuevos = puntos[capa == k].T
+            if k == len(frentes):
+                frentes.append(np.empty((d, max(16, nuevos.shape[1]))))
+                tamanos.append(0)
+            fin = tamanos[k] + nuevos.shape[1]
+            if fin > frentes[k].shape[1]:
+                ampliado = np.empty((d, max(fin, 2 * frentes[k].shape[1])))
+                ampliado[:, :tamanos[k]] = frentes[k][:, :tamanos[k]]
+                frentes[k] = ampliado
+            frentes[k][:, tamanos[k]:fin] = nuevos
+            tamanos[k] = fin
+        capas[filas] = capa + 1
+    return capas
+
+def calcular_capas_pareto_productos(df: pd.DataFrame) -> np.ndarray:
+    """
+    Skyline layer of every product over the six normalized indicators.
+
+    Dominance only depends on the order of each indicator, so the result is
+    the same for every scenario and monotonic normalization kernel.
+    """
+    return calcular_capas_pareto(normalizar_indicadores(df))
+
+def frente_pareto(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the non-dominated products (Pareto front) of a dataset."""
+    return df[calcular_capas_pareto_productos(df) == 1]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_capas_pareto(_df: pd.DataFrame, version: str) -> np.ndarray:
+    """Cached, shared skyline layers for a dataset version."""
+    capas = calcular_capas_pareto_productos(_df)
+    capas.flags.writeable = False
+    return capas
+
+# ============================================================================
+# VALIDACIÓN DE ESQUEMA
+# ============================================================================
+
+# Expected columns of a scored dataset. Each rule may set:
+#   tipo: 'texto' or 'numero'; min / max: inclusive bounds; valores: allowed
+#   values; unico: no repeated values; opcional: the column may be absent.
+ESQUEMA_DATASET: Dict[str, Dict] = {
+    'Producto': {'tipo': 'texto', 'unico': True},
+    'CF_kgCO2eq_kg': {'tipo': 'numero', 'min': 0},
+    'WF_L_kg': {'tipo': 'numero', 'min': 0},
+    'LU_m2_kg': {'tipo': 'numero', 'min': 0},
+    'Origin_Score': {'tipo': 'numero', 'valores': (0, 50, 100)},
+    'Waste_pct': {'tipo': 'numero', 'min': 0, 'max': 100},
+    'NOVA': {'tipo': 'numero', 'valores': (1, 2, 3, 4)},
+    'Score_México': {'tipo': 'numero', 'min': 0, 'max': 100},
+    'Score_México_B': {'tipo': 'numero', 'min': 0, 'max': 100},
+    'Kcal_100g': {'tipo': 'numero', 'min': 0, 'opcional': True},
+    'Categoría': {'tipo': 'texto', 'opcional': True}
+}
+
+COLUMNAS_REPORTE = ['Fila', 'Columna', 'Valor', 'Problema']
+
+class ErrorEsquema(ValueError):
+    """Raised when a dataset fails schema validation; carries the full report."""
+
+    def __init__(self, reporte: pd.DataFrame):
+        self.reporte = reporte
+        filas = reporte['Fila'].dropna().nunique()
+        super().__init__(
+            f"Dataset failed schema validation: {len(reporte)} problem(s) in "
+            f"{filas} row(s)\n{resumir_reporte(reporte)}"
+        )
+
+def _problemas_columna(serie: pd.Series, regla: Dict) -> List[Tuple[np.ndarray, str]]:
+    """Vectorized masks of every rule a column breaks, as (mask, problem) pairs."""
+    problemas = []
+    faltante = serie.isna().to_numpy()
+    problemas.append((faltante, 'valor faltante'))
+
+    if regla.get('tipo') == 'numero':
+        valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+        no_numerico = np.isnan(valores) & ~faltante
+        problemas.append((no_numerico, 'no numérico'))
+        problemas.append((np.isinf(valores), 'no finito'))
+
+        finito = np.isfinite(valores)
+        if 'min' in regla:
+            problemas.append((finito & (valores < regla['min']), f"menor que {regla['min']}"))
+        if 'max' in regla:
+            problemas.append((finito & (valores > regla['max']), f"mayor que {regla['max']}"))
+        if 'valores' in regla:
+            permitidos = ', '.join(str(v) for v in regla['valores'])
+            fuera = finito & ~np.isin(valores, regla['valores'])
+            problemas.append((fuera, f"no está en {{{permitidos}}}"))
+    else:
+        vacio = serie.astype(str).str.strip().eq('').to_numpy() & ~faltante
+        problemas.append((vacio, 'texto vacío'))
+
+    if regla.get('unico'):
+        duplicado = serie.duplicated(keep='first').to_numpy() & ~faltante
+        problemas.append((duplicado, 'duplicado'))
+    return problemas
+
+def validar_esquema(df: pd.DataFrame, esquema: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """
+    Check a whole dataset against a schema and report every problem at once.
+
+    Every rule is evaluated as a boolean mask over the full column, so the
+    cost is a few vectorized passes per column regardless of how many rows
+    fail.
+
+    Args:
+        df: Dataset to validate
+        esquema: Column -> rule (defaults to ESQUEMA_DATASET)
+
+    Returns:
+        DataFrame with one row per problem: Fila (row position, NA for
+        column-level problems), Columna, Valor and Problema. Empty if valid.
+    """
+    if esquema is None:
+        esquema = ESQUEMA_DATASET
+
+    partes = []
+    for columna, regla in esquema.items():
+        if columna not in df.columns:
+            if not regla.get('opcional'):
+                partes.append(pd.DataFrame({
+                    'Fila': pd.array([pd.NA], dtype='Int64'),
+                    'Columna': [columna],
+                    'Valor': [None],
+                    'Problema': ['columna faltante']
+                }))
+            continue
+
+        serie = df[columna]
+        for mascara, problema in _problemas_columna(serie, regla):
+            filas = np.flatnonzero(mascara)
+            if len(filas):
+                partes.append(pd.DataFrame({
+                    'Fila': pd.array(filas, dtype='Int64'),
+                    'Columna': columna,
+                    'Valor': serie.iloc[filas].to_numpy(dtype=object),
+                    'Problema': problema
+                }))
+
+    if not partes:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in
+                             zip(COLUMNAS_REPORTE, ['Int64', object, object, object])})
+    reporte = pd.concat(partes, ignore_index=True)
+    return reporte.sort_values('Fila', kind='stable', na_position='first', ignore_index=True)
+
+def resumir_reporte(reporte: pd.DataFrame, max_filas: int = 5) -> str:
+    """One line per (column, problem) with its row count and the first rows."""
+    lineas = []
+    for (columna, problema), grupo in reporte.groupby(['Columna', 'Problema'], sort=False):
+        filas = grupo['Fila'].dropna()
+        if len(filas):
+            ejemplo = ', '.join(str(f) for f in filas.iloc[:max_filas])
+            extra = '…' if len(filas) > max_filas else ''
+            lineas.append(f"- {columna}: {problema} ({len(filas)} filas: {ejemplo}{extra})")
+        else:
+            lineas.append(f"- {columna}: {problema}")
+    return '\n'.join(lineas)
+
+def exigir_esquema(df: pd.DataFrame, esquema: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+    """
+    Validate a dataset and return it unchanged if it passes.
+
+    Raises:
+        ErrorEsquema: If any rule fails (the exception carries the report)
+    """
+    reporte = validar_esquema(df, esquema)
+    if len(reporte):
+        raise ErrorEsquema(reporte)
+    return df
+
+# ============================================================================
+# RESUMEN DEL CATÁLOGO
+# ============================================================================
+
+CLASES_SCORE: Tuple[str, ...] = ('Excelente', 'Muy Bueno', 'Bueno', 'Moderado', 'Bajo')
+
+def clasificar_scores(scores: Iterable[float]) -> np.ndarray:
+    """Vectorized clasificar_score: the classification label of every score."""
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores >= 90, scores >= 80, scores >= 70, scores >= 60],
+        list(CLASES_SCORE[:4]),
+        default=CLASES_SCORE[4]
+    )
+
+class ResumenCatalogo:
+    """
+    Running aggregates of the catalog for the home page.
+
+    Per scenario keeps the product count, the score sum, the best and worst
+    product, the count per classification and the count and score sum per
+    food group. Built once from the dataset; adding a product updates every
+    aggregate in O(1), and reading one never scans the catalog. ampliar()
+    grows a copy, so the cached summary shared by every session never changes.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas: Optional[Dict[str, str]] = None):
+        if columnas is None:
+            columnas = {e: c for e, c in COLUMNAS_SCORE.items() if c in df.columns}
+        self._columnas = dict(columnas)
+        self._candado = threading.Lock()
+        self.n = len(df)
+        self._suma: Dict[str, float] = {}
+        self._mejor: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._peor: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._clases: Dict[str, Counter] = {}
+        self._categorias: Dict[str, Dict[str, List[float]]] = {}
+
+        productos = df['Producto'].to_numpy()
+        categorias = categorias_productos(df)
+        for escenario, columna in columnas.items():
+            scores = df[columna].to_numpy(dtype=float)
+            self._suma[escenario] = float(scores.sum())
+            if len(scores):
+                # First occurrence wins ties, as with nlargest / nsmallest
+                self._mejor[escenario] = (float(scores.max()), productos[int(np.argmax(scores))])
+                self._peor[escenario] = (float(scores.min()), productos[int(np.argmin(scores))])
+            else:
+                self._mejor[escenario] = (-np.inf, None)
+                self._peor[escenario] = (np.inf, None)
+
+            clases, conteo = np.unique(clasificar_scores(scores), return_counts=True)
+            self._clases[escenario] = Counter(dict(zip(clases.tolist(), conteo.tolist())))
+
+            grupos, posiciones = np.unique(categorias, return_inverse=True)
+            sumas = np.bincount(posiciones, weights=scores, minlength=len(grupos))
+            cuentas = np.bincount(posiciones, minlength=len(grupos))
+            self._categorias[escenario] = {
+                g: [int(c), float(t)] for g, c, t in zip(grupos.tolist(), cuentas, sumas)
+            }
+
+    @property
+    def escenarios(self) -> List[str]:
+        return list(self._suma)
+
+    def agregar(self, producto: str, scores: Dict[str, float], categoria: Optional[str] = None):
+        """
+        Add one product to every aggregate.
+
+        Args:
+            producto: Product name
+            scores: Scenario -> score; must cover every scenario of the summary
+            categoria: Food group (defaults to CATEGORIAS_PRODUCTO or CATEGORIA_OTROS)
+
+        Raises:
+            ValueError: If a scenario score is missing
+        """
+        faltantes = set(self._suma) - set(scores)
+        if faltantes:
+            raise ValueError(f"Missing scores for scenario(s): {sorted(faltantes)}")
+        if categoria is None:
+            categoria = CATEGORIAS_PRODUCTO.get(producto, CATEGORIA_OTROS)
+
+        with self._candado:
+            self.n += 1
+            for escenario in self._suma:
+                score = float(scores[escenario])
+                self._suma[escenario] += score
+                if score > self._mejor[escenario][0]:
+                    self._mejor[escenario] = (score, producto)
+                if score < self._peor[escenario][0]:
+                    self._peor[escenario] = (score, producto)
+                self._clases[escenario][clasificar_score(score)[0]] += 1
+                grupo = self._categorias[escenario].setdefault(categoria, [0, 0.0])
+                grupo[0] += 1
+                grupo[1] += score
+
+    def copia(self) -> 'ResumenCatalogo':
+        """Independent copy of every aggregate."""
+        nuevo = object.__new__(ResumenCatalogo)
+        with self._candado:
+            nuevo._columnas = dict(self._columnas)
+            nuevo._candado = threading.Lock()
+            nuevo.n = self.n
+            nuevo._suma = dict(self._suma)
+            nuevo._mejor = dict(self._mejor)
+            nuevo._peor = dict(self._peor)
+            nuevo._clases = {e: Counter(conteo) for e, conteo in self._clases.items()}
+            nuevo._categorias = {e: {g: list(v) for g, v in grupos.items()}
+                                 for e, grupos in self._categorias.items()}
+        return nuevo
+
+    def ampliar(self, df: pd.DataFrame) -> 'ResumenCatalogo':
+        """
+        Copy of the summary grown by the products of ``df``.
+
+        Costs one agregar() per added row; this instance is left untouched.
+
+        Args:
+            df: Added products, with the score columns of the summary
+        """
+        nuevo = self.copia()
+        scores = {e: df[c].to_numpy(dtype=float) for e, c in self._columnas.items()}
+        for i, producto in enumerate(df['Producto'].tolist()):
+            nuevo.agregar(producto, {e: valores[i] for e, valores in scores.items()})
+        return nuevo
+
+    def promedio(self, escenario: str) -> float:
+        """Mean score of the catalog (NaN if empty)."""
+        return self._suma[escenario] / self.n if self.n else float('nan')
+
+    def mejor(self, escenario: str) -> Optional[str]:
+        """Best-scoring product."""
+        return self._mejor[escenario][1]
+
+    def peor(self, escenario: str) -> Optional[str]:
+        """Worst-scoring product."""
+        return self._peor[escenario][1]
+
+    def clases(self, escenario: str) -> Dict[str, int]:
+        """Products per classification, in CLASES_SCORE order."""
+        conteo = self._clases[escenario]
+        return {clase: conteo.get(clase, 0) for clase in CLASES_SCORE}
+
+    def promedios_categoria(self, escenario: str) -> Dict[str, float]:
+        """Mean score per food group."""
+        return {g: t / c for g, (c, t) in self._categorias[escenario].items() if c}
+
+    def productos_categoria(self, escenario: str) -> Dict[str, int]:
+        """Products per food group."""
+        return {g: c for g, (c, _) in self._categorias[escenario].items() if c}
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_resumen_catalogo(_df: pd.DataFrame, version: str,
+                             _base: Optional[ResumenCatalogo] = None) -> ResumenCatalogo:
+    """
+    Build (once per dataset version) the shared home-page aggregates.
+
+    ``_base`` is the summary of the first rows of ``_df`` (a catalog that
+    grew by appended rows, like the merged evaluated products); the new
+    summary then extends a copy of it with only the appended rows.
+    """
+    if _base is not None:
+        return _base.ampliar(_df.iloc[_base.n:])
+    return ResumenCatalogo(_df)
+
+# ============================================================================
+# ALMACÉN SQLITE
+# ============================================================================
+
+# Product table columns (dataset names, so queries return dataset-shaped frames)
+COLUMNAS_ALMACEN: List[Tuple[str, str]] = [
+    ('Producto', 'TEXT NOT NULL UNIQUE'),
+    ('Categoría', 'TEXT NOT NULL'),
+    ('CF_kgCO2eq_kg', 'REAL NOT NULL'),
+    ('WF_L_kg', 'REAL NOT NULL'),
+    ('LU_m2_kg', 'REAL NOT NULL'),
+    ('Origin_Score', 'REAL NOT NULL'),
+    ('Waste_pct', 'REAL NOT NULL'),
+    ('NOVA', 'INTEGER NOT NULL'),
+    ('Kcal_100g', 'REAL')
+]
+
+def _columna_sql(columna: str) -> str:
+    return '"' + columna.replace('"', '""') + '"'
+
+class AlmacenSQLite:
+    """
+    Optional SQLite store for the scored catalog.
+
+    Products and their indicators live in one table and per-scenario scores
+    in another, indexed by (scenario, score), category, NOVA and origin, so
+    rankings, filters and lookups are index scans that do not need the
+    catalog in memory. Sessions borrow connections from a fixed pool; the
+    database runs in WAL mode so readers never block each other or a bulk
+    import.
+
+    The app itself loads the whole catalog (cargar_datos uses
+    cargar_dataframe), since every page works on the in-memory dataset with
+    the region and evaluation-log adjustments applied; the store is a
+    validated, indexed source for it, not a way to serve catalogs larger
+    than RAM.
+
+    Example:
+        >>> almacen = AlmacenSQLite('catalogo.db')
+        >>> almacen.importar(pd.read_csv('dataset_con_scores_A_y_B.csv'))
+        >>> almacen.ranking('A', limite=10)
+    """
+
+    def __init__(self, ruta: str, conexiones: int = 4, timeout: float = 30.0):
+        if conexiones < 1:
+            raise ValueError("The connection pool needs at least one connection")
+        self.ruta = ruta
+        self.timeout = timeout
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=conexiones)
+        for _ in range(conexiones):
+            self._pool.put(self._conectar())
+        with self.conexion() as con:
+            self._crear_esquema(con)
+
+    def _conectar(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.ruta, timeout=self.timeout, check_same_thread=False)
+        con.execute('PRAGMA journal_mode=WAL')
+        con.execute('PRAGMA foreign_keys=ON')
+        return con
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection (waits if every connection is in use)."""
+        con = self._pool.get(timeout=self.timeout)
+        try:
+            yield con
+        finally:
+            self._pool.put(con)
+
+    def cerrar(self):
+        """Close every pooled connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    @staticmethod
+    def _crear_esquema(con: sqlite3.Connection):
+        columnas = ',\n'.join(f'{_columna_sql(c)} {tipo}' for c, tipo in COLUMNAS_ALMACEN)
+        with con:
+            con.executescript(f"""
+                CREATE TABLE IF NOT EXISTS productos (
+                    id INTEGER PRIMARY KEY,
+                    {columnas}
+                );
+                CREATE TABLE IF NOT EXISTS scores (
+                    producto_id INTEGER NOT NULL REFERENCES productos(id) ON DELETE CASCADE,
+                    escenario TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (escenario, producto_id)
+                );
+                CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+                CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (escenario, score DESC);
+                CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos ("Categoría");
+                CREATE INDEX IF NOT EXISTS idx_productos_nova ON productos (NOVA);
+                CREATE INDEX IF NOT EXISTS idx_productos_origen ON productos (Origin_Score);
+            """)
+
+    def importar(
+        self,
+        df: pd.DataFrame,
+        columnas_score: Optional[Dict[str, str]] = None,
+        lote: int = 10_000
+    ) -> int:
+        """
+        Validate and upsert a scored dataset in one transaction.
+
+        Rows are sent in ``lote``-sized ``executemany`` batches; products
+        already in the store (same name) are updated.
+
+        Args:
+            df: Scored dataset (checked with exigir_esquema)
+            columnas_score: Scenario -> score column (defaults to
+                COLUMNAS_SCORE, restricted to the columns present in ``df``)
+            lote: Rows per executemany batch
+
+        Returns:
+            Number of products written
+
+        Raises:
+            ErrorEsquema: If the dataset fails validation (nothing is written)
+        """
+        exigir_esquema(df)
+        with self.conexion() as con, con:
+            self._escribir(con, df, columnas_score, lote)
+            self._nueva_version(con)
+        return len(df)
+
+    def importar_csv(
+        self,
+        ruta: str,
+        chunksize: int = 100_000,
+        columnas_score: Optional[Dict[str, str]] = None,
+        lote: int = 10_000
+    ) -> int:
+        """
+        Import a CSV in chunks, so the file never has to fit in memory.
+
+        The whole file is one transaction. Each chunk is validated, and its
+        product names are checked against those of the earlier chunks (kept
+        in a temporary table, not in memory); if any chunk fails, nothing is
+        written.
+
+        Returns:
+            Number of products written
+
+        Raises:
+            ErrorEsquema: If a chunk fails validation or repeats a product of
+                an earlier chunk (report rows are file row positions)
+        """
+        total = 0
+        with self.conexion() as con:
+            con.execute('CREATE TEMP TABLE importados (Producto TEXT PRIMARY KEY)')
+            con.execute('CREATE TEMP TABLE bloque (fila INTEGER, Producto TEXT)')
+            try:
+                with con:
+                    for bloque in pd.read_csv(ruta, chunksize=chunksize):
+                        reporte = validar_esquema(bloque)
+                        if len(reporte) == 0:
+                            reporte = self._repetidos(con, bloque['Producto'].astype(str))
+                        if len(reporte):
+                            reporte['Fila'] += total
+                            raise ErrorEsquema(reporte)
+                        self._escribir(con, bloque, columnas_score, lote)
+                        total += len(bloque)
+                    self._nueva_version(con)
+            finally:
+                con.execute('DROP TABLE temp.importados')
+                con.execute('DROP TABLE temp.bloque')
+        return total
+
+    @staticmethod
+    def _repetidos(con: sqlite3.Connection, nombres: pd.Series) -> pd.DataFrame:
+        """Schema report of the names already imported (records them if there are none)."""
+        con.execute('DELETE FROM bloque')
+        con.executemany('INSERT INTO bloque VALUES (?, ?)', enumerate(nombres.tolist()))
+        repetidos = con.execute('SELECT fila, Producto FROM bloque WHERE Producto IN '
+                                '(SELECT Producto FROM importados) ORDER BY fila').fetchall()
+        if not repetidos:
+            con.execute('INSERT INTO importados SELECT Producto FROM bloque')
+        return pd.DataFrame({
+            'Fila': pd.array([f for f, _ in repetidos], dtype='Int64'),
+            'Columna': 'Producto',
+            'Valor': pd.Series([p for _, p in repetidos], dtype=object),
+            'Problema': 'duplicado'
+        }, columns=COLUMNAS_REPORTE)
+
+    @staticmethod
+    def _nueva_version(con: sqlite3.Connection):
+        con.execute("INSERT INTO meta VALUES ('version', '1') "
+                    "ON CONFLICT(clave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1")
+
+    @staticmethod
+    def _escribir(con: sqlite3.Connection, df: pd.DataFrame,
+                  columnas_score: Optional[Dict[str, str]], lote: int):
+        """Upsert a validated dataset inside the caller's transaction."""
+        if columnas_score is None:
+            columnas_score = {e: c for e, c in COLUMNAS_SCORE.items() if c in df.columns}
+
+        datos = df.assign(**{'Categoría': categorias_productos(df)})
+        if 'Kcal_100g' not in datos.columns:
+            datos = datos.assign(Kcal_100g=np.nan)
+        nombres = [c for c, _ in COLUMNAS_ALMACEN]
+        datos = datos[nombres].astype(object).where(datos[nombres].notna(), None)
+
+        lista = ', '.join(_columna_sql(c) for c in nombres)
+        marcas = ', '.join('?' for _ in nombres)
+        cambios = ', '.join(f'{_columna_sql(c)} = excluded.{_columna_sql(c)}' for c in nombres[1:])
+        sql_productos = (f'INSERT INTO productos ({lista}) VALUES ({marcas}) '
+                         f'ON CONFLICT("Producto") DO UPDATE SET {cambios}')
+        sql_scores = ('INSERT INTO scores (producto_id, escenario, score) '
+                      'SELECT id, ?, ? FROM productos WHERE "Producto" = ? '
+                      'ON CONFLICT(escenario, producto_id) DO UPDATE SET score = excluded.score')
+
+        productos = df['Producto'].astype(str).tolist()
+        for inicio in range(0, len(datos), lote):
+            filas = datos.iloc[inicio:inicio + lote].itertuples(index=False, name=None)
+            con.executemany(sql_productos, filas)
+        for escenario, columna in columnas_score.items():
+            scores = df[columna].to_numpy(dtype=float).tolist()
+            for inicio in range(0, len(df), lote):
+                con.executemany(sql_scores, zip(
+                    [escenario] * len(scores[inicio:inicio + lote]),
+                    scores[inicio:inicio + lote],
+                    productos[inicio:inicio + lote]
+                ))
+
+    def version(self) -> str:
+        """Identifier that changes with every import."""
+        with self.conexion() as con:
+            fila = con.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        return f"sqlite:{os.path.abspath(self.ruta)}:{fila[0] if fila else 0}"
+
+    def __len__(self) -> int:
+        with self.conexion() as con:
+            return con.execute('SELECT COUNT(*) FROM productos').fetchone()[0]
+
+    def escenarios(self) -> List[str]:
+        """Scenarios with stored scores."""
+        with self.conexion() as con:
+            return [f[0] for f in con.execute('SELECT DISTINCT escenario FROM scores ORDER BY escenario')]
+
+    def _consultar(self, sql: str, parametros: Sequence = ()) -> pd.DataFrame:
+        with self.conexion() as con:
+            return pd.read_sql_query(sql, con, params=list(parametros))
+
+    def producto(self, nombre: str) -> Optional[pd.Series]:
+        """Look up one product (indicators and every scenario score)."""
+        df = self.cargar_dataframe(where='p."Producto" = ?', parametros=[nombre])
+        return df.iloc[0] if len(df) else None
+
+    def filtrar(
+        self,
+        escenario: str = 'A',
+        categoria: Optional[str] = None,
+        nova: Optional[Iterable[int]] = None,
+        origen: Optional[Iterable[float]] = None,
+        score_min: Optional[float] = None,
+        limite: Optional[int] = None,
+        desde: int = 0,
+        ascendente: bool = False
+    ) -> pd.DataFrame:
+        """
+        Products of one scenario sorted by score, with optional filters.
+
+        Args:
+            escenario: Scenario whose score sorts the result
+            categoria: Only this food group
+            nova: Only these NOVA levels
+            origen: Only these Origin_Score values
+            score_min: Only products scoring at least this
+            limite: Maximum number of rows (None = all)
+            desde: Rows to skip (for paging)
+            ascendente: Worst first instead of best first
+
+        Returns:
+            DataFrame with the product columns, Score and Posición (1-based
+            position within the filtered result)
+        """
+        condiciones = ['s.escenario = ?']
+        parametros: List = [escenario]
+        if categoria is not None:
+            condiciones.append('p."Categoría" = ?')
+            parametros.append(categoria)
+        for columna, valores in (('NOVA', nova), ('Origin_Score', origen)):
+            if valores is not None:
+                valores = list(valores)
+                condiciones.append(f'p.{columna} IN ({", ".join("?" for _ in valores)})')
+                parametros.extend(valores)
+        if score_min is not None:
+            condiciones.append('s.score >= ?')
+            parametros.append(score_min)
+
+        direccion = 'ASC' if ascendente else 'DESC'
+        columnas = ', '.join(f'p.{_columna_sql(c)}' for c, _ in COLUMNAS_ALMACEN)
+        sql = (f'SELECT {columnas}, s.score AS Score FROM scores s '
+               f'JOIN productos p ON p.id = s.producto_id '
+               f'WHERE {" AND ".join(condiciones)} '
+               f'ORDER BY s.score {direccion}, p.id LIMIT ? OFFSET ?')
+        parametros.extend([-1 if limite is None else limite, desde])
+        df = self._consultar(sql, parametros)
+        df.insert(0, 'Posición', np.arange(desde + 1, desde + 1 + len(df)))
+        return df
+
+    def ranking(self, escenario: str = 'A', limite: Optional[int] = None, desde: int = 0,
+                ascendente: bool = False) -> pd.DataFrame:
+        """Page of the scenario ranking (best first unless ``ascendente``)."""
+        return self.filtrar(escenario, limite=limite, desde=desde, ascendente=ascendente)
+
+    def cargar_dataframe(self, where: Optional[str] = None, parametros: Sequence = ()) -> pd.DataFrame:
+        """
+        Return the catalog in dataset shape (one score column per scenario).
+
+        Scenario scores use their COLUMNAS_SCORE name, or Score_<scenario>.
+        """
+        pivote = ', '.join(
+            f"MAX(CASE WHEN s.escenario = '{e.replace(chr(39), chr(39) * 2)}' THEN s.score END) "
+            f"AS {_columna_sql(COLUMNAS_SCORE.get(e, f'Score_{e}'))}"
+            for e in self.escenarios()
+        )
+        columnas = ', '.join(f'p.{_columna_sql(c)}' for c, _ in COLUMNAS_ALMACEN)
+        sql = (f'SELECT {columnas}{", " + pivote if pivote else ""} FROM productos p '
+               f'LEFT JOIN scores s ON s.producto_id = p.id '
+               f'{"WHERE " + where if where else ""} GROUP BY p.id ORDER BY p.id')
+        df = self._consultar(sql, parametros)
+        if df['Kcal_100g'].isna().all():
+            df = df.drop(columns='Kcal_100g')
+        return df
+
+@st.cache_resource(show_spinner=False)
+def obtener_almacen(ruta: str) -> AlmacenSQLite:
+    """One connection pool per database, shared by every session."""
+    return AlmacenSQLite(ruta)
+
+# ============================================================================
+# REGISTRO DE PRODUCTOS EVALUADOS
+# ============================================================================
+
+RUTA_REGISTRO = os.environ.get('CALCULADORA_REGISTRO', 'productos_evaluados.jsonl')
+
+class RankingIncremental:
+    """
+    Scenario ranking that accepts new products without re-sorting.
+
+    The dataset ranking is kept as the read-only sorted score array of its
+    IndiceRanking; inserted products go to a small sorted side list. A
+    product's position is one binary search in each, so an insert costs
+    O(log n) comparisons plus a list insert proportional to the (small)
+    number of inserted products. compactar() folds the side list into the
+    base with a single merge.
+    """
+
+    def __init__(self, indice: IndiceRanking, productos: Iterable[str]):
+        productos = np.asarray(productos, dtype=object)
+        self._claves = -indice.scores[indice.orden]
+        self._nombres = productos[indice.orden]
+        self.base = frozenset(productos.tolist())
+        self._extra: List[Tuple[float, int, str]] = []
+        self._extra_por_nombre: Dict[str, Tuple[float, int, str]] = {}
+        self._secuencia = 0
+        self._candado = threading.RLock()
+        self.aplicados = 0
+
+    def __len__(self) -> int:
+        return len(self._claves) + len(self._extra)
+
+    def posicion(self, score: float) -> int:
+        """1-based position a product with ``score`` would take (after ties)."""
+        clave = -float(score)
+        with self._candado:
+            base = int(np.searchsorted(self._claves, clave, side='right'))
+            return base + bisect.bisect_right(self._extra, (clave, float('inf'))) + 1
+
+    def insertar(self, producto: str, score: float) -> int:
+        """
+        Insert (or re-score) an added product.
+
+        Args:
+            producto: Product name; a previous insert with the same name is replaced
+            score: Scenario score
+
+        Returns:
+            1-based position of the product in the combined ranking
+        """
+        with self._candado:
+            anterior = self._extra_por_nombre.pop(producto, None)
+            if anterior is not None:
+                del self._extra[bisect.bisect_left(self._extra, anterior)]
+            posicion = self.posicion(score)
+            self._secuencia += 1
+            entrada = (-float(score), self._secuencia, producto)
+            bisect.insort(self._extra, entrada)
+            self._extra_por_nombre[producto] = entrada
+            return posicion
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        """The ``k`` best (product, score) pairs of the combined ranking."""
+        with self._candado:
+            base = zip(self._claves[:k].tolist(), self._nombres[:k].tolist())
+            extra = [(clave, nombre) for clave, _, nombre in self._extra[:k]]
+        combinado = heapq.merge(base, extra, key=lambda par: par[0])
+        return [(nombre, -clave) for clave, nombre in islice(combinado, k)]
+
+    def fondo(self, k: int) -> List[Tuple[str, float]]:
+        """The ``k`` worst (product, score) pairs of the combined ranking, worst first."""
+        if k <= 0:
+            return []
+        with self._candado:
+            base = zip(self._claves[::-1][:k].tolist(), self._nombres[::-1][:k].tolist())
+            extra = [(clave, nombre) for clave, _, nombre in reversed(self._extra[-k:])]
+        combinado = heapq.merge(base, extra, key=lambda par: par[0], reverse=True)
+        return [(nombre, -clave) for clave, nombre in islice(combinado, k)]
+
+    def compactar(self):
+        """Merge the inserted products into the base arrays."""
+        with self._candado:
+            if not self._extra:
+                return
+            claves = np.concatenate([self._claves, [e[0] for e in self._extra]])
+            nombres = np.concatenate([self._nombres, np.array([e[2] for e in self._extra], dtype=object)])
+            orden = np.argsort(claves, kind='stable')
+            self._claves, self._nombres = claves[orden], nombres[orden]
+            self._extra.clear()
+            self._extra_por_nombre.clear()
+
+def consenso_incremental(rankings: Dict[str, RankingIncremental], k: int) -> List[str]:
+    """
+    Products in the top ``k`` of every incremental scenario ranking.
+
+    The incremental counterpart of ConsensoRobusto: it reads only the ``k``
+    best entries of each ranking, so added products are covered without
+    rebuilding the scenario indexes.
+
+    Returns:
+        Product names, best rank sum first (ties by name)
+    """
+    rangos = [{nombre: i for i, (nombre, _) in enumerate(ranking.top(k))}
+              for ranking in rankings.values()]
+    if not rangos:
+        return []
+    comunes = set(rangos[0]).intersection(*rangos[1:])
+    return sorted(comunes, key=lambda nombre: (sum(r[nombre] for r in rangos), nombre))
+
+# Live logs, flushed by a single exit hook instead of one hook per instance
+_REGISTROS_ABIERTOS = weakref.WeakSet()
+
+@atexit.register
+def _vaciar_registros():
+    for registro in list(_REGISTROS_ABIERTOS):
+        registro.vaciar()
+
+class RegistroEvaluaciones:
+    """
+    Append-only log of products evaluated in the app.
+
+    Each evaluation is one JSON line with the dataset columns (indicators and
+    scenario scores) plus a timestamp. Writes are buffered and appended in
+    batches (every ``lote`` records or ``intervalo`` seconds, and at exit);
+    reads include the records not yet flushed. A product evaluated again
+    supersedes its previous record; when superseded lines outnumber the live
+    ones the file is compacted (rewritten atomically with one line per
+    product).
+
+    The log is not scoped to a user: every session of the process reads and
+    writes the same file. Compaction assumes a single writer process per log
+    file.
+    """
+
+    def __init__(self, ruta: str = RUTA_REGISTRO, lote: int = 16, intervalo: float = 5.0,
+                 factor_compactacion: float = 2.0, minimo_compactacion: int = 64):
+        self.ruta = ruta
+        self.lote = lote
+        self.intervalo = intervalo
+        self.factor_compactacion = factor_compactacion
+        self.minimo_compactacion = minimo_compactacion
+        self._candado = threading.RLock()
+        self._pendientes: List[Dict] = []
+        self._ultimo_vaciado = time.monotonic()
+        self.historial: List[Dict] = []
+        self._vigentes: Dict[str, Dict] = {}
+        self._lineas = 0
+        self._clave = hashlib.sha1(os.path.abspath(ruta).encode('utf-8')).hexdigest()[:12]
+
+        if os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as archivo:
+                for linea in archivo:
+                    if linea.strip():
+                        self._registrar(json.loads(linea))
+                        self._lineas += 1
+        _REGISTROS_ABIERTOS.add(self)
+
+    def _registrar(self, registro: Dict):
+        self.historial.append(registro)
+        self._vigentes.pop(registro['Producto'], None)
+        self._vigentes[registro['Producto']] = registro
+
+    @property
+    def version(self) -> str:
+        """Identifier of this log file that changes with every accepted record."""
+        return f"registro:{self._clave}:{len(self.historial)}"
+
+    def __len__(self) -> int:
+        return len(self._vigentes)
+
+    def agregar(self, registro: Dict) -> Dict:
+        """
+        Accept one evaluated product.
+
+        Args:
+            registro: Dataset columns of the product (Producto, the six
+                indicators and the scenario score columns)
+
+        Returns:
+            The stored record (with its timestamp)
+
+        Raises:
+            ErrorEsquema: If the record fails the dataset schema
+        """
+        registro = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in registro.items()}
+        registro.setdefault('fecha', datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        exigir_esquema(pd.DataFrame([registro]))
+
+        with self._candado:
+            self._registrar(registro)
+            self._pendientes.append(registro)
+            if (len(self._pendientes) >= self.lote
+                    or time.monotonic() - self._ultimo_vaciado >= self.intervalo):
+                self.vaciar()
+        return registro
+
+    def _escribir_pendientes(self):
+        if self._pendientes:
+            texto = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in self._pendientes)
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(texto)
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            self._lineas += len(self._pendientes)
+            self._pendientes.clear()
+        self._ultimo_vaciado = time.monotonic()
+
+    def vaciar(self):
+        """Append the buffered records to the log in one write, compacting if due."""
+        with self._candado:
+            self._escribir_pendientes()
+            if (self._lineas >= self.minimo_compactacion
+                    and self._lineas > self.factor_compactacion * len(self._vigentes)):
+                self.compactar()
+
+    def compactar(self):
+        """Rewrite the log atomically with only the latest record of each product."""
+        with self._candado:
+            self._escribir_pendientes()
+            directorio = os.path.dirname(os.path.abspath(self.ruta))
+            descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+                    for registro in self._vigentes.values():
+                        archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                os.replace(temporal, self.ruta)
+            except BaseException:
+                os.unlink(temporal)
+                raise
+            self._lineas = len(self._vigentes)
+
+    def productos(self) -> pd.DataFrame:
+        """Latest record of every evaluated product, in dataset shape."""
+        with self._candado:
+            return pd.DataFrame(list(self._vigentes.values())).drop(columns='fecha', errors='ignore')
+
+    def combinar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return ``df`` plus the evaluated products whose names it does not contain."""
+        nuevos = self.productos()
+        if len(nuevos) == 0:
+            return df
+        nuevos = nuevos[~nuevos['Producto'].isin(df['Producto'])]
+        return pd.concat([df, nuevos[[c for c in nuevos.columns if c in df.columns]]],
+                         ignore_index=True)
+
+    def sincronizar(self, rankings: Dict[str, RankingIncremental]):
+        """
+        Insert into scenario ``rankings`` the records they have not seen yet.
+
+        Products already ranked by name (dataset products) are skipped.
+        """
+        with self._candado:
+            for escenario, ranking in rankings.items():
+                columna = COLUMNAS_SCORE[escenario]
+                for registro in self.historial[ranking.aplicados:]:
+                    if registro['Producto'] not in ranking.base:
+                        ranking.insertar(registro['Producto'], registro[columna])
+                ranking.aplicados = len(self.historial)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_rankings_incrementales(_df: pd.DataFrame, version: str) -> Dict[str, RankingIncremental]:
+    """Shared per-scenario rankings of a dataset version that accept added products."""
+    productos = _df['Producto'].to_numpy()
+    return {e: RankingIncremental(indice, productos)
+            for e, indice in obtener_indices_ranking(_df, version).items()}
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_catalogo_combinado(_df: pd.DataFrame, version: str,
+                               _registro: RegistroEvaluaciones, version_registro: str) -> pd.DataFrame:
+    """Dataset plus the evaluated products, built once per (dataset, log) version."""
+    return _registro.combinar(_df)
+
+@st.cache_resource(show_spinner=False)
+def obtener_registro(ruta: str = RUTA_REGISTRO) -> RegistroEvaluaciones:
+    """One submission log per file, shared by every session."""
+    return RegistroEvaluaciones(ruta)
+
+# ============================================================================
+# CONTEXTO DE PÁGINA
+# ============================================================================
+
+class ContextoPagina(NamedTuple):
+    """Catalog state the entry script shares with the page scripts on each run."""
+    df: pd.DataFrame
+    version: str
+    escenario: str
+    score_col: str
+    indice: IndiceProductos
+    registro: RegistroEvaluaciones
+    # Scenario rankings including the evaluated products (None when they are not merged)
+    rankings: Optional[Dict[str, RankingIncremental]] = None
+
+# Session-state key holding the current run's ContextoPagina
+_CLAVE_CONTEXTO = '_contexto_pagina'
+
+def fijar_contexto_pagina(contexto: ContextoPagina):
+    """Publish this run's catalog state to the page scripts (per session)."""
+    st.session_state[_CLAVE_CONTEXTO] = contexto
+
+def contexto_pagina() -> ContextoPagina:
+    """Catalog state of the current run, as set by the entry script."""
+    contexto = st.session_state.get(_CLAVE_CONTEXTO)
+    if contexto is None:
+        st.error("Abre la calculadora con: streamlit run app_calculadora_sostenibilidad_v2.py")
+        st.stop()
+    return contexto
+
+# ============================================================================
+# PERFIL DE ARRANQUE
+# ============================================================================
+
+class PerfilEtapas:
+    """
+    Wall-clock timings of the named stages of each script run.
+
+    Disabled instances make ``etapa`` a no-op, so the entry script can keep
+    its stages wrapped in production. Enable with CALCULADORA_PERFIL=1
+    (perfil_arranque.py does it for its measurement run).
+
+    Example:
+        >>> perfil = PerfilEtapas()
+        >>> perfil.nueva_ejecucion()
+        >>> with perfil.etapa('cargar_datos'):
+        ...     datos = cargar_datos()
+        >>> perfil.ejecuciones()[0]['cargar_datos']  # seconds
+    """
+
+    def __init__(self, activo: bool = True):
+        self.activo = activo
+        self._ejecuciones: List[Dict[str, float]] = []
+        self._lock = threading.Lock()
+
+    def nueva_ejecucion(self):
+        """Start recording a new script run."""
+        if self.activo:
+            with self._lock:
+                self._ejecuciones.append({})
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the current run."""
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._lock:
+                if not self._ejecuciones:
+                    self._ejecuciones.append({})
+                actual = self._ejecuciones[-1]
+                actual[nombre] = actual.get(nombre, 0.0) + segundos
+
+    def ejecuciones(self) -> List[Dict[str, float]]:
+        """Stage timings (seconds) of every recorded run, oldest first."""
+        with self._lock:
+            return [dict(e) for e in self._ejecuciones]
+
+# Process-wide recorder used by the entry script
+PERFIL_ETAPAS = PerfilEtapas(os.environ.get('CALCULADORA_PERFIL', '') not in ('', '0'))
@@ -0,0 +1,35 @@
+"""
+Importa el catálogo calificado a una base SQLite indexada.
+
+El CSV se lee y valida por bloques, así que la importación no necesita el
+archivo en memoria; se hace en una sola transacción (si un bloque falla, no
+se escribe nada). La app carga la base completa en memoria si
+CALCULADORA_SQLITE apunta a ella.
+Uso:
+
+    python importar_catalogo_sqlite.py [base] [csv]
+
+    CALCULADORA_SQLITE=catalogo.db streamlit run app_calculadora_sostenibilidad_v2.py
+"""
+
+import sys
+
+from calculadora_nucleo import AlmacenSQLite, ErrorEsquema
+
+
+def main():
+    ruta_base = sys.argv[1] if len(sys.argv) > 1 else 'catalogo.db'
+    ruta_csv = sys.argv[2] if len(sys.argv) > 2 else 'dataset_con_scores_A_y_B.csv'
+
+    almacen = AlmacenSQLite(ruta_base)
+    try:
+        total = almacen.importar_csv(ruta_csv)
+    except ErrorEsquema as error:
+        sys.exit(f"No se importó el catálogo: {error}")
+    finally:
+        almacen.cerrar()
+    print(f"Catálogo importado: {total:,} productos en {ruta_base}")
+
+
+if __name__ == "__main__":
+    main()
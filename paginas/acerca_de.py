@@ -0,0 +1,198 @@
+"""ℹ️ Acerca de: metodología, fuentes y contacto."""
+
+import streamlit as st
+
+st.header("ℹ️ Acerca de esta Calculadora")
+
+st.markdown("""
+## 📊 Ecuación de Sustentabilidad Alimentaria
+
+**Proyecto:** Evaluación multi-dimensional de sostenibilidad alimentaria  
+**Investigadora:** Laura Ochoa M.  
+**LinkedIn:** [linkedin.com/in/lauraochoam](https://www.linkedin.com/in/lauraochoam/)  
+**Región:** México / Sonora  
+**Fecha:** Enero 2026  
+**Versión:** 3.0 (42 productos)
+
+---
+
+### 🎯 Objetivo del Proyecto
+
+Desarrollar una herramienta científica que permite evaluar y comparar el impacto 
+ambiental de alimentos, con el fin de:
+
+- Generar recomendaciones dietéticas basadas en evidencia
+- Cuantificar el impacto ambiental de decisiones alimentarias
+- Informar políticas públicas de sostenibilidad alimentaria en Sonora
+- Facilitar decisiones de consumo consciente
+
+---
+
+### 📐 Metodología
+
+Esta calculadora evalúa **42 productos alimenticios** usando **6 indicadores ambientales:**
+
+**1. Huella de Carbono (kg CO₂eq/kg)**
+- Mide las emisiones de gases de efecto invernadero
+- Incluye producción, transporte y procesamiento
+- Rango: 0.28 (Guayaba) - 60.0 (Res) kg CO₂eq/kg
+
+**2. Huella Hídrica (L/kg)**
+- Consumo total de agua dulce (azul, verde, gris)
+- Considera toda la cadena de producción
+- Rango: 131 (Zanahoria) - 18,900 (Café) L/kg
+
+**3. Uso de Suelo (m²/kg)**
+- Área de tierra requerida para producción
+- Incluye pastoreo, cultivos y procesamiento
+- Rango: 0.18 (Papaya) - 326 (Res) m²/kg
+
+**4. Origen (Local/Regional/Importado)**
+- Distancia desde el lugar de producción
+- Prioriza productos mexicanos y sonorenses
+
+**5. Desperdicio (%)**
+- Porcentaje de pérdida y desperdicio alimentario
+- Del campo al consumidor (datos específicos de México cuando disponibles)
+- Rango: 0.4% (Sandía) - 45.5% (Uva)
+
+**6. Procesamiento (Clasificación NOVA)**
+- Nivel 1: Alimentos naturales o mínimamente procesados
+- Nivel 2: Ingredientes culinarios procesados
+- Nivel 3: Alimentos procesados
+- Nivel 4: Productos ultra-procesados
+
+---
+
+### 🆕 Novedades en v3.0
+
+**Productos nuevos agregados:**
+- 🍉 Sandía, 🍍 Piña, 🥝 Guayaba, 🍈 Melón, 🍇 Uva, 🥭 Papaya
+- 🫘 Lenteja, 🌾 Avena
+
+**Rangos recalculados** para mejor precisión con el dataset expandido.
+
+---
+
+### ⚖️ Sistemas de Pesos (Escenarios)
+
+Se desarrollaron dos metodologías de análisis para evaluar la robustez de las recomendaciones:
+
+**Escenario A - Metodología Original (Desperdicio 25%):**
+```
+• Desperdicio: 25%
+• Origen: 20%
+• Procesamiento (NOVA): 15%
+• Carbono: 15%
+• Agua: 15%
+• Suelo: 10%
+```
+
+**Escenario B - Metodología Ajustada (Desperdicio 30%):**
+```
+• Desperdicio: 30%
+• Origen: 18%
+• Procesamiento (NOVA): 15%
+• Carbono: 14%
+• Agua: 14%
+• Suelo: 9%
+```
+
+**Justificación del Escenario B:**  
+El desperdicio tiene un efecto multiplicador: cuando se desperdicia comida, 
+se desperdician TODOS los recursos invertidos en su producción (agua, tierra, 
+energía, carbono). El Escenario B captura parcialmente este efecto manteniendo 
+transparencia metodológica.
+
+**Validación:**  
+La correlación entre ambos escenarios es r > 0.99 (casi perfecta), lo que valida 
+la robustez de las recomendaciones.
+
+---
+
+### 📚 Fuentes de Datos
+
+Todos los datos provienen de fuentes científicas verificadas y publicadas:
+
+**1. Huella de Carbono:**
+
+López-Olmedo, N., Popkin, B. M., & Taillie, L. S. (2022). The carbon footprint of the 
+Mexican diet. *Environmental Research Letters*, 17(5), 054028. 
+https://doi.org/10.1088/1748-9326/ac6b03
+
+**2. Huella Hídrica:**
+
+- SU-EATABLE LIFE Database (2020). *Food Footprint Database*. 
+  https://www.rintracciabilita.it/su-eatable/
+
+- Mekonnen, M. M., & Hoekstra, A. Y. (2011). The green, blue and grey water footprint 
+  of crops and derived crop products. *Hydrology and Earth System Sciences*, 15(5), 
+  1577-1600. https://doi.org/10.5194/hess-15-1577-2011
+
+**3. Uso de Suelo:**
+
+Food and Agriculture Organization (FAO). (2021). *FAOSTAT - Mexico Production Data* 
+(2008-2013). https://www.fao.org/faostat/
+
+**4. Desperdicio Alimentario:**
+
+Food and Agriculture Organization (FAO). (2021). *Food Loss and Waste Database - Mexico*. 
+https://www.fao.org/platform-food-loss-waste/flw-data/
+
+**5. Clasificación NOVA:**
+
+Monteiro, C. A., Cannon, G., Levy, R. B., Moubarac, J. C., Louzada, M. L., Rauber, F., 
+... & Jaime, P. C. (2019). Ultra-processed foods: What they are and how to identify them. 
+*Public Health Nutrition*, 22(5), 936-941. https://doi.org/10.1017/S1368980018003762
+
+---
+
+### 📈 Interpretación de Scores
+
+Los scores de sustentabilidad van de 0 a 100, donde 100 es el máximo nivel de 
+sustentabilidad:
+
+- **90-100:** 🟢 Excelente - Altamente sostenible, elección óptima
+- **80-89:**  🟢 Muy Bueno - Recomendado para consumo regular
+- **70-79:**  🟡 Bueno - Aceptable, moderación recomendada
+- **60-69:**  🟠 Moderado - Considerar alternativas más sostenibles
+- **< 60:**   🔴 Bajo - Limitar consumo, buscar opciones mejores
+
+---
+
+### ✅ Validación Científica
+
+**Robustez del Modelo:**
+- ✓ 100% de datos verificados con fuentes científicas publicadas
+- ✓ Dataset expandido a 42 productos
+- ✓ Modelo validado con análisis de sensibilidad (múltiples escenarios)
+- ✓ Correlación entre escenarios >0.99
+- ✓ Consistencia en recomendaciones: productos top idénticos en ambos escenarios
+
+**Limitaciones Reconocidas:**
+- Muestra de 42 productos (ampliable en futuras versiones)
+- Indicadores de nutrición y precio no incluidos (datos no verificables)
+- Variabilidad estacional no capturada
+- Optimizado para contexto México/Sonora (requiere adaptación para otras regiones)
+- No considera factores socioculturales o preferencias individuales
+
+---
+
+### 📧 Contacto
+
+**Laura Ochoa M.**  
+LinkedIn: [linkedin.com/in/lauraochoam](https://www.linkedin.com/in/lauraochoam/)
+
+Para más información sobre:
+- Metodología detallada
+- Colaboraciones científicas
+- Datos y fuentes
+- Publicación académica
+- Adaptación a otras regiones
+
+No dudes en contactarme a través de LinkedIn.
+
+---
+
+*Última actualización: Enero 2026 - Versión 3.0*
+""")
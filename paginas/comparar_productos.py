@@ -0,0 +1,60 @@
+"""🆚 Comparar Productos: comparación lado a lado de hasta 5 productos."""
+
+import streamlit as st
+
+from calculadora_graficos import cache_comparaciones, mostrar_figura
+from calculadora_nucleo import contexto_pagina, opciones_producto
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+indice = contexto.indice
+
+st.header("🆚 Comparar Productos")
+st.markdown("Selecciona hasta 5 productos para compararlos lado a lado")
+st.markdown("##")
+
+busqueda_comp = st.text_input(
+    "Buscar productos:",
+    placeholder="Escribe para filtrar la lista (ej. queso, frijol)..."
+)
+
+productos_comparar = st.multiselect(
+    "Selecciona productos:",
+    options=opciones_producto(
+        indice, busqueda_comp, st.session_state.get('productos_comparar', [])
+    ),
+    key='productos_comparar',
+    max_selections=5,
+    placeholder="Elige hasta 5 productos para comparar..."
+)
+
+if len(productos_comparar) >= 2:
+    # Mismo conjunto de productos (en cualquier orden) = misma comparación en caché
+    comparacion = cache_comparaciones().obtener(df, version, escenario, productos_comparar)
+    
+    st.markdown("---")
+    st.subheader("📊 Comparación de Scores")
+    
+    # Gráfico de barras
+    mostrar_figura(comparacion.barras)
+    
+    st.markdown("##")
+    
+    # Tabla comparativa
+    st.subheader("📋 Detalle de Indicadores")
+    
+    st.dataframe(comparacion.tabla, use_container_width=True, hide_index=True)
+    
+    st.markdown("##")
+    
+    # Gráfico de radar comparativo
+    st.subheader("🎯 Perfiles de Sustentabilidad")
+    
+    mostrar_figura(comparacion.radar)
+
+elif len(productos_comparar) == 1:
+    st.info("👆 Selecciona al menos 2 productos para compararlos")
+else:
+    st.info("👆 Selecciona productos del menú de arriba para comenzar la comparación")
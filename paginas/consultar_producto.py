@@ -0,0 +1,115 @@
+"""🔍 Consultar Producto: evaluación completa de un producto del catálogo."""
+
+import streamlit as st
+
+from calculadora_graficos import mostrar_figura, obtener_figura
+from calculadora_nucleo import (
+    clasificar_score,
+    contexto_pagina,
+    obtener_contribuciones,
+    opciones_producto
+)
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+score_col = contexto.score_col
+indice = contexto.indice
+
+st.header("🔍 Consultar Producto")
+st.markdown("Selecciona un alimento para ver su evaluación completa")
+st.markdown("##")
+
+busqueda = st.text_input(
+    "Buscar producto:",
+    placeholder="Escribe para buscar (ej. platano, limon, tortilla)..."
+)
+
+producto_sel = st.selectbox(
+    "Selecciona un producto:",
+    options=opciones_producto(indice, busqueda),
+    index=None,
+    placeholder="Elige un producto de la lista..."
+)
+
+if producto_sel:
+    prod_data = indice.fila(df, producto_sel)
+    
+    st.markdown("---")
+    
+    # Score principal
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        st.subheader(f"📋 {producto_sel}")
+        clasificacion, emoji = clasificar_score(prod_data[score_col])
+        st.markdown(f"**Clasificación:** {clasificacion} {emoji}")
+    
+    with col2:
+        st.metric("Score", f"{prod_data[score_col]:.1f}")
+    
+    with col3:
+        ranking = (df[score_col] >= prod_data[score_col]).sum()
+        st.metric("Posición", f"#{ranking}")
+    
+    st.markdown("##")
+    
+    # Indicadores detallados
+    st.subheader("📊 Indicadores Ambientales")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "🌡️ Huella de Carbono",
+            f"{prod_data['CF_kgCO2eq_kg']:.2f} kg CO₂"
+        )
+        st.metric(
+            "💧 Huella Hídrica",
+            f"{prod_data['WF_L_kg']:,.0f} L"
+        )
+    
+    with col2:
+        st.metric(
+            "🌱 Uso de Suelo",
+            f"{prod_data['LU_m2_kg']:.2f} m²"
+        )
+        origen_texto = {0: "Local (Sonora)", 50: "Regional (México)", 100: "Importado"}
+        st.metric(
+            "🇲🇽 Origen",
+            origen_texto.get(prod_data['Origin_Score'], "N/D")
+        )
+    
+    with col3:
+        st.metric(
+            "🗑️ Desperdicio",
+            f"{prod_data['Waste_pct']:.1f}%"
+        )
+        nova_texto = {1: "Natural", 2: "Procesado", 3: "Muy procesado", 4: "Ultra-procesado"}
+        st.metric(
+            "🔬 Nivel NOVA",
+            nova_texto.get(int(prod_data['NOVA']), "N/D")
+        )
+    
+    st.markdown("##")
+    
+    # Gráfico de radar
+    st.subheader("🎯 Perfil de Sustentabilidad")
+    
+    mostrar_figura(obtener_figura(df, version, escenario, 'radar', producto_sel))
+    
+    st.markdown("##")
+    
+    # Desglose de contribuciones
+    st.subheader("🧩 ¿Por qué esta posición?")
+    st.caption("Puntos que aporta cada indicador al score según los pesos del escenario")
+    
+    mostrar_figura(obtener_figura(df, version, escenario, 'contribuciones', producto_sel))
+    
+    # El desglose suma el score recalculado, que puede diferir del publicado en el dataset
+    recalculado = obtener_contribuciones(df, version)[escenario].iloc[indice.posicion(producto_sel)].sum()
+    if abs(recalculado - prod_data[score_col]) >= 0.05:
+        st.caption(f"ℹ️ El desglose suma {recalculado:.1f} puntos: el score recalculado con los rangos "
+                   f"y pesos actuales. El score mostrado arriba ({prod_data[score_col]:.1f}) es el "
+                   f"publicado en el dataset.")
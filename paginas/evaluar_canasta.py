@@ -0,0 +1,106 @@
+"""🧺 Evaluar Canasta: score de una canasta o receta y sustituciones sugeridas."""
+
+import streamlit as st
+
+from calculadora_nucleo import (
+    calcular_scores_cestas,
+    cestas_desde_dict,
+    clasificar_score,
+    contexto_pagina,
+    obtener_indice_categorias,
+    opciones_producto,
+    sugerir_sustituciones
+)
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+score_col = contexto.score_col
+indice = contexto.indice
+
+st.header("🧺 Evaluar Canasta")
+st.markdown("Arma una comida, receta o canasta con varios productos y sus cantidades")
+st.markdown("##")
+
+busqueda_cesta = st.text_input(
+    "Buscar productos:",
+    placeholder="Escribe para filtrar la lista (ej. frijol, tortilla)..."
+)
+
+productos_cesta = st.multiselect(
+    "Ingredientes:",
+    options=opciones_producto(
+        indice, busqueda_cesta, st.session_state.get('productos_cesta', [])
+    ),
+    key='productos_cesta',
+    placeholder="Elige los productos de tu canasta..."
+)
+
+if productos_cesta:
+    st.markdown("### ⚖️ Cantidades (kg)")
+    
+    cantidades = {}
+    columnas = st.columns(3)
+    for idx, producto in enumerate(productos_cesta):
+        with columnas[idx % 3]:
+            cantidades[producto] = st.number_input(
+                producto,
+                min_value=0.01,
+                max_value=100.0,
+                value=0.25,
+                step=0.05,
+                key=f"kg_{producto}"
+            )
+    
+    st.markdown("---")
+    
+    canasta = calcular_scores_cestas(df, cestas_desde_dict({'Tu canasta': cantidades})).iloc[0]
+    clasificacion, emoji = clasificar_score(canasta[score_col])
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Score de la canasta", f"{canasta[score_col]:.1f}")
+    
+    with col2:
+        st.metric("Clasificación", f"{clasificacion} {emoji}")
+    
+    with col3:
+        st.metric("Peso total", f"{canasta['Kg_total']:.2f} kg")
+    
+    st.markdown("##")
+    
+    st.subheader("📊 Impacto total de la canasta")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("🌡️ Carbono", f"{canasta['CF_kgCO2eq_kg'] * canasta['Kg_total']:.2f} kg CO₂")
+    
+    with col2:
+        st.metric("💧 Agua", f"{canasta['WF_L_kg'] * canasta['Kg_total']:,.0f} L")
+    
+    with col3:
+        st.metric("🌱 Suelo", f"{canasta['LU_m2_kg'] * canasta['Kg_total']:.2f} m²")
+    
+    st.markdown("##")
+    
+    # Sugerencias de sustitución dentro de la misma categoría
+    st.subheader("💡 Cambios sugeridos")
+    st.caption("Productos de la misma categoría que mejoran el score de tu canasta")
+    
+    sugerencias = sugerir_sustituciones(
+        df, cantidades, escenario,
+        indice_categorias=obtener_indice_categorias(df, version, escenario)
+    )
+    
+    if len(sugerencias) > 0:
+        df_sugerencias = sugerencias[['Producto', 'Sustituto', 'Categoría', 'Mejora']].copy()
+        df_sugerencias['Mejora'] = df_sugerencias['Mejora'].map(lambda x: f"+{x:.1f}")
+        df_sugerencias.columns = ['Cambiar', 'Por', 'Categoría', 'Mejora del score']
+        st.dataframe(df_sugerencias, use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Tu canasta ya usa los productos más sustentables de cada categoría")
+else:
+    st.info("👆 Selecciona productos del menú de arriba para armar tu canasta")
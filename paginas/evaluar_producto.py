@@ -0,0 +1,236 @@
+"""➕ Evaluar Nuevo Producto: score de un producto nuevo a partir de sus indicadores."""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from calculadora_nucleo import (
+    calcular_score_memo,
+    clasificar_score,
+    COLUMNAS_SCORE,
+    contexto_pagina,
+    ErrorEsquema,
+    obtener_rankings_incrementales
+)
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+score_col = contexto.score_col
+indice = contexto.indice
+registro = contexto.registro
+
+st.header("➕ Evaluar Nuevo Producto")
+st.markdown("Ingresa los datos de un alimento que no está en nuestra base de datos")
+st.markdown("##")
+
+nombre_nuevo = st.text_input(
+    "Nombre del producto:",
+    placeholder="Ejemplo: Quinoa, Pescado blanco, Kiwi..."
+)
+
+st.markdown("### 📊 Ingresa los indicadores ambientales")
+st.markdown("*Si no conoces algún valor exacto, puedes usar estimaciones basadas en productos similares*")
+st.markdown("##")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("**🌡️ Huella de Carbono (Clima)**")
+    st.caption("Kilogramos de CO₂ emitidos para producir 1 kg de este alimento")
+    cf = st.number_input(
+        "kg CO₂ / kg producto",
+        min_value=0.0,
+        max_value=100.0,
+        value=2.0,
+        step=0.1,
+        label_visibility="collapsed"
+    )
+    st.caption("📝 Ejemplo: Guayaba = 0.28, Pollo = 6.9, Res = 60")
+    
+    st.markdown("##")
+    
+    st.markdown("**💧 Huella Hídrica (Agua)**")
+    st.caption("Litros de agua necesarios para producir 1 kg de este alimento")
+    wf = st.number_input(
+        "Litros / kg producto",
+        min_value=0,
+        max_value=50000,
+        value=1000,
+        step=50,
+        label_visibility="collapsed"
+    )
+    st.caption("📝 Ejemplo: Zanahoria = 131, Manzana = 822, Café = 18,900")
+    
+    st.markdown("##")
+    
+    st.markdown("**🌱 Uso de Suelo (Tierra)**")
+    st.caption("Metros cuadrados de tierra que se ocuparon para producir 1 kg")
+    lu = st.number_input(
+        "m² / kg producto",
+        min_value=0.0,
+        max_value=500.0,
+        value=5.0,
+        step=0.5,
+        label_visibility="collapsed"
+    )
+    st.caption("📝 Ejemplo: Papaya = 0.18, Pollo = 7.1, Res = 326")
+
+with col2:
+    st.markdown("**🇲🇽 Origen**")
+    st.caption("¿Se produce en México o se importa de otro país?")
+    origin = st.selectbox(
+        "Origen del producto",
+        options=[0, 50, 100],
+        format_func=lambda x: "Local (Sonora)" if x == 0 else 
+                             "Regional (México)" if x == 50 else "Importado",
+        label_visibility="collapsed"
+    )
+    
+    st.markdown("##")
+    
+    st.markdown("**🗑️ Desperdicio**")
+    st.caption("Qué porcentaje se desperdicia en el camino del campo a tu mesa")
+    waste = st.number_input(
+        "Porcentaje (%)",
+        min_value=0.0,
+        max_value=100.0,
+        value=10.0,
+        step=1.0,
+        label_visibility="collapsed"
+    )
+    st.caption("📝 Ejemplo: Sandía = 0.4%, Uva = 45.5%, Promedio = 15%")
+    
+    st.markdown("##")
+    
+    st.markdown("**🔬 Procesamiento (NOVA)**")
+    st.caption("Qué tan transformado está: natural, procesado o ultra-procesado")
+    nova = st.selectbox(
+        "Nivel NOVA",
+        options=[1, 2, 3, 4],
+        format_func=lambda x: f"{x} - {'Natural' if x == 1 else 'Procesado' if x == 2 else 'Muy procesado' if x == 3 else 'Ultra-procesado'}",
+        label_visibility="collapsed"
+    )
+
+st.markdown("##")
+
+guardar = st.checkbox(
+    "💾 Guardar en el catálogo compartido de productos evaluados",
+    value=False,
+    help="El catálogo de productos evaluados es común a todos los usuarios de la aplicación: "
+         "lo guardado se conserva entre visitas, otros usuarios pueden verlo y puede incluirse en el catálogo."
+)
+
+if st.button("🔍 Calcular Score de Sustentabilidad", type="primary"):
+    if not nombre_nuevo:
+        st.warning("⚠️ Por favor ingresa un nombre para el producto")
+    else:
+        st.markdown("---")
+        
+        # Calcular scores
+        score_a, _ = calcular_score_memo(cf, wf, lu, origin, waste, nova, 'A')
+        score_b, _ = calcular_score_memo(cf, wf, lu, origin, waste, nova, 'B')
+        
+        # Los valores extremos permitidos por los widgets pueden salir de la escala 0-100
+        score_a = min(max(score_a, 0.0), 100.0)
+        score_b = min(max(score_b, 0.0), 100.0)
+        
+        score_actual = score_a if escenario == 'A' else score_b
+        clasificacion, emoji = clasificar_score(score_actual)
+        
+        # Guardar y ubicar en el ranking sin reordenar el catálogo
+        guardado = False
+        if guardar:
+            if indice.posicion(nombre_nuevo) is not None:
+                st.info(f"ℹ️ **{nombre_nuevo}** ya está en la base de datos; no se guardó.")
+            else:
+                try:
+                    registro.agregar({
+                        'Producto': nombre_nuevo,
+                        'CF_kgCO2eq_kg': cf,
+                        'WF_L_kg': wf,
+                        'LU_m2_kg': lu,
+                        'Origin_Score': origin,
+                        'Waste_pct': waste,
+                        'NOVA': nova,
+                        COLUMNAS_SCORE['A']: score_a,
+                        COLUMNAS_SCORE['B']: score_b
+                    })
+                    guardado = True
+                except ErrorEsquema as error:
+                    st.warning(f"⚠️ **{nombre_nuevo}** no se guardó: {error}")
+        
+        # Con el registro ya combinado, los rankings del contexto son los del dataset base
+        rankings = contexto.rankings or obtener_rankings_incrementales(df, version)
+        registro.sincronizar(rankings)
+        ranking = rankings[escenario]
+        posicion = ranking.posicion(score_actual) - (1 if guardado else 0)
+        
+        # Resultados
+        st.success(f"✅ Evaluación completada para: **{nombre_nuevo}**")
+        st.markdown("##")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Score de Sustentabilidad", f"{score_actual:.1f}")
+        
+        with col2:
+            st.metric("Clasificación", f"{clasificacion} {emoji}")
+        
+        with col3:
+            # Comparar con promedio
+            promedio = df[score_col].mean()
+            diferencia = score_actual - promedio
+            st.metric("vs. Promedio", f"{diferencia:+.1f}", 
+                     delta_color="normal" if diferencia > 0 else "inverse")
+        
+        with col4:
+            st.metric("Posición", f"#{posicion} de {len(ranking) + (0 if guardado else 1)}")
+        
+        st.markdown("##")
+        
+        # Comparación con productos existentes
+        st.subheader("📊 Comparación con productos similares")
+        
+        # Encontrar los 5 productos más cercanos en score
+        df_temp = df.copy()
+        df_temp['diferencia'] = abs(df_temp[score_col] - score_actual)
+        similares = df_temp.nsmallest(5, 'diferencia')
+        
+        fig = go.Figure()
+        
+        # Agregar productos similares
+        fig.add_trace(go.Bar(
+            x=similares['Producto'],
+            y=similares[score_col],
+            name='Productos existentes',
+            marker_color='lightblue'
+        ))
+        
+        # Agregar el nuevo producto
+        fig.add_trace(go.Bar(
+            x=[nombre_nuevo],
+            y=[score_actual],
+            name='Tu producto',
+            marker_color='#2ecc71'
+        ))
+        
+        fig.update_layout(
+            title="Comparación de Scores",
+            xaxis_title="Producto",
+            yaxis_title="Score de Sustentabilidad",
+            showlegend=True,
+            height=400
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+
+if len(registro) > 0:
+    st.markdown("##")
+    with st.expander(f"📋 Catálogo compartido de productos evaluados ({len(registro)})"):
+        guardados = registro.productos()[['Producto', score_col, 'CF_kgCO2eq_kg', 'WF_L_kg', 'NOVA']]
+        guardados = guardados.sort_values(score_col, ascending=False)
+        guardados.columns = ['Producto', 'Score', 'Carbono', 'Agua (L)', 'NOVA']
+        guardados['Score'] = guardados['Score'].round(1)
+        st.dataframe(guardados, use_container_width=True, hide_index=True)
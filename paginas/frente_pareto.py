@@ -0,0 +1,58 @@
+"""🧭 Frente de Pareto: productos no dominados y capas de Pareto."""
+
+import streamlit as st
+
+from calculadora_graficos import mostrar_figura, obtener_figura
+from calculadora_nucleo import contexto_pagina, obtener_capas_pareto
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+score_col = contexto.score_col
+
+st.header("🧭 Frente de Pareto")
+
+st.markdown("""
+<div class="info-box">
+<p style="margin:0;"><strong>Sin pesos, sin promedios.</strong></p>
+<p style="margin:0.5rem 0 0 0;">Un producto está en el frente de Pareto si ningún otro alimento es igual o mejor 
+en los 6 indicadores a la vez. Las capas siguientes se obtienen al retirar las anteriores: 
+muestran los compromisos que un score ponderado puede ocultar.</p>
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("##")
+
+capas = obtener_capas_pareto(df, version)
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    st.metric("Productos en el frente", int((capas == 1).sum()))
+
+with col2:
+    st.metric("Número de capas", int(capas.max()))
+
+with col3:
+    st.metric("Productos evaluados", len(df))
+
+st.markdown("##")
+
+st.subheader("🏅 Productos no dominados")
+
+df_frente = df[capas == 1][['Producto', score_col, 'CF_kgCO2eq_kg', 'WF_L_kg',
+                            'LU_m2_kg', 'Waste_pct', 'NOVA']].copy()
+df_frente = df_frente.sort_values(score_col, ascending=False)
+df_frente.columns = ['Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)',
+                     'Desperdicio (%)', 'NOVA']
+df_frente['Score'] = df_frente['Score'].round(1)
+df_frente['Agua (L)'] = df_frente['Agua (L)'].apply(lambda x: f"{x:,.0f}")
+
+st.dataframe(df_frente, use_container_width=True, hide_index=True)
+
+st.markdown("##")
+
+st.subheader("📊 Productos por capa")
+
+mostrar_figura(obtener_figura(df, version, escenario, 'capas_pareto'))
@@ -0,0 +1,112 @@
+"""🏠 Inicio: presentación de la calculadora y resumen del catálogo."""
+
+import streamlit as st
+
+from calculadora_graficos import mostrar_figura, obtener_figura
+from calculadora_nucleo import contexto_pagina, obtener_resumen_catalogo
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+
+resumen = obtener_resumen_catalogo(df, version)
+
+# Explicación de qué hace la calculadora
+st.markdown(f"""
+<div class="info-box">
+<h3 style="margin-top:0;">¿Qué hace esta calculadora?</h3>
+<p style="margin-bottom:0.5rem;">Esta herramienta te ayuda a entender y comparar el impacto ambiental de <strong>{resumen.n} alimentos</strong> comunes en México. Puedes:</p>
+<ul style="margin-bottom:0;">
+    <li><strong>Consultar cualquier producto</strong> y ver su impacto detallado</li>
+    <li><strong>Evaluar un alimento nuevo</strong> ingresando sus datos ambientales</li>
+    <li><strong>Comparar hasta 5 productos</strong> lado a lado</li>
+    <li><strong>Evaluar una canasta o receta</strong> combinando varios productos</li>
+    <li><strong>Ver rankings</strong> de los mejores y peores según diferentes criterios</li>
+</ul>
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("##")
+
+# Explicación de indicadores
+st.subheader("Los 6 indicadores que medimos")
+st.markdown("Evaluamos cada alimento con estos criterios ambientales:")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">🌡️ Huella de Carbono (Clima)</div>
+        <div class="indicator-desc">Kilogramos de CO₂ emitidos para producir 1 kg de este alimento</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">💧 Huella Hídrica (Agua)</div>
+        <div class="indicator-desc">Litros de agua necesarios para producir 1 kg de este alimento</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">🌱 Uso de Suelo (Tierra)</div>
+        <div class="indicator-desc">Metros cuadrados de tierra que se ocuparon para producir 1 kg de este alimento</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+with col2:
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">🇲🇽 Origen</div>
+        <div class="indicator-desc">¿Se produce en México o se importa de otro país?</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">🗑️ Desperdicio</div>
+        <div class="indicator-desc">Qué porcentaje se desperdicia en el camino del campo a tu mesa</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="indicator-box">
+        <div class="indicator-title">🔬 Procesamiento (NOVA)</div>
+        <div class="indicator-desc">Qué tan transformado está: natural, procesado o ultra-procesado</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown("##")
+
+# Estadísticas rápidas
+st.subheader("Un vistazo a los datos")
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric("Productos evaluados", resumen.n)
+
+with col2:
+    st.metric("Más sustentable", resumen.mejor(escenario))
+
+with col3:
+    st.metric("Menos sustentable", resumen.peor(escenario))
+
+with col4:
+    st.metric("Score promedio", f"{resumen.promedio(escenario):.1f}")
+
+st.markdown("##")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    mostrar_figura(obtener_figura(df, version, escenario, 'clases'))
+
+with col2:
+    mostrar_figura(obtener_figura(df, version, escenario, 'categorias'))
+
+st.markdown("##")
+st.info("👈 Usa el menú de la izquierda para explorar las diferentes funciones")
@@ -0,0 +1,120 @@
+"""⭐ Los Más Sustentables: productos en el top-k de todas las metodologías."""
+
+import plotly.express as px
+import streamlit as st
+
+from calculadora_nucleo import (
+    clasificar_score,
+    consenso_incremental,
+    ConsensoRobusto,
+    contexto_pagina,
+    obtener_indices_ranking
+)
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+score_col = contexto.score_col
+indice = contexto.indice
+
+st.header("⭐ Los Más Sustentables")
+
+if len(df) > 3:
+    top_k = st.slider(
+        "Posiciones del top en cada metodología:",
+        min_value=3,
+        max_value=min(30, len(df)),
+        value=min(10, len(df))
+    )
+else:
+    # Catálogo muy pequeño para elegir k: el top incluye todos los productos
+    top_k = len(df)
+
+# Intersección del top k de todas las metodologías
+if contexto.rankings:
+    # Productos evaluados combinados: sin reconstruir los índices por escenario
+    productos_robustos_lista = [p for p in consenso_incremental(contexto.rankings, top_k) if p in indice]
+else:
+    consenso = ConsensoRobusto(obtener_indices_ranking(df, version), top_k)
+    productos_robustos_lista = df['Producto'].to_numpy()[consenso.productos()].tolist()
+
+if len(productos_robustos_lista) > 0:
+    
+    # Explicación clara
+    st.markdown(f"""
+    <div class="info-box">
+    <p style="margin:0;"><strong>Estos {len(productos_robustos_lista)} alimentos tienen el mejor impacto ambiental en todas las metodologías.</strong></p>
+    <p style="margin:0.5rem 0 0 0;">Consideran huella de carbono, agua, tierra, origen mexicano, desperdicio y nivel de procesamiento. 
+    Sin importar qué metodología uses, estos productos siempre están en el top {top_k}.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("##")
+    
+    # Lista de productos con sus scores
+    st.subheader(f"🏆 Los {len(productos_robustos_lista)} Campeones")
+    
+    # Obtener datos de los productos robustos
+    df_top = indice.filas(df, productos_robustos_lista).copy()
+    df_top = df_top.sort_values(score_col, ascending=False)
+    
+    # Crear cards para cada producto
+    for idx, row in df_top.iterrows():
+        col1, col2, col3 = st.columns([3, 1, 1])
+        
+        with col1:
+            st.markdown(f"### {row['Producto']}")
+        
+        with col2:
+            clasificacion, emoji = clasificar_score(row[score_col])
+            st.markdown(f"**{clasificacion}** {emoji}")
+        
+        with col3:
+            st.metric("Score", f"{row[score_col]:.1f}")
+        
+        # Mini resumen de indicadores
+        with st.expander("Ver detalles"):
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("🌡️ Carbono", f"{row['CF_kgCO2eq_kg']:.2f} kg")
+                st.metric("💧 Agua", f"{row['WF_L_kg']:,.0f} L")
+            
+            with col2:
+                st.metric("🌱 Suelo", f"{row['LU_m2_kg']:.2f} m²")
+                origen_texto = {0: "Local", 50: "Regional", 100: "Importado"}
+                st.metric("🇲🇽 Origen", origen_texto.get(row['Origin_Score'], "N/D"))
+            
+            with col3:
+                st.metric("🗑️ Desperdicio", f"{row['Waste_pct']:.1f}%")
+                nova_texto = {1: "Natural", 2: "Procesado", 3: "Muy procesado", 4: "Ultra-procesado"}
+                st.metric("🔬 NOVA", nova_texto.get(int(row['NOVA']), "N/D"))
+        
+        st.markdown("---")
+    
+    st.markdown("##")
+    
+    # Visualización
+    st.subheader("📊 Comparación Visual")
+    
+    fig = px.bar(
+        df_top,
+        x='Producto',
+        y=score_col,
+        color=score_col,
+        color_continuous_scale='Greens',
+        text=score_col
+    )
+    
+    fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    fig.update_layout(
+        xaxis_title="",
+        yaxis_title="Score de Sustentabilidad",
+        showlegend=False,
+        height=400
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+else:
+    st.warning(f"⚠️ Ningún producto está en el top {top_k} de todas las metodologías.")
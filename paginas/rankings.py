@@ -0,0 +1,173 @@
+"""📊 Ver Rankings: rankings por escenario, estabilidad y exportación."""
+
+import streamlit as st
+
+from calculadora_graficos import mostrar_figura, obtener_figura
+from calculadora_nucleo import contexto_pagina, exportar_resultados_excel, obtener_estabilidad
+
+contexto = contexto_pagina()
+df = contexto.df
+version = contexto.version
+escenario = contexto.escenario
+score_col = contexto.score_col
+indice = contexto.indice
+
+# Con los productos evaluados combinados, el orden sale de los rankings incrementales
+ranking = contexto.rankings[escenario] if contexto.rankings else None
+
+def filas_ranking(pares):
+    """Filas del catálogo de los pares (producto, score), en el orden del ranking."""
+    return indice.filas(df, [producto for producto, _ in pares])
+
+st.header("📊 Rankings de Sustentabilidad")
+st.markdown("Explora los rankings de productos según diferentes criterios")
+st.markdown("##")
+
+# Selector de tipo de ranking
+tipo_ranking = st.radio(
+    "Selecciona el tipo de ranking:",
+    ["🏆 Top 15 - Más Sustentables",
+     "⚠️ Bottom 10 - Menos Sustentables",
+     "🔥 Ranking Completo",
+     "🔀 Estabilidad entre Escenarios"]
+)
+
+st.markdown("---")
+
+if "Top 15" in tipo_ranking:
+    st.subheader("🏆 Top 15 - Los Más Sustentables")
+    
+    top15 = df.nlargest(15, score_col) if ranking is None else filas_ranking(ranking.top(15))
+    top15 = top15[['Producto', score_col, 'CF_kgCO2eq_kg', 
+                   'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
+    top15['Posición'] = range(1, len(top15) + 1)
+    top15 = top15[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
+                  'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
+    
+    # Renombrar columnas
+    top15.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
+    
+    # Formatear
+    top15['Score'] = top15['Score'].round(1)
+    top15['Carbono'] = top15['Carbono'].round(2)
+    top15['Agua (L)'] = top15['Agua (L)'].apply(lambda x: f"{x:,.0f}")
+    top15['Suelo (m²)'] = top15['Suelo (m²)'].round(2)
+    top15['Desperdicio (%)'] = top15['Desperdicio (%)'].round(1)
+    
+    st.dataframe(top15, use_container_width=True, hide_index=True)
+    
+    # Gráfico
+    mostrar_figura(obtener_figura(df, version, escenario, 'top', 15))
+    
+elif "Bottom 10" in tipo_ranking:
+    st.subheader("⚠️ Bottom 10 - Los Menos Sustentables")
+    
+    bottom10 = df.nsmallest(10, score_col) if ranking is None else filas_ranking(ranking.fondo(10))
+    bottom10 = bottom10[['Producto', score_col, 'CF_kgCO2eq_kg', 
+                         'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
+    bottom10['Posición'] = range(len(df), len(df) - len(bottom10), -1)
+    bottom10 = bottom10[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
+                        'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
+    
+    # Renombrar columnas
+    bottom10.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
+    
+    # Formatear
+    bottom10['Score'] = bottom10['Score'].round(1)
+    bottom10['Carbono'] = bottom10['Carbono'].round(2)
+    bottom10['Agua (L)'] = bottom10['Agua (L)'].apply(lambda x: f"{x:,.0f}")
+    bottom10['Suelo (m²)'] = bottom10['Suelo (m²)'].round(2)
+    bottom10['Desperdicio (%)'] = bottom10['Desperdicio (%)'].round(1)
+    
+    st.dataframe(bottom10, use_container_width=True, hide_index=True)
+    
+    # Gráfico
+    mostrar_figura(obtener_figura(df, version, escenario, 'bottom', 10))
+    
+elif "Estabilidad" in tipo_ranking:
+    st.subheader("🔀 ¿Cuánto cambia el ranking entre escenarios?")
+    
+    resumen, cambios = obtener_estabilidad(df, version)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Spearman (A vs B)", f"{resumen.loc[0, 'Spearman']:.3f}")
+    
+    with col2:
+        st.metric("Kendall (A vs B)", f"{resumen.loc[0, 'Kendall']:.3f}")
+    
+    with col3:
+        st.metric("Posiciones sin cambio", f"{resumen.loc[0, 'Sin_cambio_pct']:.0f}%")
+    
+    st.caption("1 = mismo orden en ambos escenarios; valores menores indican rankings más distintos.")
+    
+    st.markdown("##")
+    
+    st.subheader("📈 Los que más se mueven")
+    
+    mostrar_figura(obtener_figura(df, version, escenario, 'movimientos', 10))
+    
+    tabla = cambios.sort_values('Posición_A')
+    tabla.columns = ['Producto', 'Posición A', 'Posición B', 'Cambio']
+    st.dataframe(tabla, use_container_width=True, hide_index=True, height=400)
+    
+else:  # Ranking completo
+    st.subheader("🔥 Ranking Completo - Todos los Productos")
+    
+    if ranking is None:
+        ranking_completo = df.sort_values(score_col, ascending=False)
+    else:
+        ranking_completo = filas_ranking(ranking.top(len(ranking)))
+    ranking_completo = ranking_completo[['Producto', score_col, 'CF_kgCO2eq_kg', 
+                                         'WF_L_kg', 'LU_m2_kg', 'Waste_pct']].copy()
+    ranking_completo['Posición'] = range(1, len(ranking_completo) + 1)
+    ranking_completo = ranking_completo[['Posición', 'Producto', score_col, 'CF_kgCO2eq_kg', 
+                                        'WF_L_kg', 'LU_m2_kg', 'Waste_pct']]
+    
+    # Renombrar columnas
+    ranking_completo.columns = ['#', 'Producto', 'Score', 'Carbono', 'Agua (L)', 'Suelo (m²)', 'Desperdicio (%)']
+    
+    # Formatear
+    ranking_completo['Score'] = ranking_completo['Score'].round(1)
+    ranking_completo['Carbono'] = ranking_completo['Carbono'].round(2)
+    ranking_completo['Agua (L)'] = ranking_completo['Agua (L)'].apply(lambda x: f"{x:,.0f}")
+    ranking_completo['Suelo (m²)'] = ranking_completo['Suelo (m²)'].round(2)
+    ranking_completo['Desperdicio (%)'] = ranking_completo['Desperdicio (%)'].round(1)
+    
+    st.dataframe(ranking_completo, use_container_width=True, hide_index=True, height=600)
+    
+    st.markdown("##")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        mostrar_figura(obtener_figura(df, version, escenario, 'distribucion'))
+    
+    with col2:
+        mostrar_figura(obtener_figura(df, version, escenario, 'curva_ranking'))
+
+st.markdown("##")
+
+# Botón de descarga
+st.subheader("💾 Exportar Datos")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    excel_data = exportar_resultados_excel(df, escenario)
+    st.download_button(
+        label="📥 Descargar en Excel",
+        data=excel_data,
+        file_name=f"ranking_sustentabilidad_{escenario}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+with col2:
+    csv = df.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        label="📥 Descargar en CSV",
+        data=csv,
+        file_name=f"datos_completos_{escenario}.csv",
+        mime="text/csv"
+    )
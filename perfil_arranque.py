@@ -0,0 +1,227 @@
+"""
+Perfil de arranque de la calculadora: tiempos de importación y de las etapas
+del primer render de app_calculadora_sostenibilidad_v2.py. Uso:
+
+    python perfil_arranque.py [--pagina paginas/inicio.py] [--reporte perfil_arranque.json]
+                              [--presupuesto presupuesto_arranque.json]
+
+Cada medición corre en un intérprete nuevo (arranque en frío). Las etapas
+las registra la propia aplicación con CALCULADORA_PERFIL=1. Con --presupuesto
+el script termina con código 1 si alguna medición excede su límite.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+_INICIO = time.perf_counter()
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+ENTRADA = os.path.join(DIRECTORIO, 'app_calculadora_sostenibilidad_v2.py')
+
+# Candidates measured in a fresh interpreter, in the order the app meets them;
+# a module already pulled in by an earlier one costs 0 ms
+MODULOS_ARRANQUE = [
+    'streamlit',
+    'numpy',
+    'pandas',
+    'calculadora_nucleo',
+    'plotly.express',
+    'calculadora_graficos',
+    'openpyxl',
+    'xlsxwriter'
+]
+
+_LINEA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def analizar_importtime(texto: str) -> List[Dict]:
+    """
+    Parse ``python -X importtime`` output.
+
+    Returns:
+        One dict per imported module, in output order, with modulo,
+        propio_ms, acumulado_ms and nivel (0 = imported directly)
+    """
+    filas = []
+    for linea in texto.splitlines():
+        coincidencia = _LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            propio, acumulado, sangria, modulo = coincidencia.groups()
+            filas.append({
+                'modulo': modulo,
+                'propio_ms': int(propio) / 1000,
+                'acumulado_ms': int(acumulado) / 1000,
+                'nivel': (len(sangria) - 1) // 2
+            })
+    return filas
+
+
+def tiempos_importacion(modulos: List[str] = MODULOS_ARRANQUE) -> Dict:
+    """
+    Import ``modulos`` one after another in a fresh interpreter.
+
+    Returns:
+        Dict with 'modulos' (cumulative ms of each candidate, 0 if an earlier
+        one already imported it) and 'mas_lentos' (10 slowest modules by
+        self time, any depth)
+    """
+    codigo = '; '.join(f'import {m}' for m in modulos)
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=DIRECTORIO, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudieron importar los módulos:\n{proceso.stderr[-2000:]}")
+    filas = analizar_importtime(proceso.stderr)
+    directos = {f['modulo']: f['acumulado_ms'] for f in filas if f['nivel'] == 0}
+    return {
+        'modulos': [{'modulo': m, 'ms': directos.get(m, 0.0)} for m in modulos],
+        'mas_lentos': [
+            {'modulo': f['modulo'], 'propio_ms': f['propio_ms']}
+            for f in sorted(filas, key=lambda f: f['propio_ms'], reverse=True)[:10]
+        ]
+    }
+
+
+def _medir_primer_render(pagina: Optional[str]) -> Dict:
+    """Child process: render the app once and return its stage timings."""
+    os.chdir(DIRECTORIO)
+    sys.path.insert(0, DIRECTORIO)
+    inicio_streamlit = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    importar_streamlit = time.perf_counter() - inicio_streamlit
+
+    app = AppTest.from_file(ENTRADA, default_timeout=120)
+    if pagina:
+        app.switch_page(pagina)
+    inicio_render = time.perf_counter()
+    app.run()
+    render = time.perf_counter() - inicio_render
+    if app.exception:
+        raise RuntimeError(f"La aplicación falló al arrancar: {app.exception}")
+
+    from calculadora_nucleo import PERFIL_ETAPAS
+    etapas = PERFIL_ETAPAS.ejecuciones()[0]
+    return {
+        'arranque_ms': (time.perf_counter() - _INICIO) * 1000,
+        'importar_streamlit_ms': importar_streamlit * 1000,
+        'primer_render_ms': render * 1000,
+        'etapas_ms': {nombre: segundos * 1000 for nombre, segundos in etapas.items()},
+        # Script imports, page config and sidebar widgets
+        'sin_etapa_ms': (render - sum(etapas.values())) * 1000,
+        'cargados': [m for m in MODULOS_ARRANQUE if m in sys.modules]
+    }
+
+
+def perfil_primer_render(pagina: Optional[str] = None) -> Dict:
+    """Run _medir_primer_render in a fresh interpreter with profiling on."""
+    comando = [sys.executable, os.path.abspath(__file__), '--hijo']
+    if pagina:
+        comando += ['--pagina', pagina]
+    proceso = subprocess.run(
+        comando, cwd=DIRECTORIO, capture_output=True, text=True,
+        env=dict(os.environ, CALCULADORA_PERFIL='1')
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Falló la medición del primer render:\n{proceso.stderr[-2000:]}")
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def generar_reporte(pagina: Optional[str] = None) -> Dict:
+    """Measure imports and the first render (each in its own interpreter)."""
+    importaciones = tiempos_importacion()
+    render = perfil_primer_render(pagina)
+    cargados = set(render.pop('cargados'))
+    for fila in importaciones['modulos']:
+        fila['al_arrancar'] = fila['modulo'] in cargados
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'pagina': pagina or 'predeterminada',
+        'importaciones': importaciones,
+        **render
+    }
+
+
+def comprobar_presupuesto(reporte: Dict, presupuesto: Dict) -> List[str]:
+    """
+    Compare a report against a time budget.
+
+    The budget may set ``arranque_ms`` (whole cold start), ``primer_render_ms``,
+    ``sin_etapa_ms``, ``importaciones_ms`` ({module: ms}) and ``etapas_ms`` ({stage: ms}).
+
+    Returns:
+        One message per exceeded limit (empty when within budget)
+    """
+    excedidos = []
+
+    def comprobar(nombre, valor, limite):
+        if valor is not None and valor > limite:
+            excedidos.append(f"{nombre}: {valor:.0f} ms > {limite:.0f} ms")
+
+    for clave in ('arranque_ms', 'primer_render_ms', 'sin_etapa_ms'):
+        if clave in presupuesto:
+            comprobar(clave, reporte.get(clave), presupuesto[clave])
+    importaciones = {f['modulo']: f['ms'] for f in reporte['importaciones']['modulos']}
+    for modulo, limite in presupuesto.get('importaciones_ms', {}).items():
+        comprobar(f"importar {modulo}", importaciones.get(modulo), limite)
+    for etapa, limite in presupuesto.get('etapas_ms', {}).items():
+        comprobar(f"etapa {etapa}", reporte['etapas_ms'].get(etapa), limite)
+    return excedidos
+
+
+def imprimir_reporte(reporte: Dict):
+    print(f"Arranque en frío: {reporte['arranque_ms']:.0f} ms "
+          f"(importar streamlit {reporte['importar_streamlit_ms']:.0f} ms, "
+          f"primer render {reporte['primer_render_ms']:.0f} ms, página {reporte['pagina']})\n")
+    print("Importaciones (intérprete nuevo, en orden)")
+    for fila in reporte['importaciones']['modulos']:
+        marca = '' if fila['al_arrancar'] else '   (no se carga al arrancar)'
+        print(f"  {fila['modulo']:<24}{fila['ms']:>9.1f} ms{marca}")
+    print("\nMódulos más lentos (tiempo propio)")
+    for fila in reporte['importaciones']['mas_lentos']:
+        print(f"  {fila['modulo']:<40}{fila['propio_ms']:>9.1f} ms")
+    print("\nEtapas del primer render")
+    for etapa, ms in reporte['etapas_ms'].items():
+        print(f"  {etapa:<32}{ms:>9.1f} ms")
+    print(f"  {'(sin etapa: importaciones, widgets)':<32}{reporte['sin_etapa_ms']:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de arranque de la calculadora.")
+    parser.add_argument('--pagina', help="Script de la página a renderizar (ej. paginas/rankings.py)")
+    parser.add_argument('--reporte', default='perfil_arranque.json', help="Archivo JSON del reporte")
+    parser.add_argument('--presupuesto', help="JSON con límites en ms; si se excede, termina con código 1")
+    parser.add_argument('--hijo', action='store_true', help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.hijo:
+        print(json.dumps(_medir_primer_render(argumentos.pagina)))
+        return
+
+    reporte = generar_reporte(argumentos.pagina)
+    if argumentos.presupuesto:
+        with open(argumentos.presupuesto, encoding='utf-8') as f:
+            reporte['presupuesto'] = json.load(f)
+        reporte['excedidos'] = comprobar_presupuesto(reporte, reporte['presupuesto'])
+
+    with open(argumentos.reporte, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    imprimir_reporte(reporte)
+    print(f"\nReporte: {argumentos.reporte}")
+
+    if reporte.get('excedidos'):
+        print("\nPresupuesto excedido:")
+        for mensaje in reporte['excedidos']:
+            print(f"  {mensaje}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
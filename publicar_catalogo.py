@@ -0,0 +1,37 @@
+"""
+Publica el catálogo calificado en memoria compartida para despliegues multi-proceso.
+
+Un solo proceso cargador ejecuta este script (el CSV se valida antes de
+publicarse); cada worker de Streamlit se
+adjunta al catálogo publicado sin copiarlo definiendo la misma ruta en
+CALCULADORA_CATALOGO_COMPARTIDO. Uso:
+
+    python publicar_catalogo.py [directorio] [csv]
+
+    CALCULADORA_CATALOGO_COMPARTIDO=/dev/shm/calculadora \\
+        streamlit run app_calculadora_sostenibilidad_v2.py
+"""
+
+import sys
+
+import pandas as pd
+
+from calculadora_nucleo import ErrorEsquema, exigir_esquema, publicar_catalogo
+
+
+def main():
+    directorio = sys.argv[1] if len(sys.argv) > 1 else '/dev/shm/calculadora'
+    ruta_csv = sys.argv[2] if len(sys.argv) > 2 else 'dataset_con_scores_A_y_B.csv'
+
+    df = pd.read_csv(ruta_csv)
+    try:
+        exigir_esquema(df)
+    except ErrorEsquema as error:
+        sys.exit(f"No se publicó el catálogo: {error}")
+
+    version = publicar_catalogo(df, directorio)
+    print(f"Catálogo publicado: {len(df):,} productos, versión {version} en {directorio}")
+
+
+if __name__ == "__main__":
+    main()
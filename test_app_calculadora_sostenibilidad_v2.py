@@ -6,17 +6,125 @@ Tests cover:
 - calcular_score_producto(): Core sustainability scoring algorithm
 - clasificar_score(): Score classification into categories
 - exportar_resultados_excel(): Excel export functionality
+- IndiceProductos: Product lookup, prefix, fuzzy and autocomplete search
+- calcular_contribuciones(): Bulk per-indicator contribution breakdown
+- CalibradorRangos: Streaming INDICATOR_RANGES recalibration
+- KERNELS_NORMALIZACION: Pluggable vectorized normalization kernels
+- ScoresRegionales: Region-aware origin scoring over a product x region matrix
+- congelar_dataframe(): Read-only datasets shared across sessions
+- publicar_catalogo() / adjuntar_catalogo(): Shared-memory catalog and ranking orders for multi-worker mode
+- calcular_scores_cestas(): Basket and recipe scoring
+- sugerir_sustituciones(): Same-category swap optimizer
+- calcular_capas_pareto(): Pareto front and skyline layers over the six indicators
+- IndiceRanking / ConsensoRobusto: Top-k consensus across scenarios
+- correlacion_kendall() / resumen_estabilidad(): Rank stability between scenarios
+- validar_esquema() / exigir_esquema(): Vectorized dataset schema validation
+- ResumenCatalogo: Incremental home-page aggregates, grown by copy for merged catalogs
+- AlmacenSQLite: Optional indexed SQLite catalog store with a connection pool
+- RegistroEvaluaciones / RankingIncremental: Submission log, O(log n) ranking inserts and the merged catalog
+- MemoScores: Thread-safe LRU memo for single-product scoring
+- ScorerCompilado: Per-scenario affine scorer (offset + dot(raw, coef))
+- puntuar_y_clasificar(): Fused float32 normalize/clip/weight/classify kernel
+- top_n_con_otros() / histograma_scores() / reducir_serie(): Chart pre-aggregation and cached figure JSON
+- etiqueta_estilos(): Static, cache-busted stylesheet bootstrap
+- paginas/: Every multipage script renders through the entry point
+- PerfilEtapas / perfil_arranque: Startup stage timings, import-time parsing and budgets
+- CacheComparaciones: Per-session LRU of product comparisons keyed on the selected set
 """
 
+import json
+import warnings
 import pytest
+import numpy as np
 import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from app_calculadora_sostenibilidad_v2 import (
+from calculadora_graficos import (
+    top_n_con_otros,
+    histograma_scores,
+    reducir_serie,
+    obtener_figura,
+    FIGURAS_PRODUCTO,
+    FIGURAS_SIN_ESCENARIO,
+    CacheComparaciones,
+    construir_comparacion
+)
+from calculadora_nucleo import (
+    ContextoPagina,
     normalizar_inverso,
     calcular_score_producto,
     clasificar_score,
-    exportar_resultados_excel
+    exportar_resultados_excel,
+    IndiceProductos,
+    opciones_producto,
+    normalizar_indicadores,
+    clave_normalizacion,
+    obtener_contribuciones,
+    obtener_normalizados,
+    calcular_contribuciones,
+    INDICATOR_RANGES,
+    INDICADORES,
+    SCENARIOS,
+    CalibradorRangos,
+    KERNELS_NORMALIZACION,
+    NORMALIZACION_ESCENARIOS,
+    registrar_kernel_normalizacion,
+    origen_por_distancia,
+    matriz_origen_regional,
+    ScoresRegionales,
+    congelar_dataframe,
+    publicar_catalogo,
+    adjuntar_catalogo,
+    cestas_desde_dict,
+    calcular_scores_cestas,
+    categorias_productos,
+    IndiceCategorias,
+    sugerir_sustituciones,
+    calcular_capas_pareto,
+    calcular_capas_pareto_productos,
+    frente_pareto,
+    IndiceRanking,
+    indices_ranking,
+    obtener_indices_ranking,
+    ConsensoRobusto,
+    rangos_promedio,
+    contar_inversiones,
+    correlacion_spearman,
+    correlacion_kendall,
+    tabla_cambios_ranking,
+    mayores_cambios,
+    resumen_estabilidad,
+    ESQUEMA_DATASET,
+    ErrorEsquema,
+    validar_esquema,
+    exigir_esquema,
+    CLASES_SCORE,
+    clasificar_scores,
+    ResumenCatalogo,
+    obtener_resumen_catalogo,
+    AlmacenSQLite,
+    RankingIncremental,
+    RegistroEvaluaciones,
+    consenso_incremental,
+    obtener_catalogo_combinado,
+    MemoScores,
+    ScorerCompilado,
+    compilar_scorer,
+    puntuar_y_clasificar,
+    BACKEND_FUSIONADO,
+    etiqueta_estilos,
+    RUTA_ESTILOS,
+    PerfilEtapas,
+    guardar_config_rangos,
+    cargar_config_rangos,
+    cargar_datos,
+    aplicar_config_rangos,
+    version_dataset
 )
+import calculadora_nucleo
+from perfil_arranque import analizar_importtime, comprobar_presupuesto
 
 
 class TestNormalizarInverso:
@@ -936,3 +1044,2185 @@ class TestExportarResultadosExcel:
             df = pd.read_excel(result, sheet_name=sheet_name)
             assert isinstance(df, pd.DataFrame)
             assert len(df) > 0
+
+
+class TestIndiceProductos:
+    """Test suite for the IndiceProductos lookup index."""
+
+    @pytest.fixture
+    def df_productos(self):
+        """Create a small catalog with accents, shared prefixes and a duplicate."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Papa', 'Papaya', 'Plátano', 'Pollo', 'Papa'],
+            'Score_México': [91.2, 79.5, 93.6, 89.3, 85.0, 10.0]
+        })
+
+    def test_posicion_returns_first_row(self, df_productos):
+        """Test that lookups return the position of the first occurrence."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.posicion('Tomate') == 0
+        assert indice.posicion('Papa') == 1
+
+    def test_posicion_unknown_returns_none(self, df_productos):
+        """Test that unknown products return None."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.posicion('Res') is None
+        assert 'Res' not in indice
+
+    def test_len_counts_unique_products(self, df_productos):
+        """Test that duplicates are indexed once."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert len(indice) == 5
+
+    def test_nombres_are_sorted(self, df_productos):
+        """Test that the selectbox options are sorted and unique."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.nombres == sorted(set(df_productos['Producto']))
+
+    def test_fila_matches_boolean_mask(self, df_productos):
+        """Test that indexed lookup matches the boolean-mask lookup."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        esperado = df_productos[df_productos['Producto'] == 'Papaya'].iloc[0]
+        pd.testing.assert_series_equal(indice.fila(df_productos, 'Papaya'), esperado)
+
+    def test_filas_keeps_selection_order_and_skips_unknown(self, df_productos):
+        """Test multi-product lookups used by the comparison page."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        filas = indice.filas(df_productos, ['Pollo', 'Res', 'Tomate'])
+        assert filas['Producto'].tolist() == ['Pollo', 'Tomate']
+
+    def test_buscar_prefijo_case_insensitive(self, df_productos):
+        """Test prefix search ignores case."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.buscar_prefijo('PAP') == ['Papa', 'Papaya']
+
+    def test_buscar_prefijo_respects_limit(self, df_productos):
+        """Test prefix search result limit."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.buscar_prefijo('p', limite=2) == ['Papa', 'Papaya']
+
+    def test_buscar_prefijo_no_match(self, df_productos):
+        """Test prefix search with no matches."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.buscar_prefijo('xyz') == []
+
+    def test_buscar_similar_tolerates_typos(self, df_productos):
+        """Test fuzzy search finds a product despite a typo."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.buscar_similar('tomatr')[0] == 'Tomate'
+
+    def test_buscar_similar_empty_query(self, df_productos):
+        """Test fuzzy search with an empty query."""
+        indice = IndiceProductos(df_productos['Producto'].tolist())
+        assert indice.buscar_similar('   ') == []
+
+    def test_version_dataset_changes_with_content(self, df_productos):
+        """Test that the dataset fingerprint tracks content changes."""
+        version = version_dataset(df_productos)
+        assert version == version_dataset(df_productos.copy())
+
+        modificado = df_productos.copy()
+        modificado.loc[0, 'Score_México'] = 50.0
+        assert version != version_dataset(modificado)
+
+
+class TestAutocompletarProductos:
+    """Test suite for accent-insensitive autocomplete over product names."""
+
+    @pytest.fixture
+    def indice(self):
+        """Create an index over accented product names."""
+        return IndiceProductos(['Plátano', 'Limón', 'Melón', 'Lima', 'Sandía',
+                                'Maíz tortilla', 'Queso fresco', 'Queso maduro'])
+
+    def test_accent_insensitive_prefix(self, indice):
+        """Test that unaccented queries find accented names."""
+        assert indice.autocompletar('platano') == ['Plátano']
+        assert indice.buscar_prefijo('sandia') == ['Sandía']
+
+    def test_accented_query_matches(self, indice):
+        """Test that accented queries also match."""
+        assert indice.autocompletar('Limón')[0] == 'Limón'
+
+    def test_exact_match_ranked_first(self, indice):
+        """Test that the exact match outranks longer prefixes."""
+        assert indice.autocompletar('lima')[0] == 'Lima'
+
+    def test_prefix_before_word_prefix(self, indice):
+        """Test that name prefixes rank above matches on later words."""
+        indice = IndiceProductos(['Tortilla de harina', 'Maíz tortilla'])
+        assert indice.autocompletar('tortilla') == ['Tortilla de harina', 'Maíz tortilla']
+
+    def test_word_prefix_match(self, indice):
+        """Test that words other than the first one are searchable."""
+        assert indice.autocompletar('madu') == ['Queso maduro']
+
+    def test_substring_match(self, indice):
+        """Test substring matches through the trigram index."""
+        assert 'Queso fresco' in indice.autocompletar('resc')
+
+    def test_fuzzy_fallback(self, indice):
+        """Test that typos still return a match."""
+        assert indice.autocompletar('platnao')[0] == 'Plátano'
+
+    def test_empty_query_returns_sorted_names(self, indice):
+        """Test that an empty query returns the first names alphabetically."""
+        assert indice.autocompletar('', limite=3) == indice.nombres[:3]
+
+    def test_limit_is_respected(self, indice):
+        """Test the result limit."""
+        assert len(indice.autocompletar('', limite=2)) == 2
+        assert len(indice.autocompletar('queso', limite=1)) == 1
+
+    def test_opciones_producto_keeps_selected_first(self, indice):
+        """Test that selected products stay in the options."""
+        opciones = opciones_producto(indice, 'queso', seleccionados=['Sandía'])
+        assert opciones == ['Sandía', 'Queso fresco', 'Queso maduro']
+
+    def test_opciones_producto_no_duplicates(self, indice):
+        """Test that selected products are not repeated."""
+        opciones = opciones_producto(indice, 'queso', seleccionados=['Queso maduro'])
+        assert opciones == ['Queso maduro', 'Queso fresco']
+
+    def test_opciones_producto_bounded(self, indice):
+        """Test that the option list is bounded by the limit."""
+        assert len(opciones_producto(indice, '', limite=4)) == 4
+
+
+class TestCalcularContribuciones:
+    """Test suite for the bulk contribution breakdown."""
+
+    @pytest.fixture
+    def df_indicadores(self):
+        """Create a dataset with raw indicator columns."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Café', 'Sandía'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 16.5, 0.52],
+            'WF_L_kg': [214, 15415, 18900, 185],
+            'LU_m2_kg': [0.8, 326.0, 26.9, 0.3],
+            'Origin_Score': [0, 50, 100, 0],
+            'Waste_pct': [15.688, 34.87, 10.0, 0.4],
+            'NOVA': [1, 1, 2, 1]
+        })
+
+    def test_normalized_matches_scalar_function(self, df_indicadores):
+        """Test that bulk normalization matches calcular_score_producto."""
+        normalizado = normalizar_indicadores(df_indicadores)
+        for k, row in df_indicadores.iterrows():
+            _, esperado = calcular_score_producto(
+                row['CF_kgCO2eq_kg'], row['WF_L_kg'], row['LU_m2_kg'],
+                row['Origin_Score'], row['Waste_pct'], row['NOVA']
+            )
+            for j, indicador in enumerate(INDICADORES):
+                assert normalizado[k, j] == pytest.approx(esperado[indicador])
+
+    def test_tensor_shape(self, df_indicadores):
+        """Test the scenarios x products x indicators shape."""
+        tensor = calcular_contribuciones(df_indicadores, ['A', 'B'])
+        assert tensor.shape == (2, 4, 6)
+
+    def test_defaults_to_all_scenarios(self, df_indicadores):
+        """Test that all scenarios are computed by default."""
+        assert calcular_contribuciones(df_indicadores).shape[0] == 2
+
+    @pytest.mark.parametrize('escenario', ['A', 'B'])
+    def test_contributions_sum_to_score(self, df_indicadores, escenario):
+        """Test that each row of contributions adds up to the product score."""
+        scores = calcular_contribuciones(df_indicadores, [escenario])[0].sum(axis=1)
+        for k, row in df_indicadores.iterrows():
+            esperado, _ = calcular_score_producto(
+                row['CF_kgCO2eq_kg'], row['WF_L_kg'], row['LU_m2_kg'],
+                row['Origin_Score'], row['Waste_pct'], row['NOVA'], escenario
+            )
+            assert scores[k] == pytest.approx(esperado)
+
+    def test_contribution_is_weight_times_normalized(self, df_indicadores):
+        """Test the waste contribution in scenario B."""
+        tensor = calcular_contribuciones(df_indicadores, ['B'])
+        normalizado = normalizar_indicadores(df_indicadores)
+        waste = INDICADORES.index('Waste')
+        assert tensor[0, :, waste] == pytest.approx(normalizado[:, waste] * 0.30)
+
+    def test_invalid_scenario_raises(self, df_indicadores):
+        """Test that an unknown scenario raises ValueError."""
+        with pytest.raises(ValueError):
+            calcular_contribuciones(df_indicadores, ['Z'])
+
+    def test_degenerate_range_returns_50(self, df_indicadores, monkeypatch):
+        """Test that a degenerate range normalizes to 50 like normalizar_inverso."""
+        monkeypatch.setitem(INDICATOR_RANGES, 'NOVA', (1, 1))
+        normalizado = normalizar_indicadores(df_indicadores)
+        assert (normalizado[:, INDICADORES.index('NOVA')] == 50.0).all()
+
+
+class TestCalibradorRangos:
+    """Test suite for the streaming range calibrator."""
+
+    @pytest.fixture
+    def df_catalogo(self):
+        """Create a synthetic catalog of 5,000 products."""
+        rng = np.random.default_rng(42)
+        n = 5000
+        return pd.DataFrame({
+            'Producto': [f'P{i}' for i in range(n)],
+            'CF_kgCO2eq_kg': rng.lognormal(0.5, 1.0, n),
+            'WF_L_kg': rng.lognormal(7.0, 1.0, n),
+            'LU_m2_kg': rng.lognormal(1.0, 1.2, n),
+            'Origin_Score': rng.choice([0, 50, 100], n),
+            'Waste_pct': rng.uniform(0.4, 45.5, n),
+            'NOVA': rng.integers(1, 5, n)
+        })
+
+    def _en_chunks(self, df, tamano, **kwargs):
+        calibrador = CalibradorRangos(**kwargs)
+        for inicio in range(0, len(df), tamano):
+            calibrador.actualizar(df.iloc[inicio:inicio + tamano])
+        return calibrador
+
+    def test_minmax_matches_full_scan(self, df_catalogo):
+        """Test that streaming min/max equals the whole-frame min/max."""
+        rangos = self._en_chunks(df_catalogo, 777).rangos('minmax')
+        assert rangos['CF'] == (df_catalogo['CF_kgCO2eq_kg'].min(), df_catalogo['CF_kgCO2eq_kg'].max())
+        assert rangos['WF'] == (df_catalogo['WF_L_kg'].min(), df_catalogo['WF_L_kg'].max())
+
+    def test_fixed_indicators_keep_current_range(self, df_catalogo):
+        """Test that Origin and NOVA keep their definitional ranges."""
+        rangos = self._en_chunks(df_catalogo, 1000).rangos('minmax')
+        assert rangos['Origin'] == INDICATOR_RANGES['Origin']
+        assert rangos['NOVA'] == INDICATOR_RANGES['NOVA']
+
+    def test_counts_all_products(self, df_catalogo):
+        """Test that every row is counted."""
+        assert self._en_chunks(df_catalogo, 999).n == 5000
+
+    def test_missing_values_are_ignored(self, df_catalogo):
+        """Test that rows with NaN indicators are skipped."""
+        df = df_catalogo.copy()
+        df.loc[0, 'CF_kgCO2eq_kg'] = np.nan
+        assert self._en_chunks(df, 1000).n == 4999
+
+    def test_quantile_range_is_robust(self, df_catalogo):
+        """Test quantile ranges approximate the true quantiles within the extremes."""
+        calibrador = self._en_chunks(df_catalogo, 500, tamano_muestra=2000)
+        minimo, maximo = calibrador.rangos('minmax')['WF']
+        bajo, alto = calibrador.rangos('cuantiles', q_bajo=0.05, q_alto=0.95)['WF']
+        assert minimo <= bajo < alto <= maximo
+        esperado = df_catalogo['WF_L_kg'].quantile(0.95)
+        assert alto == pytest.approx(esperado, rel=0.15)
+
+    def test_memory_is_bounded(self, df_catalogo):
+        """Test that the reservoir does not grow with the catalog."""
+        calibrador = self._en_chunks(df_catalogo, 1000, tamano_muestra=100)
+        assert calibrador._muestra.shape == (100, len(INDICADORES))
+
+    def test_empty_calibrator_raises(self):
+        """Test that asking for ranges without data raises ValueError."""
+        with pytest.raises(ValueError):
+            CalibradorRangos().rangos()
+
+    def test_invalid_method_raises(self, df_catalogo):
+        """Test that an unknown method raises ValueError."""
+        with pytest.raises(ValueError):
+            self._en_chunks(df_catalogo, 1000).rangos('media')
+
+    def test_config_round_trip(self, df_catalogo, tmp_path):
+        """Test that a saved config loads back to the same ranges."""
+        calibrador = self._en_chunks(df_catalogo, 1000)
+        config = calibrador.config('minmax')
+        ruta = tmp_path / 'rangos.json'
+        guardar_config_rangos(config, str(ruta))
+
+        assert config['version'] == 1
+        assert config['productos'] == 5000
+        assert cargar_config_rangos(str(ruta)) == calibrador.rangos('minmax')
+
+    def test_config_wrong_version_raises(self, tmp_path):
+        """Test that configs with an unknown schema version are rejected."""
+        ruta = tmp_path / 'rangos.json'
+        ruta.write_text(json.dumps({'version': 99, 'rangos': {}}))
+        with pytest.raises(ValueError):
+            cargar_config_rangos(str(ruta))
+
+    def test_aplicar_config_updates_scorer(self, df_catalogo, tmp_path, monkeypatch):
+        """Test that applying a config changes the ranges used by the scorer."""
+        for indicador, rango in list(INDICATOR_RANGES.items()):
+            monkeypatch.setitem(INDICATOR_RANGES, indicador, rango)
+
+        ruta = tmp_path / 'rangos.json'
+        guardar_config_rangos(self._en_chunks(df_catalogo, 1000).config('minmax'), str(ruta))
+        aplicar_config_rangos(str(ruta))
+
+        assert INDICATOR_RANGES['CF'][1] == df_catalogo['CF_kgCO2eq_kg'].max()
+        _, normalizado = calcular_score_producto(
+            df_catalogo['CF_kgCO2eq_kg'].max(), 500, 1.0, 0, 10.0, 1
+        )
+        assert normalizado['CF'] == pytest.approx(0.0)
+
+
+class TestKernelsNormalizacion:
+    """Test suite for the pluggable normalization kernels."""
+
+    @pytest.fixture
+    def valores(self):
+        """Create raw values inside and outside the (0, 100) range."""
+        return np.array([-10.0, 0.0, 25.0, 50.0, 100.0, 150.0])
+
+    def test_lineal_matches_normalizar_inverso(self, valores):
+        """Test that the default kernel reproduces normalizar_inverso."""
+        resultado = KERNELS_NORMALIZACION['lineal'](valores, 0, 100)
+        esperado = [normalizar_inverso(v, 0, 100) for v in valores]
+        assert resultado.tolist() == esperado
+
+    def test_lineal_degenerate_range(self, valores):
+        """Test the degenerate range special case."""
+        assert (KERNELS_NORMALIZACION['lineal'](valores, 10, 10) == 50.0).all()
+
+    def test_lineal_recortado_clips(self, valores):
+        """Test that out-of-range values are clipped to 0-100."""
+        resultado = KERNELS_NORMALIZACION['lineal_recortado'](valores, 0, 100)
+        assert resultado[0] == 100.0
+        assert resultado[-1] == 0.0
+        assert resultado[2] == 75.0
+
+    def test_log_keeps_bounds_and_order(self, valores):
+        """Test that log scaling maps the bounds to 100/0 and is decreasing."""
+        resultado = KERNELS_NORMALIZACION['log'](valores, 0, 100)
+        assert resultado[1] == pytest.approx(100.0)
+        assert resultado[4] == pytest.approx(0.0)
+        assert (np.diff(resultado[1:5]) < 0).all()
+        # Log scaling spreads out the small values
+        assert resultado[2] < 75.0
+
+    def test_zscore_mean_maps_to_50(self):
+        """Test that the batch mean maps to 50."""
+        resultado = KERNELS_NORMALIZACION['zscore'](np.array([10.0, 20.0, 30.0]), 0, 100)
+        assert resultado[1] == pytest.approx(50.0)
+        assert resultado[0] > 50.0 > resultado[2]
+
+    def test_zscore_constant_batch(self):
+        """Test z-score with zero variance."""
+        resultado = KERNELS_NORMALIZACION['zscore'](np.array([5.0, 5.0]), 0, 100)
+        assert (resultado == 50.0).all()
+
+    def test_zscore_empty_batch_without_warning(self):
+        """Test that an empty batch returns an empty result without a RuntimeWarning."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            resultado = KERNELS_NORMALIZACION['zscore'](np.array([]), 0, 100)
+        assert resultado.shape == (0,)
+
+    def test_percentil_ranks(self):
+        """Test percentile ranks with ties."""
+        resultado = KERNELS_NORMALIZACION['percentil'](np.array([1.0, 2.0, 2.0, 3.0]), 0, 100)
+        assert resultado.tolist() == pytest.approx([100.0, 50.0, 50.0, 0.0])
+
+    def test_normalizar_indicadores_per_indicator_strategy(self):
+        """Test selecting a kernel for a single indicator."""
+        df = pd.DataFrame({
+            'CF_kgCO2eq_kg': [100.0], 'WF_L_kg': [50000.0], 'LU_m2_kg': [1.0],
+            'Origin_Score': [0], 'Waste_pct': [10.0], 'NOVA': [1]
+        })
+        normalizado = normalizar_indicadores(df, {'CF': 'lineal_recortado'})
+        assert normalizado[0, INDICADORES.index('CF')] == 0.0
+        assert normalizado[0, INDICADORES.index('WF')] < 0.0
+
+    def test_unknown_kernel_raises(self):
+        """Test that requesting an unknown kernel raises ValueError."""
+        df = pd.DataFrame({c: [1.0] for c in ['CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg',
+                                             'Origin_Score', 'Waste_pct', 'NOVA']})
+        with pytest.raises(ValueError):
+            normalizar_indicadores(df, {'CF': 'cubico'})
+
+    def test_per_scenario_strategy(self, monkeypatch):
+        """Test that scenario overrides only affect that scenario."""
+        df = pd.DataFrame({
+            'CF_kgCO2eq_kg': [1.0, 2.0], 'WF_L_kg': [500.0, 900.0], 'LU_m2_kg': [1.0, 2.0],
+            'Origin_Score': [0, 50], 'Waste_pct': [10.0, 20.0], 'NOVA': [1, 2]
+        })
+        base = calcular_contribuciones(df)
+        monkeypatch.setitem(NORMALIZACION_ESCENARIOS, 'B', {'WF': 'log'})
+        tensor = calcular_contribuciones(df)
+        wf = INDICADORES.index('WF')
+
+        assert tensor[0] == pytest.approx(base[0])
+        assert tensor[1, :, wf] != pytest.approx(base[1, :, wf])
+
+    def test_registrar_kernel(self):
+        """Test registering a custom kernel usable by normalizar_indicadores."""
+        df = pd.DataFrame({c: [1.0] for c in ['CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg',
+                                             'Origin_Score', 'Waste_pct', 'NOVA']})
+        registrar_kernel_normalizacion('cero', lambda v, a, b: np.zeros(v.shape))
+        try:
+            normalizado = normalizar_indicadores(df, {'LU': 'cero'})
+            assert normalizado[0, INDICADORES.index('LU')] == 0.0
+        finally:
+            del KERNELS_NORMALIZACION['cero']
+
+    def test_cached_tables_follow_kernel_changes(self, monkeypatch):
+        """Test that changing kernels or ranges at runtime rebuilds the cached tables."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        clave = clave_normalizacion()
+        base = obtener_contribuciones(df, 'test-kernels')['B']
+        assert obtener_contribuciones(df, 'test-kernels')['B'] is base
+
+        monkeypatch.setitem(NORMALIZACION_ESCENARIOS, 'B', {'WF': 'log'})
+        assert clave_normalizacion() != clave
+        log = obtener_contribuciones(df, 'test-kernels')['B']
+        assert not np.allclose(log['WF'], base['WF'])
+        assert np.allclose(obtener_normalizados(df, 'test-kernels', 'B')['WF'] * 0.14, log['WF'])
+
+        monkeypatch.setitem(KERNELS_NORMALIZACION, 'log', lambda v, a, b: np.zeros(v.shape))
+        assert (obtener_contribuciones(df, 'test-kernels')['B']['WF'] == 0).all()
+
+        monkeypatch.setitem(NORMALIZACION_ESCENARIOS, 'B', {})
+        monkeypatch.setitem(INDICATOR_RANGES, 'CF', (0.0, 1000.0))
+        assert clave_normalizacion() != clave
+        assert not np.allclose(obtener_contribuciones(df, 'test-kernels')['B']['CF'], base['CF'])
+
+
+class TestScoresRegionales:
+    """Test suite for region-aware origin scoring."""
+
+    @pytest.fixture
+    def df_base(self):
+        """Create a dataset seen from the base (Sonora) viewpoint."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Café'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 16.5],
+            'WF_L_kg': [214, 15415, 18900],
+            'LU_m2_kg': [0.8, 326.0, 26.9],
+            'Origin_Score': [0, 50, 100],
+            'Waste_pct': [15.688, 34.87, 10.0],
+            'NOVA': [1, 1, 2],
+            'Score_México': [91.2, 33.7, 49.8],
+            'Score_México_B': [89.5, 33.9, 53.7]
+        })
+
+    @pytest.fixture
+    def distancias(self):
+        """Create a long-format distance table (Café is missing for Yucatán)."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Tomate', 'Res', 'Res', 'Café'],
+            'Región': ['Jalisco', 'Yucatán', 'Jalisco', 'Yucatán', 'Jalisco'],
+            'Distancia_km': [150, 2400, 1200, 5000, 900],
+            'Importado': [False, False, False, False, True]
+        })
+
+    def test_origen_por_distancia_thresholds(self):
+        """Test the local / regional / imported buckets."""
+        resultado = origen_por_distancia(np.array([0, 300, 301, 3500, 3501]))
+        assert resultado.tolist() == [0.0, 0.0, 50.0, 50.0, 100.0]
+
+    def test_origen_por_distancia_importado_and_nan(self):
+        """Test that imports force 100 and unknown distances stay NaN."""
+        resultado = origen_por_distancia(np.array([10.0, np.nan]), np.array([True, False]))
+        assert resultado[0] == 100.0
+        assert np.isnan(resultado[1])
+
+    def test_matriz_origen_shape_and_values(self, df_base, distancias):
+        """Test the product x region matrix."""
+        matriz = matriz_origen_regional(df_base, distancias)
+        assert list(matriz.columns) == ['Jalisco', 'Yucatán']
+        assert matriz.loc['Tomate'].tolist() == [0.0, 50.0]
+        assert matriz.loc['Res'].tolist() == [50.0, 100.0]
+        assert matriz.loc['Café', 'Jalisco'] == 100.0
+
+    def test_matriz_origen_missing_pair_uses_base(self, df_base, distancias):
+        """Test that missing pairs keep the dataset Origin_Score."""
+        matriz = matriz_origen_regional(df_base, distancias)
+        assert matriz.loc['Café', 'Yucatán'] == 100.0
+
+    @pytest.mark.parametrize('escenario', ['A', 'B'])
+    def test_scores_match_scalar_scoring(self, df_base, distancias, escenario):
+        """Test that every product x region score equals calcular_score_producto."""
+        regionales = ScoresRegionales(df_base, distancias)
+        for i, row in df_base.iterrows():
+            for j, region in enumerate(regionales.regiones):
+                esperado, _ = calcular_score_producto(
+                    row['CF_kgCO2eq_kg'], row['WF_L_kg'], row['LU_m2_kg'],
+                    regionales.origen.iloc[i, j], row['Waste_pct'], row['NOVA'], escenario
+                )
+                assert regionales.scores[escenario][i, j] == pytest.approx(esperado)
+
+    def test_ranking_per_region(self, df_base, distancias):
+        """Test that rankings are sorted by the region's scores."""
+        regionales = ScoresRegionales(df_base, distancias)
+        for region in regionales.regiones:
+            orden = regionales.ranking(region, 'A')
+            scores = regionales.scores['A'][orden, regionales.regiones.index(region)]
+            assert (np.diff(scores) <= 0).all()
+
+    def test_unknown_region_raises(self, df_base, distancias):
+        """Test that an unknown region raises KeyError."""
+        with pytest.raises(KeyError):
+            ScoresRegionales(df_base, distancias).ranking('Marte')
+
+    def test_aplicar_replaces_origin_and_scores(self, df_base, distancias):
+        """Test the regional view of the dataset."""
+        regionales = ScoresRegionales(df_base, distancias)
+        vista = regionales.aplicar(df_base, 'Yucatán')
+        assert vista['Origin_Score'].tolist() == [50.0, 100.0, 100.0]
+        assert vista['Score_México'].tolist() == pytest.approx(regionales.scores['A'][:, 1].tolist())
+        # The original dataset is not modified
+        assert df_base['Origin_Score'].tolist() == [0, 50, 100]
+
+
+class TestDatasetCompartido:
+    """Test suite for the shared read-only dataset."""
+
+    @pytest.fixture
+    def df_muestra(self):
+        """Create a small dataset with numeric and text columns."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Papa'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 0.3],
+            'NOVA': [1, 1, 1]
+        })
+
+    def test_values_are_preserved(self, df_muestra):
+        """Test that freezing keeps data and dtypes."""
+        congelado = congelar_dataframe(df_muestra)
+        pd.testing.assert_frame_equal(congelado, df_muestra)
+
+    def test_in_place_write_raises(self, df_muestra):
+        """Test that numeric columns cannot be modified in place."""
+        congelado = congelar_dataframe(df_muestra)
+        with pytest.raises(ValueError):
+            congelado.loc[0, 'CF_kgCO2eq_kg'] = 99.0
+
+    def test_source_frame_is_not_shared(self, df_muestra):
+        """Test that the original frame stays writable and independent."""
+        congelado = congelar_dataframe(df_muestra)
+        df_muestra.loc[0, 'CF_kgCO2eq_kg'] = 99.0
+        assert congelado.loc[0, 'CF_kgCO2eq_kg'] == 1.4
+
+    def test_derived_frames_are_writable(self, df_muestra):
+        """Test that pages can still derive and modify their own frames."""
+        copia = congelar_dataframe(df_muestra).copy()
+        copia.loc[0, 'CF_kgCO2eq_kg'] = 99.0
+        assert copia.loc[0, 'CF_kgCO2eq_kg'] == 99.0
+
+    def test_concurrent_sessions_share_one_copy(self, df_muestra):
+        """Test that 200 concurrent sessions get the same object, loaded once."""
+        cargas = []
+
+        @st.cache_resource(show_spinner=False)
+        def cargar():
+            cargas.append(1)
+            return congelar_dataframe(df_muestra)
+
+        try:
+            with ThreadPoolExecutor(max_workers=50) as executor:
+                resultados = list(executor.map(lambda _: cargar(), range(200)))
+        finally:
+            cargar.clear()
+
+        assert len(cargas) == 1
+        assert all(r is resultados[0] for r in resultados)
+
+    def test_loaded_dataset_carries_its_version(self):
+        """Test that cargar_datos fingerprints the dataset once, at load time."""
+        df, version = cargar_datos()
+        assert version == version_dataset(df)
+        assert cargar_datos()[1] is version
+
+
+class TestCatalogoCompartido:
+    """Test suite for the memory-mapped catalog shared across worker processes."""
+
+    @pytest.fixture
+    def df_catalogo(self):
+        """Create a small scored catalog."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Plátano'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 0.7],
+            'NOVA': [1, 1, 1],
+            'Score_México': [91.2, 33.7, 89.3],
+            'Score_México_B': [89.5, 33.9, 89.5]
+        })
+
+    def test_attach_before_publish_returns_none(self, tmp_path):
+        """Test that workers fall back when nothing was published."""
+        assert adjuntar_catalogo(str(tmp_path)) is None
+
+    def test_round_trip(self, df_catalogo, tmp_path):
+        """Test that the attached catalog equals the published one."""
+        version = publicar_catalogo(df_catalogo, str(tmp_path))
+        catalogo = adjuntar_catalogo(str(tmp_path))
+
+        assert catalogo.version == version == version_dataset(df_catalogo)
+        assert catalogo.df.equals(df_catalogo)
+        assert catalogo.df['Producto'].tolist() == ['Tomate', 'Res', 'Plátano']
+
+    def test_numeric_columns_are_mapped_read_only(self, df_catalogo, tmp_path):
+        """Test zero-copy attachment: numeric columns are read-only memmaps."""
+        publicar_catalogo(df_catalogo, str(tmp_path))
+        df = adjuntar_catalogo(str(tmp_path)).df
+        with pytest.raises(ValueError):
+            df.loc[0, 'CF_kgCO2eq_kg'] = 0.0
+
+    def test_rankings_are_published(self, df_catalogo, tmp_path):
+        """Test that per-scenario ranking orders are published."""
+        publicar_catalogo(df_catalogo, str(tmp_path))
+        catalogo = adjuntar_catalogo(str(tmp_path))
+        assert catalogo.rankings['A'].tolist() == [0, 2, 1]
+        assert catalogo.rankings['B'].tolist() == [0, 2, 1]
+
+    def test_attached_rankings_are_not_sorted_again(self, df_catalogo, tmp_path):
+        """Test that the ranking indexes of an attached catalog reuse the mapped orders."""
+        publicar_catalogo(df_catalogo, str(tmp_path))
+        catalogo = adjuntar_catalogo(str(tmp_path))
+        indices = obtener_indices_ranking(catalogo.df, catalogo.version, catalogo.rankings)
+        for escenario, indice in indices.items():
+            assert indice.orden is catalogo.rankings[escenario]
+            assert indice.rango.tolist() == IndiceRanking(indice.scores).rango.tolist()
+        assert obtener_indices_ranking(catalogo.df, catalogo.version) is indices
+
+    def test_loader_attaches_published_rankings(self, df_catalogo, tmp_path, monkeypatch):
+        """Test that loading from a shared catalog serves the published ranking orders."""
+        publicar_catalogo(df_catalogo, str(tmp_path))
+        monkeypatch.setenv('CALCULADORA_CATALOGO_COMPARTIDO', str(tmp_path))
+        cargar_datos.clear()
+        obtener_indices_ranking.clear()
+        try:
+            df, version = cargar_datos()
+            indices = obtener_indices_ranking(df, version)
+            assert all(isinstance(indice.orden, np.memmap) for indice in indices.values())
+            assert indices['A'].top(2).tolist() == [0, 2]
+        finally:
+            cargar_datos.clear()
+
+    def test_order_must_cover_every_row(self):
+        """Test that a precomputed order of another catalog is rejected."""
+        with pytest.raises(ValueError):
+            IndiceRanking([90.0, 60.0, 30.0], np.array([0, 1]))
+
+    def test_republish_switches_version_and_prunes(self, df_catalogo, tmp_path):
+        """Test that a new publication becomes current and old ones are pruned."""
+        versiones = []
+        for score in [50.0, 60.0, 70.0]:
+            df = df_catalogo.assign(Score_México=[91.2, score, 89.3])
+            versiones.append(publicar_catalogo(df, str(tmp_path), conservar=2))
+
+        assert adjuntar_catalogo(str(tmp_path)).version == versiones[-1]
+        carpetas = {p.name for p in tmp_path.iterdir() if p.is_dir()}
+        assert carpetas == set(versiones[1:])
+
+    def test_publish_same_version_is_idempotent(self, df_catalogo, tmp_path):
+        """Test that publishing identical data twice reuses the version."""
+        assert publicar_catalogo(df_catalogo, str(tmp_path)) == publicar_catalogo(df_catalogo, str(tmp_path))
+        assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 1
+
+
+class TestCalcularScoresCestas:
+    """Test suite for the basket scoring engine."""
+
+    @pytest.fixture
+    def df_productos(self):
+        """Create a dataset with raw indicator columns."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Lechuga', 'Res', 'Maíz tortilla'],
+            'CF_kgCO2eq_kg': [1.4, 0.5, 60.0, 1.2],
+            'WF_L_kg': [214, 237, 15415, 1608],
+            'LU_m2_kg': [0.8, 1.2, 326.0, 2.9],
+            'Origin_Score': [0, 0, 50, 0],
+            'Waste_pct': [15.688, 30.0, 34.87, 6.47],
+            'NOVA': [1, 1, 1, 3]
+        })
+
+    def test_single_product_basket_equals_product_score(self, df_productos):
+        """Test that a one-product basket scores like the product itself."""
+        resultado = calcular_scores_cestas(df_productos, cestas_desde_dict({'Solo': {'Res': 2.0}}))
+        esperado, _ = calcular_score_producto(60.0, 15415, 326.0, 50, 34.87, 1, 'A')
+        assert resultado.loc['Solo', 'Score_México'] == pytest.approx(esperado)
+
+    def test_indicators_are_kg_weighted(self, df_productos):
+        """Test per-kg aggregation of indicators."""
+        cestas = cestas_desde_dict({'Ensalada': {'Tomate': 0.3, 'Lechuga': 0.1}})
+        resultado = calcular_scores_cestas(df_productos, cestas).loc['Ensalada']
+        assert resultado['Kg_total'] == pytest.approx(0.4)
+        assert resultado['CF_kgCO2eq_kg'] == pytest.approx((1.4 * 0.3 + 0.5 * 0.1) / 0.4)
+        assert resultado['Waste_pct'] == pytest.approx((15.688 * 0.3 + 30.0 * 0.1) / 0.4)
+
+    def test_score_matches_scalar_scoring_of_aggregate(self, df_productos):
+        """Test that the basket score uses the scenario weights and ranges."""
+        cestas = cestas_desde_dict({'Tacos': {'Maíz tortilla': 0.2, 'Res': 0.1, 'Tomate': 0.05}})
+        fila = calcular_scores_cestas(df_productos, cestas, ['B']).loc['Tacos']
+        esperado, _ = calcular_score_producto(
+            fila['CF_kgCO2eq_kg'], fila['WF_L_kg'], fila['LU_m2_kg'],
+            fila['Origin_Score'], fila['Waste_pct'], fila['NOVA'], 'B'
+        )
+        assert fila['Score_México_B'] == pytest.approx(esperado)
+
+    def test_nova_maximo(self, df_productos):
+        """Test the most-processed-ingredient NOVA aggregation."""
+        cestas = cestas_desde_dict({'Tacos': {'Maíz tortilla': 0.1, 'Tomate': 0.9}})
+        promedio = calcular_scores_cestas(df_productos, cestas).loc['Tacos', 'NOVA']
+        maximo = calcular_scores_cestas(df_productos, cestas, nova='maximo').loc['Tacos', 'NOVA']
+        assert promedio == pytest.approx(1.2)
+        assert maximo == 3
+
+    def test_many_baskets_in_one_call(self, df_productos):
+        """Test scoring thousands of baskets at once."""
+        rng = np.random.default_rng(0)
+        n_lineas = 20000
+        cestas = pd.DataFrame({
+            'Cesta': rng.integers(0, 5000, n_lineas),
+            'Producto': rng.choice(df_productos['Producto'], n_lineas),
+            'Kg': rng.uniform(0.05, 1.0, n_lineas)
+        })
+        resultado = calcular_scores_cestas(df_productos, cestas)
+        assert len(resultado) == cestas['Cesta'].nunique()
+        assert resultado['Score_México'].between(0, 100).all()
+
+    def test_unknown_product_raises(self, df_productos):
+        """Test that unknown products are reported."""
+        with pytest.raises(ValueError, match='Kiwi'):
+            calcular_scores_cestas(df_productos, cestas_desde_dict({'X': {'Kiwi': 1.0}}))
+
+    def test_non_positive_quantity_raises(self, df_productos):
+        """Test that zero or negative quantities are rejected."""
+        with pytest.raises(ValueError):
+            calcular_scores_cestas(df_productos, cestas_desde_dict({'X': {'Tomate': 0.0}}))
+
+    def test_invalid_nova_aggregation_raises(self, df_productos):
+        """Test that an unknown NOVA aggregation raises ValueError."""
+        with pytest.raises(ValueError):
+            calcular_scores_cestas(df_productos, cestas_desde_dict({'X': {'Tomate': 1.0}}), nova='moda')
+
+
+class TestSugerirSustituciones:
+    """Test suite for the basket substitution optimizer."""
+
+    @pytest.fixture
+    def df_productos(self):
+        """Create a dataset covering three categories, with calories."""
+        return pd.DataFrame({
+            'Producto': ['Res', 'Pollo', 'Huevo', 'Arroz', 'Trigo pan', 'Tomate', 'Calabaza'],
+            'CF_kgCO2eq_kg': [60.0, 6.9, 4.8, 2.7, 1.6, 1.4, 0.4],
+            'WF_L_kg': [15415, 4325, 3265, 2497, 1827, 214, 353],
+            'LU_m2_kg': [326.0, 7.1, 3.3, 2.9, 3.3, 0.8, 0.9],
+            'Origin_Score': [50, 0, 0, 50, 0, 0, 0],
+            'Waste_pct': [34.87, 18.0, 37.66, 31.58, 1.0, 15.688, 14.65],
+            'NOVA': [1, 1, 1, 1, 3, 1, 1],
+            'Kcal_100g': [250, 165, 155, 130, 265, 18, 17]
+        })
+
+    def test_categories_from_mapping(self, df_productos):
+        """Test the default food-group mapping."""
+        categorias = categorias_productos(df_productos)
+        assert categorias.tolist()[:3] == ['Proteína Animal'] * 3
+        assert categorias[3] == 'Cereales'
+
+    def test_category_column_takes_precedence(self, df_productos):
+        """Test that a dataset Categoría column overrides the mapping."""
+        df = df_productos.assign(Categoría='Todo')
+        assert set(categorias_productos(df)) == {'Todo'}
+
+    def test_category_rankings_are_sorted(self, df_productos):
+        """Test the per-category ranking index."""
+        indice = IndiceCategorias(df_productos, 'A')
+        for posiciones in indice.ranking.values():
+            assert (np.diff(indice.scores[posiciones]) <= 0).all()
+
+    def test_suggests_best_same_category_product(self, df_productos):
+        """Test that Res is replaced by the best animal protein."""
+        sugerencias = sugerir_sustituciones(df_productos, {'Res': 0.2})
+        indice = IndiceCategorias(df_productos, 'A')
+        mejor = indice.productos[indice.ranking['Proteína Animal'][0]]
+        assert sugerencias.loc[0, 'Sustituto'] == mejor
+        assert sugerencias.loc[0, 'Categoría'] == 'Proteína Animal'
+
+    def test_improvement_matches_basket_score(self, df_productos):
+        """Test that Mejora equals the basket score gain of the swap."""
+        cesta = {'Res': 0.2, 'Arroz': 0.3}
+        sugerencias = sugerir_sustituciones(df_productos, cesta, max_cambios=1)
+        cambio = sugerencias.iloc[0]
+
+        nueva = dict(cesta)
+        nueva[cambio['Sustituto']] = nueva.pop(cambio['Producto'])
+        antes = calcular_scores_cestas(df_productos, cestas_desde_dict({'c': cesta})).iloc[0]
+        despues = calcular_scores_cestas(df_productos, cestas_desde_dict({'c': nueva})).iloc[0]
+
+        assert despues['Score_México'] - antes['Score_México'] == pytest.approx(cambio['Mejora'])
+
+    def test_sorted_by_improvement_and_limited(self, df_productos):
+        """Test ordering and the swap budget."""
+        cesta = {'Res': 0.2, 'Arroz': 0.3, 'Tomate': 0.1}
+        todas = sugerir_sustituciones(df_productos, cesta)
+        assert (np.diff(todas['Mejora']) <= 0).all()
+        assert len(sugerir_sustituciones(df_productos, cesta, max_cambios=1)) == 1
+
+    def test_no_suggestion_for_category_leader(self, df_productos):
+        """Test that the best product of its category is kept."""
+        indice = IndiceCategorias(df_productos, 'A')
+        lider = indice.productos[indice.ranking['Vegetales'][0]]
+        assert len(sugerir_sustituciones(df_productos, {lider: 1.0})) == 0
+
+    def test_products_in_basket_are_not_suggested(self, df_productos):
+        """Test that a swap never suggests a product already in the basket."""
+        indice = IndiceCategorias(df_productos, 'A')
+        lider = indice.productos[indice.ranking['Proteína Animal'][0]]
+        sugerencias = sugerir_sustituciones(df_productos, {'Res': 0.2, lider: 0.1})
+        assert lider not in sugerencias['Sustituto'].tolist()
+
+    def test_calorie_tolerance(self, df_productos):
+        """Test that calorie bounds filter substitutes."""
+        sugerencias = sugerir_sustituciones(df_productos, {'Arroz': 0.3}, tolerancia_kcal=0.1)
+        assert len(sugerencias) == 0
+        sugerencias = sugerir_sustituciones(df_productos, {'Arroz': 0.3}, tolerancia_kcal=1.5)
+        assert sugerencias.loc[0, 'Sustituto'] == 'Trigo pan'
+
+    def test_calorie_tolerance_requires_column(self, df_productos):
+        """Test that calorie bounds without calorie data raise ValueError."""
+        with pytest.raises(ValueError):
+            sugerir_sustituciones(df_productos.drop(columns='Kcal_100g'), {'Res': 0.2},
+                                  tolerancia_kcal=0.2)
+
+    def test_unknown_product_raises(self, df_productos):
+        """Test that unknown products are reported."""
+        with pytest.raises(ValueError):
+            sugerir_sustituciones(df_productos, {'Kiwi': 1.0})
+
+    def test_no_swaps_within_catch_all_group(self):
+        """Test that Otros and unmapped products get no substitute."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        df = pd.concat([df, df[df['Producto'] == 'Tomate'].assign(Producto='Kiwi')],
+                       ignore_index=True)
+        cesta = {'Café': 0.1, 'Aceite vegetal': 0.1, 'Azúcar': 0.1, 'Kiwi': 0.1, 'Res': 0.2}
+        for escenario in SCENARIOS:
+            sugerencias = sugerir_sustituciones(df, cesta, escenario)
+            assert sugerencias['Producto'].tolist() == ['Res']
+            categorias = dict(zip(df['Producto'], categorias_productos(df)))
+            for _, fila in sugerencias.iterrows():
+                assert categorias[fila['Sustituto']] == categorias[fila['Producto']]
+
+
+class TestCapasPareto:
+    """Test suite for the Pareto front and skyline layers."""
+
+    @staticmethod
+    def capas_por_fuerza_bruta(valores):
+        """Reference layers: repeatedly peel the non-dominated points."""
+        capas = np.zeros(len(valores), dtype=int)
+        restantes = np.arange(len(valores))
+        capa = 1
+        while len(restantes):
+            sub = valores[restantes]
+            domina = ((sub[:, None] >= sub[None]).all(axis=2)
+                      & (sub[:, None] != sub[None]).any(axis=2))
+            dominados = domina.any(axis=0)
+            capas[restantes[~dominados]] = capa
+            restantes = restantes[dominados]
+            capa += 1
+        return capas
+
+    @pytest.fixture
+    def df_productos(self):
+        """Create a dataset with one clear winner and a tradeoff."""
+        return pd.DataFrame({
+            'Producto': ['Lenteja', 'Res', 'Tomate', 'Almendra'],
+            'CF_kgCO2eq_kg': [0.9, 60.0, 1.4, 0.4],
+            'WF_L_kg': [500, 15415, 600, 16095],
+            'LU_m2_kg': [0.5, 326.0, 0.8, 2.0],
+            'Origin_Score': [0, 0, 0, 0],
+            'Waste_pct': [1.0, 34.87, 15.688, 5.0],
+            'NOVA': [1, 1, 1, 1]
+        })
+
+    def test_simple_layers(self):
+        """Test layers on a small hand-checked example."""
+        valores = np.array([[3, 3], [1, 4], [2, 2], [1, 1], [4, 0]], dtype=float)
+        assert calcular_capas_pareto(valores).tolist() == [1, 1, 2, 3, 1]
+
+    def test_duplicates_share_a_layer(self):
+        """Test that identical points do not dominate each other."""
+        valores = np.array([[2, 2], [2, 2], [1, 1]], dtype=float)
+        assert calcular_capas_pareto(valores).tolist() == [1, 1, 2]
+
+    @pytest.mark.parametrize("bloque", [1, 7, 128])
+    def test_matches_brute_force(self, bloque):
+        """Test against pairwise peeling on data with many ties."""
+        rng = np.random.default_rng(0)
+        for _ in range(10):
+            valores = rng.integers(0, 4, (rng.integers(1, 300), 6)).astype(float)
+            esperado = self.capas_por_fuerza_bruta(valores)
+            assert (calcular_capas_pareto(valores, bloque=bloque) == esperado).all()
+
+    def test_empty_input(self):
+        """Test that an empty catalog has no layers."""
+        assert len(calcular_capas_pareto(np.empty((0, 6)))) == 0
+
+    def test_product_front(self, df_productos):
+        """Test the front over the six normalized indicators."""
+        capas = calcular_capas_pareto_productos(df_productos)
+        assert capas.tolist() == [1, 3, 2, 1]
+        assert frente_pareto(df_productos)['Producto'].tolist() == ['Lenteja', 'Almendra']
+
+    def test_front_is_scenario_independent(self, df_productos):
+        """Test that the layers match the ones of every normalization kernel."""
+        for estrategia in KERNELS_NORMALIZACION:
+            normalizados = normalizar_indicadores(df_productos, {'CF': estrategia})
+            assert (calcular_capas_pareto(normalizados)
+                    == calcular_capas_pareto_productos(df_productos)).all()
+
+
+class TestConsensoRobusto:
+    """Test suite for the ranking indexes and the top-k consensus engine."""
+
+    @staticmethod
+    def consenso_directo(scores, k):
+        """Reference consensus: intersect the top-k sets of every scenario."""
+        tops = [set(np.argsort(-s, kind='stable')[:k]) for s in scores.values()]
+        return set.intersection(*tops)
+
+    @pytest.fixture
+    def df_scores(self):
+        """Create a dataset with scores for both scenarios."""
+        return pd.DataFrame({
+            'Producto': ['Frijol', 'Res', 'Mango', 'Arroz', 'Lenteja'],
+            'Score_México': [90.0, 20.0, 85.0, 60.0, 88.0],
+            'Score_México_B': [89.0, 25.0, 70.0, 80.0, 91.0]
+        })
+
+    def test_ranking_index(self):
+        """Test ranks and stable tie order."""
+        indice = IndiceRanking([5.0, 9.0, 5.0, 1.0])
+        assert indice.orden.tolist() == [1, 0, 2, 3]
+        assert indice.rango.tolist() == [1, 0, 2, 3]
+        assert indice.top(2).tolist() == [1, 0]
+
+    def test_consensus_of_both_scenarios(self, df_scores):
+        """Test the intersection of the top 3 in A and B."""
+        consenso = ConsensoRobusto(indices_ranking(df_scores), k=3)
+        productos = df_scores['Producto'].to_numpy()[consenso.productos()]
+        assert productos.tolist() == ['Frijol', 'Lenteja']
+
+    def test_configurable_k(self, df_scores):
+        """Test that k can be raised and lowered."""
+        consenso = ConsensoRobusto(indices_ranking(df_scores), k=3)
+        consenso.fijar_k(5)
+        assert len(consenso.productos()) == 5
+        consenso.fijar_k(1)
+        assert len(consenso.productos()) == 0
+
+    def test_any_number_of_scenarios(self):
+        """Test a consensus over three custom scenarios."""
+        rng = np.random.default_rng(1)
+        scores = {e: rng.random(30) for e in ('A', 'B', 'Sonora')}
+        consenso = ConsensoRobusto({e: IndiceRanking(s) for e, s in scores.items()}, k=12)
+        assert set(consenso.productos()) == self.consenso_directo(scores, 12)
+
+    def test_mismatched_scenarios_raise(self):
+        """Test that rankings over different catalogs are rejected."""
+        with pytest.raises(ValueError):
+            ConsensoRobusto({'A': IndiceRanking([1.0, 2.0]), 'B': IndiceRanking([1.0])})
+
+
+class TestEstabilidadRankings:
+    """Test suite for the rank-stability analytics."""
+
+    @staticmethod
+    def kendall_por_pares(x, y):
+        """Reference tau-b comparing every pair."""
+        concordantes = discordantes = empates_x = empates_y = 0
+        for i in range(len(x)):
+            for j in range(i + 1, len(x)):
+                dx, dy = np.sign(x[i] - x[j]), np.sign(y[i] - y[j])
+                if dx == 0 and dy == 0:
+                    continue
+                if dx == 0:
+                    empates_x += 1
+                elif dy == 0:
+                    empates_y += 1
+                elif dx == dy:
+                    concordantes += 1
+                else:
+                    discordantes += 1
+        n1 = concordantes + discordantes + empates_x
+        n2 = concordantes + discordantes + empates_y
+        return (concordantes - discordantes) / np.sqrt(n1 * n2)
+
+    @pytest.fixture
+    def df_scores(self):
+        """Create a dataset whose ranking changes between scenarios."""
+        return pd.DataFrame({
+            'Producto': ['Frijol', 'Res', 'Mango', 'Arroz', 'Lenteja'],
+            'Score_México': [90.0, 20.0, 85.0, 60.0, 88.0],
+            'Score_México_B': [89.0, 25.0, 70.0, 80.0, 91.0]
+        })
+
+    def test_average_ranks(self):
+        """Test that ties share their average rank."""
+        assert rangos_promedio([10, 20, 10, 30]).tolist() == [1.5, 3.0, 1.5, 4.0]
+
+    def test_inversion_count(self):
+        """Test the merge-sort inversion count against a double loop."""
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            valores = rng.integers(0, 6, rng.integers(0, 60))
+            esperado = sum(1 for i in range(len(valores)) for j in range(i + 1, len(valores))
+                           if valores[i] > valores[j])
+            assert contar_inversiones(valores) == esperado
+
+    def test_perfect_agreement_and_reversal(self):
+        """Test the correlation bounds."""
+        x = np.arange(20.0)
+        assert correlacion_spearman(x, x) == pytest.approx(1.0)
+        assert correlacion_kendall(x, x) == pytest.approx(1.0)
+        assert correlacion_spearman(x, -x) == pytest.approx(-1.0)
+        assert correlacion_kendall(x, -x) == pytest.approx(-1.0)
+
+    def test_kendall_matches_pairwise_with_ties(self):
+        """Test tau-b against the pairwise definition on tied data."""
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            x = rng.integers(0, 5, 40).astype(float)
+            y = rng.integers(0, 5, 40).astype(float)
+            assert correlacion_kendall(x, y) == pytest.approx(self.kendall_por_pares(x, y))
+
+    def test_spearman_is_pearson_of_ranks(self):
+        """Test Spearman against the Pearson correlation of average ranks."""
+        rng = np.random.default_rng(2)
+        x, y = rng.integers(0, 8, 50), rng.integers(0, 8, 50)
+        esperado = np.corrcoef(rangos_promedio(x), rangos_promedio(y))[0, 1]
+        assert correlacion_spearman(x, y) == pytest.approx(esperado)
+
+    def test_constant_input_is_nan(self):
+        """Test that correlations are undefined for constant rankings."""
+        assert np.isnan(correlacion_kendall([1, 1, 1], [1, 2, 3]))
+        assert np.isnan(correlacion_spearman([1, 2, 3], [5, 5, 5]))
+
+    def test_rank_change_table(self, df_scores):
+        """Test positions and deltas between A and B."""
+        tabla = tabla_cambios_ranking(df_scores)
+        fila = tabla.set_index('Producto').loc['Arroz']
+        assert (fila['Posición_A'], fila['Posición_B'], fila['Cambio']) == (4, 3, 1)
+        assert tabla['Cambio'].sum() == 0
+
+    def test_biggest_movers(self, df_scores):
+        """Test that movers are sorted by absolute change, ties in row order."""
+        df = df_scores.assign(Score_México_B=[89.0, 95.0, 70.0, 80.0, 91.0])
+        movimientos = mayores_cambios(tabla_cambios_ranking(df), 3)
+        assert movimientos['Producto'].tolist() == ['Res', 'Frijol', 'Mango']
+        assert movimientos['Cambio'].tolist() == [4, -2, -2]
+
+    def test_summary_covers_every_scenario_pair(self, df_scores):
+        """Test the pairwise summary for three scenarios."""
+        df = df_scores.assign(Score_Sonora=df_scores['Score_México'])
+        resumen = resumen_estabilidad(df, {'A': 'Score_México', 'B': 'Score_México_B',
+                                           'Sonora': 'Score_Sonora'})
+        assert len(resumen) == 3
+        fila = resumen[(resumen['Escenario_1'] == 'A') & (resumen['Escenario_2'] == 'Sonora')]
+        assert fila['Kendall'].iloc[0] == pytest.approx(1.0)
+        assert fila['Sin_cambio_pct'].iloc[0] == 100.0
+
+
+class TestValidarEsquema:
+    """Test suite for the dataset schema validator."""
+
+    @pytest.fixture
+    def df_valido(self):
+        """Create a dataset that satisfies ESQUEMA_DATASET."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Frijol'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 0.9],
+            'WF_L_kg': [214, 15415, 4055],
+            'LU_m2_kg': [0.8, 326.0, 3.4],
+            'Origin_Score': [0, 50, 0],
+            'Waste_pct': [15.688, 34.87, 7.27],
+            'NOVA': [1, 1, 1],
+            'Score_México': [91.2, 33.7, 92.8],
+            'Score_México_B': [89.5, 33.9, 92.3]
+        })
+
+    def problemas(self, reporte):
+        """Return the report as a set of (row, column, problem) tuples."""
+        return {(None if pd.isna(f) else int(f), c, p)
+                for f, c, p in zip(reporte['Fila'], reporte['Columna'], reporte['Problema'])}
+
+    def test_valid_dataset_has_empty_report(self, df_valido):
+        """Test that a valid dataset produces no problems."""
+        reporte = validar_esquema(df_valido)
+        assert len(reporte) == 0
+        assert list(reporte.columns) == ['Fila', 'Columna', 'Valor', 'Problema']
+
+    def test_bundled_dataset_is_valid(self):
+        """Test that the shipped CSV passes the schema."""
+        assert len(validar_esquema(pd.read_csv('dataset_con_scores_A_y_B.csv'))) == 0
+
+    def test_value_domains(self, df_valido):
+        """Test NOVA 1-4, Origin 0/50/100 and numeric bounds."""
+        df = df_valido.assign(
+            NOVA=[1, 5, 0],
+            Origin_Score=[0, 30, 100],
+            Waste_pct=[15.0, -1.0, 120.0]
+        )
+        assert self.problemas(validar_esquema(df)) == {
+            (1, 'NOVA', 'no está en {1, 2, 3, 4}'),
+            (2, 'NOVA', 'no está en {1, 2, 3, 4}'),
+            (1, 'Origin_Score', 'no está en {0, 50, 100}'),
+            (1, 'Waste_pct', 'menor que 0'),
+            (2, 'Waste_pct', 'mayor que 100')
+        }
+
+    def test_reports_every_problem_in_one_pass(self, df_valido):
+        """Test missing columns, values, types and duplicates together."""
+        df = df_valido.drop(columns='Score_México_B').astype({'WF_L_kg': object})
+        df.loc[0, 'WF_L_kg'] = 'mucho'
+        df.loc[1, 'LU_m2_kg'] = np.nan
+        df.loc[2, 'CF_kgCO2eq_kg'] = np.inf
+        df.loc[2, 'Producto'] = 'Tomate'
+        assert self.problemas(validar_esquema(df)) == {
+            (None, 'Score_México_B', 'columna faltante'),
+            (0, 'WF_L_kg', 'no numérico'),
+            (1, 'LU_m2_kg', 'valor faltante'),
+            (2, 'CF_kgCO2eq_kg', 'no finito'),
+            (2, 'Producto', 'duplicado')
+        }
+
+    def test_report_keeps_offending_values(self, df_valido):
+        """Test that the report shows the offending value."""
+        reporte = validar_esquema(df_valido.assign(NOVA=[1, 9, 1]))
+        assert reporte.loc[0, 'Valor'] == 9
+
+    def test_optional_columns(self, df_valido):
+        """Test that optional columns are only checked when present."""
+        assert len(validar_esquema(df_valido)) == 0
+        reporte = validar_esquema(df_valido.assign(Kcal_100g=[18, -5, 341]))
+        assert self.problemas(reporte) == {(1, 'Kcal_100g', 'menor que 0')}
+
+    def test_custom_schema(self, df_valido):
+        """Test validation against a caller-provided schema."""
+        esquema = {'Producto': ESQUEMA_DATASET['Producto'], 'NOVA': {'tipo': 'numero', 'max': 0}}
+        reporte = validar_esquema(df_valido, esquema)
+        assert reporte['Columna'].unique().tolist() == ['NOVA']
+        assert len(reporte) == 3
+
+    def test_exigir_esquema_raises_with_report(self, df_valido):
+        """Test that the gate raises ErrorEsquema carrying the report."""
+        assert exigir_esquema(df_valido) is df_valido
+        with pytest.raises(ErrorEsquema) as error:
+            exigir_esquema(df_valido.assign(NOVA=[1, 2, 7]))
+        assert isinstance(error.value, ValueError)
+        assert len(error.value.reporte) == 1
+        assert 'NOVA' in str(error.value)
+
+
+class TestResumenCatalogo:
+    """Test suite for the precomputed home-page aggregates."""
+
+    @pytest.fixture
+    def df_scores(self):
+        """Create a dataset with scores for both scenarios."""
+        return pd.DataFrame({
+            'Producto': ['Frijol', 'Res', 'Mango', 'Arroz', 'Lenteja'],
+            'Score_México': [90.0, 20.0, 85.0, 60.0, 88.0],
+            'Score_México_B': [89.0, 25.0, 70.0, 80.0, 91.0]
+        })
+
+    def test_vectorized_classification_matches_scalar(self):
+        """Test clasificar_scores against clasificar_score on the boundaries."""
+        scores = [0, 59.99, 60, 69.99, 70, 79.99, 80, 89.99, 90, 100]
+        esperado = [clasificar_score(score)[0] for score in scores]
+        assert clasificar_scores(scores).tolist() == esperado
+
+    def test_matches_dataset_scan(self, df_scores):
+        """Test that the aggregates equal the direct pandas computations."""
+        resumen = ResumenCatalogo(df_scores)
+        assert resumen.n == 5
+        for escenario, columna in [('A', 'Score_México'), ('B', 'Score_México_B')]:
+            assert resumen.promedio(escenario) == pytest.approx(df_scores[columna].mean())
+            assert resumen.mejor(escenario) == df_scores.nlargest(1, columna)['Producto'].iloc[0]
+            assert resumen.peor(escenario) == df_scores.nsmallest(1, columna)['Producto'].iloc[0]
+
+    def test_class_counts(self, df_scores):
+        """Test products per classification in CLASES_SCORE order."""
+        clases = ResumenCatalogo(df_scores).clases('A')
+        assert list(clases) == list(CLASES_SCORE)
+        assert clases == {'Excelente': 1, 'Muy Bueno': 2, 'Bueno': 0, 'Moderado': 1, 'Bajo': 1}
+
+    def test_category_means(self, df_scores):
+        """Test the mean score per food group."""
+        promedios = ResumenCatalogo(df_scores).promedios_categoria('A')
+        assert promedios['Leguminosas'] == pytest.approx(89.0)
+        assert promedios['Proteína Animal'] == pytest.approx(20.0)
+
+    def test_incremental_add_matches_rebuild(self, df_scores):
+        """Test that adding a product equals rebuilding from the grown dataset."""
+        resumen = ResumenCatalogo(df_scores)
+        resumen.agregar('Aguacate', {'A': 96.0, 'B': 95.0})
+        nuevo = pd.concat([df_scores, pd.DataFrame({
+            'Producto': ['Aguacate'], 'Score_México': [96.0], 'Score_México_B': [95.0]
+        })], ignore_index=True)
+        reconstruido = ResumenCatalogo(nuevo)
+
+        for escenario in ('A', 'B'):
+            assert resumen.promedio(escenario) == pytest.approx(reconstruido.promedio(escenario))
+            assert resumen.mejor(escenario) == reconstruido.mejor(escenario) == 'Aguacate'
+            assert resumen.clases(escenario) == reconstruido.clases(escenario)
+            assert resumen.promedios_categoria(escenario) == pytest.approx(
+                reconstruido.promedios_categoria(escenario))
+
+    def test_add_new_category(self, df_scores):
+        """Test that unknown products start an 'Otros' group."""
+        resumen = ResumenCatalogo(df_scores)
+        resumen.agregar('Kiwi', {'A': 50.0, 'B': 55.0})
+        assert resumen.promedios_categoria('A')['Otros'] == 50.0
+        assert resumen.peor('A') == 'Res'
+
+    def test_add_requires_every_scenario(self, df_scores):
+        """Test that a product without all scenario scores is rejected."""
+        resumen = ResumenCatalogo(df_scores)
+        with pytest.raises(ValueError):
+            resumen.agregar('Kiwi', {'A': 50.0})
+        assert resumen.n == 5
+
+    def test_grown_copy_leaves_base_untouched(self, df_scores):
+        """Test that ampliar equals a rebuild and never mutates the shared summary."""
+        base = ResumenCatalogo(df_scores)
+        nuevos = pd.DataFrame({'Producto': ['Aguacate', 'Kiwi'],
+                               'Score_México': [96.0, 10.0], 'Score_México_B': [95.0, 12.0]})
+        ampliado = base.ampliar(nuevos)
+        reconstruido = ResumenCatalogo(pd.concat([df_scores, nuevos], ignore_index=True))
+
+        assert ampliado.n == reconstruido.n == 7
+        for escenario in ('A', 'B'):
+            assert ampliado.promedio(escenario) == pytest.approx(reconstruido.promedio(escenario))
+            assert ampliado.mejor(escenario) == reconstruido.mejor(escenario) == 'Aguacate'
+            assert ampliado.peor(escenario) == reconstruido.peor(escenario) == 'Kiwi'
+            assert ampliado.clases(escenario) == reconstruido.clases(escenario)
+            assert ampliado.productos_categoria(escenario) == reconstruido.productos_categoria(escenario)
+
+        assert base.n == 5
+        assert base.mejor('A') == 'Frijol'
+        assert 'Otros' not in base.productos_categoria('A')
+
+    def test_merged_summary_extends_cached_base(self, df_scores):
+        """Test that the summary of a grown catalog starts from the base summary."""
+        base = obtener_resumen_catalogo(df_scores, 'test-resumen')
+        nuevos = pd.DataFrame({'Producto': ['Kiwi'], 'Score_México': [50.0], 'Score_México_B': [55.0]})
+        combinado = pd.concat([df_scores, nuevos], ignore_index=True)
+        resumen = obtener_resumen_catalogo(combinado, 'test-resumen+kiwi', base)
+        assert obtener_resumen_catalogo(combinado, 'test-resumen+kiwi') is resumen
+        assert resumen.n == 6 and base.n == 5
+        assert resumen.promedios_categoria('A')['Otros'] == 50.0
+
+
+class TestAlmacenSQLite:
+    """Test suite for the SQLite-backed catalog store."""
+
+    @pytest.fixture
+    def df_valido(self):
+        """Create a dataset that satisfies ESQUEMA_DATASET."""
+        return pd.DataFrame({
+            'Producto': ['Tomate', 'Res', 'Frijol', 'Mango'],
+            'CF_kgCO2eq_kg': [1.4, 60.0, 0.9, 0.6],
+            'WF_L_kg': [214, 15415, 4055, 1800],
+            'LU_m2_kg': [0.8, 326.0, 3.4, 2.1],
+            'Origin_Score': [0, 50, 0, 100],
+            'Waste_pct': [15.688, 34.87, 7.27, 5.085],
+            'NOVA': [1, 1, 1, 2],
+            'Score_México': [91.2, 33.7, 92.8, 95.9],
+            'Score_México_B': [89.5, 33.9, 92.3, 95.5]
+        })
+
+    @pytest.fixture
+    def almacen(self, tmp_path, df_valido):
+        """Create a store with the dataset imported."""
+        almacen = AlmacenSQLite(str(tmp_path / 'catalogo.db'), conexiones=2)
+        almacen.importar(df_valido, lote=3)
+        yield almacen
+        almacen.cerrar()
+
+    def test_round_trip(self, almacen, df_valido):
+        """Test that the stored catalog matches the imported one."""
+        df = almacen.cargar_dataframe()
+        assert len(almacen) == 4
+        assert almacen.escenarios() == ['A', 'B']
+        assert df['Producto'].tolist() == df_valido['Producto'].tolist()
+        assert np.allclose(df['Score_México_B'], df_valido['Score_México_B'])
+        assert df['Categoría'].tolist()[:2] == ['Vegetales', 'Proteína Animal']
+        assert len(validar_esquema(df)) == 0
+
+    def test_ranking_pages(self, almacen, df_valido):
+        """Test ranking order, positions and paging."""
+        ranking = almacen.ranking('A')
+        esperado = df_valido.sort_values('Score_México', ascending=False)['Producto'].tolist()
+        assert ranking['Producto'].tolist() == esperado
+        pagina = almacen.ranking('A', limite=2, desde=2)
+        assert pagina['Producto'].tolist() == esperado[2:]
+        assert pagina['Posición'].tolist() == [3, 4]
+        assert almacen.ranking('A', limite=1, ascendente=True)['Producto'].iloc[0] == 'Res'
+
+    def test_filters(self, almacen):
+        """Test category, NOVA, origin and score filters."""
+        assert almacen.filtrar('A', categoria='Frutas')['Producto'].tolist() == ['Mango']
+        assert almacen.filtrar('A', nova=[1], origen=[0])['Producto'].tolist() == ['Frijol', 'Tomate']
+        assert almacen.filtrar('B', score_min=90)['Producto'].tolist() == ['Mango', 'Frijol']
+
+    def test_lookup(self, almacen):
+        """Test single-product lookup."""
+        fila = almacen.producto('Res')
+        assert fila['CF_kgCO2eq_kg'] == 60.0
+        assert fila['Score_México'] == pytest.approx(33.7)
+        assert almacen.producto('Kiwi') is None
+
+    def test_reimport_upserts_and_bumps_version(self, almacen, df_valido):
+        """Test that importing again updates products instead of duplicating them."""
+        version = almacen.version()
+        almacen.importar(df_valido.assign(Score_México=[10.0, 20.0, 30.0, 40.0]))
+        assert len(almacen) == 4
+        assert almacen.producto('Mango')['Score_México'] == 40.0
+        assert almacen.version() != version
+
+    def test_invalid_dataset_is_not_written(self, almacen, df_valido):
+        """Test that a failed validation leaves the store untouched."""
+        with pytest.raises(ErrorEsquema):
+            almacen.importar(df_valido.assign(NOVA=[1, 1, 9, 1], Producto=['A', 'B', 'C', 'D']))
+        assert len(almacen) == 4
+
+    def test_import_csv_in_chunks(self, tmp_path, df_valido):
+        """Test chunked CSV import."""
+        ruta = tmp_path / 'catalogo.csv'
+        df_valido.to_csv(ruta, index=False)
+        almacen = AlmacenSQLite(str(tmp_path / 'otro.db'))
+        try:
+            assert almacen.importar_csv(str(ruta), chunksize=3) == 4
+            assert len(almacen) == 4
+        finally:
+            almacen.cerrar()
+
+    def test_import_csv_rejects_duplicates_across_chunks(self, tmp_path, df_valido):
+        """Test that a product repeated in a later chunk fails the whole import."""
+        ruta = tmp_path / 'catalogo.csv'
+        pd.concat([df_valido, df_valido.iloc[[1]]]).to_csv(ruta, index=False)
+        almacen = AlmacenSQLite(str(tmp_path / 'otro.db'))
+        try:
+            with pytest.raises(ErrorEsquema) as error:
+                almacen.importar_csv(str(ruta), chunksize=3)
+            assert error.value.reporte['Fila'].tolist() == [4]
+            assert error.value.reporte['Valor'].tolist() == ['Res']
+            assert len(almacen) == 0
+        finally:
+            almacen.cerrar()
+
+    def test_import_csv_is_atomic(self, almacen, tmp_path, df_valido):
+        """Test that a failing chunk discards the chunks written before it."""
+        ruta = tmp_path / 'catalogo.csv'
+        nuevos = df_valido.assign(Producto=['A', 'B', 'C', 'D'], NOVA=[1, 1, 1, 9])
+        nuevos.to_csv(ruta, index=False)
+        version = almacen.version()
+        with pytest.raises(ErrorEsquema) as error:
+            almacen.importar_csv(str(ruta), chunksize=2)
+        assert error.value.reporte['Fila'].tolist() == [3]
+        assert sorted(almacen.cargar_dataframe()['Producto']) == sorted(df_valido['Producto'])
+        assert almacen.version() == version
+        nuevos.assign(NOVA=1).to_csv(ruta, index=False)
+        assert almacen.importar_csv(str(ruta), chunksize=2) == 4
+        assert len(almacen) == 8
+
+    def test_pool_serves_concurrent_sessions(self, almacen):
+        """Test that more sessions than connections share the pool."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            resultados = list(pool.map(lambda _: almacen.ranking('A', limite=1)['Producto'].iloc[0],
+                                       range(32)))
+        assert set(resultados) == {'Mango'}
+
+
+class TestRankingIncremental:
+    """Test suite for the ranking that accepts added products."""
+
+    @pytest.fixture
+    def ranking(self):
+        """Create a ranking over five dataset products."""
+        scores = [90.0, 20.0, 85.0, 60.0, 88.0]
+        return RankingIncremental(IndiceRanking(scores).congelar(),
+                                  ['Frijol', 'Res', 'Mango', 'Arroz', 'Lenteja'])
+
+    def test_position_without_insert(self, ranking):
+        """Test where a score would land, after equal scores."""
+        assert ranking.posicion(95.0) == 1
+        assert ranking.posicion(88.0) == 3
+        assert ranking.posicion(0.0) == 6
+
+    def test_inserts_match_full_sort(self, ranking):
+        """Test positions and top-k against sorting everything."""
+        rng = np.random.default_rng(0)
+        todos = {'Frijol': 90.0, 'Res': 20.0, 'Mango': 85.0, 'Arroz': 60.0, 'Lenteja': 88.0}
+        for i in range(40):
+            score = float(rng.integers(0, 100))
+            posicion = ranking.insertar(f'Nuevo {i}', score)
+            assert posicion == 1 + sum(1 for v in todos.values() if v >= score)
+            todos[f'Nuevo {i}'] = score
+        esperado = sorted(todos.values(), reverse=True)[:10]
+        assert [score for _, score in ranking.top(10)] == esperado
+        assert len(ranking) == 45
+
+    def test_reinsert_replaces_previous_score(self, ranking):
+        """Test that inserting the same product again moves it."""
+        ranking.insertar('Kiwi', 95.0)
+        ranking.insertar('Kiwi', 10.0)
+        assert len(ranking) == 6
+        assert ranking.top(1) == [('Frijol', 90.0)]
+
+    def test_compaction_keeps_ranking(self, ranking):
+        """Test that folding inserts into the base changes nothing visible."""
+        ranking.insertar('Kiwi', 89.0)
+        ranking.insertar('Quinoa', 30.0)
+        antes = ranking.top(7)
+        ranking.compactar()
+        assert ranking.top(7) == antes
+        assert ranking.posicion(89.5) == 2
+
+    def test_bottom_matches_full_sort(self, ranking):
+        """Test that the worst entries merge base and inserted products."""
+        ranking.insertar('Kiwi', 10.0)
+        ranking.insertar('Quinoa', 70.0)
+        assert ranking.fondo(3) == [('Kiwi', 10.0), ('Res', 20.0), ('Arroz', 60.0)]
+        assert [p for p, _ in ranking.fondo(len(ranking))] == [p for p, _ in ranking.top(len(ranking))][::-1]
+        assert ranking.fondo(0) == []
+
+
+class TestRegistroEvaluaciones:
+    """Test suite for the append-only submission log."""
+
+    @staticmethod
+    def registro_producto(nombre, score=80.0):
+        """Create a valid evaluated-product record."""
+        return {
+            'Producto': nombre,
+            'CF_kgCO2eq_kg': 2.0, 'WF_L_kg': 1000, 'LU_m2_kg': 5.0,
+            'Origin_Score': 0, 'Waste_pct': 10.0, 'NOVA': 1,
+            'Score_México': score, 'Score_México_B': score - 1
+        }
+
+    @staticmethod
+    def lineas(ruta):
+        """Return the JSON records of a log file."""
+        if not ruta.exists():
+            return []
+        return [json.loads(l) for l in ruta.read_text(encoding='utf-8').splitlines() if l]
+
+    def test_batched_writes(self, tmp_path):
+        """Test that records are appended once the batch fills."""
+        ruta = tmp_path / 'registro.jsonl'
+        registro = RegistroEvaluaciones(str(ruta), lote=3, intervalo=3600)
+        registro.agregar(self.registro_producto('Kiwi'))
+        registro.agregar(self.registro_producto('Quinoa'))
+        assert self.lineas(ruta) == []
+        assert len(registro) == 2
+        registro.agregar(self.registro_producto('Chía'))
+        assert [r['Producto'] for r in self.lineas(ruta)] == ['Kiwi', 'Quinoa', 'Chía']
+
+    def test_reload_keeps_latest_record(self, tmp_path):
+        """Test persistence across instances, latest evaluation winning."""
+        ruta = str(tmp_path / 'registro.jsonl')
+        registro = RegistroEvaluaciones(ruta, lote=100, intervalo=3600)
+        registro.agregar(self.registro_producto('Kiwi', 70.0))
+        registro.agregar(self.registro_producto('Kiwi', 75.0))
+        registro.vaciar()
+
+        recargado = RegistroEvaluaciones(ruta)
+        productos = recargado.productos()
+        assert productos['Producto'].tolist() == ['Kiwi']
+        assert productos['Score_México'].iloc[0] == 75.0
+        assert 'fecha' not in productos.columns
+
+    def test_compaction(self, tmp_path):
+        """Test that superseded lines are dropped once they dominate the log."""
+        ruta = tmp_path / 'registro.jsonl'
+        registro = RegistroEvaluaciones(str(ruta), lote=1, minimo_compactacion=6)
+        for i in range(5):
+            registro.agregar(self.registro_producto('Kiwi', 70.0 + i))
+        assert len(self.lineas(ruta)) == 5
+        registro.agregar(self.registro_producto('Quinoa'))
+        lineas = self.lineas(ruta)
+        assert [r['Producto'] for r in lineas] == ['Kiwi', 'Quinoa']
+        assert lineas[0]['Score_México'] == 74.0
+
+    def test_invalid_record_is_rejected(self, tmp_path):
+        """Test that records failing the schema never reach the log."""
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        with pytest.raises(ErrorEsquema):
+            registro.agregar(dict(self.registro_producto('Kiwi'), NOVA=7))
+        assert len(registro) == 0
+
+    def test_merge_into_catalog(self, tmp_path):
+        """Test that only products missing from the dataset are added."""
+        df = pd.DataFrame([self.registro_producto('Tomate', 91.0)])
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        registro.agregar(self.registro_producto('Tomate', 10.0))
+        registro.agregar(self.registro_producto('Kiwi'))
+        combinado = registro.combinar(df)
+        assert combinado['Producto'].tolist() == ['Tomate', 'Kiwi']
+        assert combinado['Score_México'].iloc[0] == 91.0
+        assert len(validar_esquema(combinado)) == 0
+
+    def test_rankings_sync_incrementally(self, tmp_path):
+        """Test that rankings only insert records they have not seen."""
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        indice = IndiceRanking([90.0, 60.0]).congelar()
+        rankings = {'A': RankingIncremental(indice, ['Frijol', 'Arroz'])}
+
+        registro.agregar(self.registro_producto('Kiwi', 80.0))
+        registro.sincronizar(rankings)
+        registro.sincronizar(rankings)
+        assert len(rankings['A']) == 3
+
+        registro.agregar(self.registro_producto('Frijol', 10.0))
+        registro.sincronizar(rankings)
+        assert len(rankings['A']) == 3
+        assert rankings['A'].top(2) == [('Frijol', 90.0), ('Kiwi', 80.0)]
+
+    def test_version_is_specific_to_log_file(self, tmp_path):
+        """Test that two logs with the same record count have different versions."""
+        uno = RegistroEvaluaciones(str(tmp_path / 'uno.jsonl'))
+        otro = RegistroEvaluaciones(str(tmp_path / 'otro.jsonl'))
+        assert uno.version != otro.version
+        version = uno.version
+        uno.agregar(self.registro_producto('Kiwi'))
+        assert uno.version != version
+        assert RegistroEvaluaciones(str(tmp_path / 'uno.jsonl')).version.rsplit(':', 1)[0] == version.rsplit(':', 1)[0]
+
+    def test_single_exit_hook_flushes_every_log(self, tmp_path, monkeypatch):
+        """Test that new logs add no exit hook and the module hook flushes them."""
+        registrados = []
+        monkeypatch.setattr(calculadora_nucleo.atexit, 'register', registrados.append)
+        rutas = [tmp_path / f'registro_{i}.jsonl' for i in range(3)]
+        registros = [RegistroEvaluaciones(str(ruta), lote=100, intervalo=3600) for ruta in rutas]
+        for registro in registros:
+            registro.agregar(self.registro_producto('Kiwi'))
+        assert registrados == []
+        assert all(self.lineas(ruta) == [] for ruta in rutas)
+
+        calculadora_nucleo._vaciar_registros()
+        assert all(len(self.lineas(ruta)) == 1 for ruta in rutas)
+
+    def test_merged_catalog_cached_per_log_version(self, tmp_path):
+        """Test that the merged catalog is rebuilt only when the log changes."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        registro.agregar(self.registro_producto('Kiwi'))
+        combinado = obtener_catalogo_combinado(df, 'test-combinado', registro, registro.version)
+        assert obtener_catalogo_combinado(df, 'test-combinado', registro, registro.version) is combinado
+        assert combinado['Producto'].iloc[-1] == 'Kiwi'
+
+        registro.agregar(self.registro_producto('Quinoa'))
+        nuevo = obtener_catalogo_combinado(df, 'test-combinado', registro, registro.version)
+        assert nuevo is not combinado
+        assert nuevo['Producto'].tolist()[-2:] == ['Kiwi', 'Quinoa']
+
+    def test_incremental_consensus_matches_rebuilt_indexes(self, tmp_path):
+        """Test the consensus over synced rankings against indexes of the merged catalog."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        for nombre, score in [('Kiwi', 100.0), ('Quinoa', 98.5), ('Chía', 15.0)]:
+            registro.agregar(self.registro_producto(nombre, score))
+        rankings = {e: RankingIncremental(indice, df['Producto'])
+                    for e, indice in indices_ranking(df).items()}
+        registro.sincronizar(rankings)
+
+        combinado = registro.combinar(df)
+        for k in [3, 10, len(combinado)]:
+            consenso = ConsensoRobusto(indices_ranking(combinado), k)
+            esperado = combinado['Producto'].to_numpy()[consenso.productos()]
+            assert set(consenso_incremental(rankings, k)) == set(esperado)
+        assert consenso_incremental(rankings, 3) == ['Kiwi', 'Sandía', 'Quinoa']
+
+
+class TestMemoScores:
+    """Test suite for the LRU memo around single-product scoring."""
+
+    PRODUCTO = (2.0, 500, 1.5, 0, 10.0, 1)
+
+    def test_same_result_as_direct_scoring(self):
+        """Test that memoized results equal calcular_score_producto."""
+        memo = MemoScores()
+        for escenario in ('A', 'B'):
+            esperado = calcular_score_producto(*self.PRODUCTO, escenario)
+            assert memo.calcular(*self.PRODUCTO, escenario) == esperado
+            assert memo.calcular(*self.PRODUCTO, escenario) == esperado
+
+    def test_hit_and_miss_counters(self):
+        """Test counters for repeated and new evaluations."""
+        memo = MemoScores()
+        memo.calcular(*self.PRODUCTO, 'A')
+        memo.calcular(*self.PRODUCTO, 'A')
+        memo.calcular(*self.PRODUCTO, 'B')
+        estadisticas = memo.estadisticas()
+        assert (estadisticas['aciertos'], estadisticas['fallos']) == (1, 2)
+        assert estadisticas['entradas'] == 2
+        assert estadisticas['tasa_aciertos'] == pytest.approx(1 / 3)
+
+    def test_quantized_key(self):
+        """Test that inputs equal after rounding share one entry."""
+        memo = MemoScores(decimales=2)
+        memo.calcular(2.0, 500, 1.5, 0, 10.0, 1)
+        memo.calcular(2.001, 500.0, 1.5, 0.0, 10.0, 1.0)
+        assert memo.estadisticas()['aciertos'] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        memo = MemoScores(max_entradas=2)
+        memo.calcular(1.0, 500, 1.5, 0, 10.0, 1)
+        memo.calcular(2.0, 500, 1.5, 0, 10.0, 1)
+        memo.calcular(1.0, 500, 1.5, 0, 10.0, 1)
+        memo.calcular(3.0, 500, 1.5, 0, 10.0, 1)
+        assert memo.estadisticas()['desalojos'] == 1
+
+        memo.calcular(1.0, 500, 1.5, 0, 10.0, 1)
+        assert memo.estadisticas()['aciertos'] == 2
+        memo.calcular(2.0, 500, 1.5, 0, 10.0, 1)
+        assert memo.estadisticas()['fallos'] == 4
+
+    def test_returned_details_are_private(self):
+        """Test that mutating a returned dict does not alter the cache."""
+        memo = MemoScores()
+        _, detalles = memo.calcular(*self.PRODUCTO)
+        detalles['CF'] = -1
+        assert memo.calcular(*self.PRODUCTO)[1]['CF'] != -1
+
+    def test_invalid_scenario_is_not_cached(self):
+        """Test that errors propagate and are not stored."""
+        memo = MemoScores()
+        with pytest.raises(ValueError):
+            memo.calcular(*self.PRODUCTO, 'Z')
+        assert memo.estadisticas()['entradas'] == 0
+
+    def test_concurrent_sessions(self):
+        """Test counters and size bound under many threads."""
+        memo = MemoScores(max_entradas=16)
+        productos = [(float(i % 32), 500, 1.5, 0, 10.0, 1) for i in range(2000)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            resultados = list(pool.map(lambda p: memo.calcular(*p)[0], productos))
+        estadisticas = memo.estadisticas()
+        assert estadisticas['aciertos'] + estadisticas['fallos'] == 2000
+        assert estadisticas['entradas'] <= 16
+        assert resultados[:32] == [calcular_score_producto(*p)[0] for p in productos[:32]]
+
+    def test_cleared_when_ranges_change(self, tmp_path):
+        """Test that loading a range config drops memoized scores."""
+        from calculadora_nucleo import MEMO_SCORES, calcular_score_memo
+        calcular_score_memo(*self.PRODUCTO)
+        ruta = tmp_path / 'rangos.json'
+        originales = dict(INDICATOR_RANGES)
+        guardar_config_rangos({'version': 1, 'rangos': originales}, str(ruta))
+        try:
+            aplicar_config_rangos(str(ruta))
+            assert MEMO_SCORES.estadisticas()['entradas'] == 0
+        finally:
+            INDICATOR_RANGES.update(originales)
+
+
+class TestScorerCompilado:
+    """Test suite for the compiled per-scenario scorer."""
+
+    @pytest.fixture
+    def valores(self):
+        """Create random raw indicators, including values outside the ranges."""
+        rng = np.random.default_rng(0)
+        return np.column_stack([
+            rng.uniform(0, 80, 200),
+            rng.uniform(0, 25000, 200),
+            rng.uniform(0, 400, 200),
+            rng.choice([0, 50, 100], 200),
+            rng.uniform(0, 60, 200),
+            rng.integers(1, 5, 200)
+        ])
+
+    @pytest.mark.parametrize("escenario", ['A', 'B'])
+    def test_scalar_matches_calcular_score_producto(self, valores, escenario):
+        """Test that the compiled scalar path equals the reference scorer."""
+        scorer = compilar_scorer(escenario)
+        for fila in valores[:50]:
+            esperado, _ = calcular_score_producto(*fila, escenario)
+            assert scorer(*fila) == pytest.approx(esperado, abs=1e-9)
+
+    @pytest.mark.parametrize("escenario", ['A', 'B'])
+    def test_batch_matches_scalar(self, valores, escenario):
+        """Test that the batch path equals the scalar path."""
+        scorer = compilar_scorer(escenario)
+        esperado = [scorer(*fila) for fila in valores]
+        assert np.allclose(scorer.lote(valores), esperado, atol=1e-9)
+
+    def test_dataframe_matches_dataset_scores(self):
+        """Test scoring the bundled dataset against its stored scores."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        esperado = [calcular_score_producto(*fila, 'B')[0] for fila in
+                    df[['CF_kgCO2eq_kg', 'WF_L_kg', 'LU_m2_kg', 'Origin_Score',
+                        'Waste_pct', 'NOVA']].itertuples(index=False)]
+        assert np.allclose(compilar_scorer('B').dataframe(df), esperado, atol=1e-9)
+
+    def test_degenerate_range(self):
+        """Test that an empty range contributes 50 points, as normalizar_inverso."""
+        rangos = dict(INDICATOR_RANGES, NOVA=(2, 2))
+        scorer = ScorerCompilado('A', rangos)
+        assert scorer.coef[-1] == 0.0
+        fila = (2.0, 500, 1.5, 0, 10.0, 3)
+        normalizados = [normalizar_inverso(v, *rangos[i]) for v, i in zip(fila, INDICADORES)]
+        esperado = sum(n * SCENARIOS['A'][i] for n, i in zip(normalizados, INDICADORES))
+        assert scorer(*fila) == pytest.approx(esperado)
+
+    def test_compiled_once_per_scenario(self):
+        """Test that compilar_scorer reuses the compiled object."""
+        assert compilar_scorer('A') is compilar_scorer('A')
+        assert compilar_scorer('A') is not compilar_scorer('B')
+
+    def test_invalid_scenario_raises(self):
+        """Test that an unknown scenario raises ValueError."""
+        with pytest.raises(ValueError):
+            ScorerCompilado('Z')
+
+
+class TestKernelFusionado:
+    """Test suite for the fused batch scoring kernel."""
+
+    @pytest.fixture
+    def valores(self):
+        """Create random raw indicators inside INDICATOR_RANGES."""
+        rng = np.random.default_rng(1)
+        return np.column_stack([
+            rng.uniform(*INDICATOR_RANGES[i], 300) for i in INDICADORES
+        ])
+
+    @pytest.fixture
+    def fuera_de_rango(self):
+        """Create raw indicators up to 50% beyond both ends of every range."""
+        rng = np.random.default_rng(2)
+        columnas = []
+        for indicador in INDICADORES:
+            minimo, maximo = INDICATOR_RANGES[indicador]
+            margen = (maximo - minimo) / 2
+            columnas.append(rng.uniform(minimo - margen, maximo + margen, 300))
+        return np.column_stack(columnas)
+
+    @staticmethod
+    def referencia(valores, escenario):
+        """Score row by row with calcular_score_producto."""
+        return np.array([calcular_score_producto(*fila, escenario)[0] for fila in valores])
+
+    @pytest.mark.parametrize("escenario", ['A', 'B'])
+    @pytest.mark.parametrize("recortar", [True, False])
+    def test_matches_calcular_score_producto(self, valores, escenario, recortar):
+        """Test equivalence with the reference scorer for in-range inputs."""
+        esperado = self.referencia(valores, escenario)
+        scores, _ = puntuar_y_clasificar(valores, escenario, recortar=recortar)
+        assert scores.dtype == np.float32
+        assert np.allclose(scores, esperado, atol=1e-3)
+
+    @pytest.mark.parametrize("escenario", ['A', 'B'])
+    def test_classes_match_clasificar_score(self, valores, escenario):
+        """Test that class codes agree with clasificar_score on the kernel's scores."""
+        scores, clases = puntuar_y_clasificar(valores, escenario)
+        assert clases.dtype == np.int8
+        assert [CLASES_SCORE[c] for c in clases] == [clasificar_score(float(s))[0] for s in scores]
+
+    def test_without_clipping_matches_reference_out_of_range(self, fuera_de_rango):
+        """Test that recortar=False reproduces the unclipped reference scores."""
+        esperado = self.referencia(fuera_de_rango, 'A')
+        scores, _ = puntuar_y_clasificar(fuera_de_rango, 'A', recortar=False)
+        assert np.allclose(scores, esperado, atol=1e-2)
+
+    def test_clipping_equals_reference_on_clipped_inputs(self, fuera_de_rango):
+        """Test that clipping matches scoring raw values clipped to their ranges."""
+        minimos = [INDICATOR_RANGES[i][0] for i in INDICADORES]
+        maximos = [INDICATOR_RANGES[i][1] for i in INDICADORES]
+        esperado = self.referencia(np.clip(fuera_de_rango, minimos, maximos), 'A')
+        scores, _ = puntuar_y_clasificar(fuera_de_rango, 'A')
+        assert np.allclose(scores, esperado, atol=1e-3)
+        assert scores.min() >= 0 and scores.max() <= 100
+
+    def test_loop_kernel_matches_numpy_backend(self, fuera_de_rango):
+        """Test the numba kernel source, run as plain Python, against the fallback."""
+        from calculadora_nucleo import _kernel_fusionado
+        scorer = compilar_scorer('B')
+        valores = np.ascontiguousarray(fuera_de_rango[:50], dtype=np.float32)
+        scores = np.empty(len(valores), dtype=np.float32)
+        clases = np.empty(len(valores), dtype=np.int8)
+        _kernel_fusionado(valores, scorer._base32, scorer._coef32, scorer._techo32,
+                          True, scores, clases)
+        esperado, esperadas = scorer.lote_fusionado(valores, backend='numpy')
+        assert np.allclose(scores, esperado, atol=1e-4)
+        assert np.array_equal(clases, esperadas)
+
+    def test_blocks_cover_whole_batch(self, valores):
+        """Test that batches larger than one NumPy block are fully scored."""
+        grande = np.tile(valores, (300, 1))
+        scores, _ = puntuar_y_clasificar(grande, 'A')
+        esperado, _ = puntuar_y_clasificar(valores, 'A')
+        assert np.array_equal(scores, np.tile(esperado, 300))
+
+    def test_nan_is_classified_bajo(self):
+        """Test that a missing indicator yields a NaN score in the lowest class."""
+        scores, clases = puntuar_y_clasificar([[np.nan, 500, 1.5, 0, 10.0, 3]], 'A')
+        assert np.isnan(scores[0])
+        assert CLASES_SCORE[clases[0]] == clasificar_score(float('nan'))[0]
+
+    def test_default_backend(self):
+        """Test that the default backend reflects whether numba is installed."""
+        try:
+            import numba  # noqa: F401
+            assert BACKEND_FUSIONADO == 'numba'
+        except ImportError:
+            assert BACKEND_FUSIONADO == 'numpy'
+
+    def test_invalid_input_raises(self, valores):
+        """Test that a wrong shape or backend raises ValueError."""
+        with pytest.raises(ValueError):
+            puntuar_y_clasificar(valores[:, :5], 'A')
+        with pytest.raises(ValueError):
+            puntuar_y_clasificar(valores, 'A', backend='cuda')
+
+
+class TestDatosGraficos:
+    """Test suite for chart pre-aggregation, downsampling and figure caching."""
+
+    def test_top_n_folds_rest_into_sum(self):
+        """Test that entries beyond n are summed into one row."""
+        tabla = top_n_con_otros(list('abcde'), [5, 1, 4, 2, 3], n=2)
+        assert tabla['Etiqueta'].tolist() == ['a', 'c', 'Otros']
+        assert tabla['Valor'].tolist() == [5, 4, 6]
+        assert tabla['Elementos'].tolist() == [1, 1, 3]
+
+    def test_top_n_weighted_mean(self):
+        """Test that with weights the folded row is their weighted mean."""
+        tabla = top_n_con_otros(['x', 'y', 'z'], [90.0, 50.0, 80.0], n=1, pesos=[1, 3, 1])
+        assert tabla.iloc[-1]['Valor'] == pytest.approx((50 * 3 + 80) / 4)
+        assert tabla.iloc[-1]['Elementos'] == 4
+
+    def test_top_n_keeps_input_order(self):
+        """Test that ordenar=False keeps the first n entries."""
+        tabla = top_n_con_otros(['1', '2', '3'], [10, 30, 5], n=2, ordenar=False,
+                                etiqueta_otros='3+')
+        assert tabla['Etiqueta'].tolist() == ['1', '2', '3+']
+        assert tabla['Valor'].tolist() == [10, 30, 5]
+
+    def test_top_n_without_overflow(self):
+        """Test that no folded row is added when everything fits."""
+        assert len(top_n_con_otros(['a', 'b'], [1, 2], n=5)) == 2
+
+    def test_histogram_counts(self):
+        """Test that every finite score lands in exactly one bin."""
+        valores = np.array([0, 4.9, 5, 50, 100, np.nan])
+        tabla = histograma_scores(valores, bins=20)
+        assert len(tabla) == 20
+        assert tabla['Productos'].sum() == 5
+        assert tabla['Productos'].iloc[0] == 2
+        assert tabla['Productos'].iloc[-1] == 1
+
+    def test_reducir_serie_short_series_untouched(self):
+        """Test that short series are returned as is."""
+        posiciones, valores = reducir_serie([3.0, 1.0, 2.0], max_puntos=10)
+        assert posiciones.tolist() == [0, 1, 2]
+        assert valores.tolist() == [3.0, 1.0, 2.0]
+
+    def test_reducir_serie_keeps_extremes(self):
+        """Test that downsampling is bounded and keeps ends and spikes."""
+        rng = np.random.default_rng(0)
+        serie = np.sort(rng.random(100_003) * 100)[::-1].copy()
+        serie[40_000] = 500.0
+        posiciones, valores = reducir_serie(serie, max_puntos=200)
+        assert len(posiciones) <= 200
+        assert np.all(np.diff(posiciones) > 0)
+        assert posiciones[0] == 0 and posiciones[-1] == len(serie) - 1
+        assert 40_000 in posiciones
+        assert np.array_equal(valores, serie[posiciones])
+
+    def test_figure_payload_bounded_for_large_catalogs(self):
+        """Test that distribution charts stay small whatever the catalog size."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'Producto': [f'Producto {i}' for i in range(50_000)],
+            'Score_México': rng.random(50_000) * 100,
+            'Score_México_B': rng.random(50_000) * 100
+        })
+        for grafico in ('distribucion', 'curva_ranking', 'top'):
+            figura = obtener_figura(df, 'test-grande', 'A', grafico, 15)
+            assert len(figura) < 100_000
+            assert json.loads(figura)['data']
+
+    def test_figure_json_cached_per_scenario(self):
+        """Test that the same JSON object is reused and scenarios differ."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        a = obtener_figura(df, 'test-escenarios', 'A', 'top', 15)
+        assert obtener_figura(df, 'test-escenarios', 'A', 'top', 15) is a
+        assert obtener_figura(df, 'test-escenarios', 'B', 'top', 15) != a
+
+    def test_contribution_chart_states_recomputed_total(self):
+        """Test that the breakdown chart titles the score its bars add up to."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        figura = json.loads(obtener_figura(df, 'test-contribuciones', 'B', 'contribuciones', 'Res'))
+        total = sum(figura['data'][0]['x'])
+        assert figura['layout']['title']['text'] == f"Score recalculado: {total:.1f}"
+
+    def test_scenario_independent_charts_cached_once(self):
+        """Test that charts ignoring the scenario share one entry."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        for grafico in FIGURAS_SIN_ESCENARIO:
+            a = obtener_figura(df, 'test-sin-escenario', 'A', grafico, 10)
+            assert obtener_figura(df, 'test-sin-escenario', 'B', grafico, 10) is a
+
+    def test_product_charts_do_not_evict_catalog_charts(self):
+        """Test that browsing many products keeps the catalog-wide figures cached."""
+        base = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        df = pd.concat([base.assign(Producto=base['Producto'] + f' {i}') for i in range(3)],
+                       ignore_index=True)
+        top = obtener_figura(df, 'test-desalojo', 'A', 'top', 15)
+        for producto in df['Producto']:
+            for escenario in ('A', 'B'):
+                for grafico in FIGURAS_PRODUCTO:
+                    obtener_figura(df, 'test-desalojo', escenario, grafico, producto)
+        assert obtener_figura(df, 'test-desalojo', 'A', 'top', 15) is top
+
+    def test_unknown_chart_raises(self):
+        """Test that an unknown chart name raises ValueError."""
+        with pytest.raises(ValueError):
+            obtener_figura(pd.DataFrame(), 'v', 'A', 'pastel')
+
+
+class TestEstilos:
+    """Test suite for the stylesheet bootstrap."""
+
+    def test_static_link_is_versioned_by_content(self, tmp_path):
+        """Test that the <link> URL changes when the CSS changes."""
+        primera = tmp_path / 'a' / 'estilos.css'
+        segunda = tmp_path / 'b' / 'estilos.css'
+        primera.parent.mkdir()
+        segunda.parent.mkdir()
+        primera.write_text('h1 { color: red; }\n', encoding='utf-8')
+        segunda.write_text('h1 { color: blue; }\n', encoding='utf-8')
+        enlace = etiqueta_estilos(str(primera), estatico=True)
+        assert enlace.startswith('<link rel="stylesheet" href="app/static/estilos.css?v=')
+        assert enlace != etiqueta_estilos(str(segunda), estatico=True)
+        assert etiqueta_estilos(str(primera), estatico=True) == enlace
+
+    def test_inline_fallback(self):
+        """Test that without static serving the CSS is inlined."""
+        etiqueta = etiqueta_estilos(estatico=False)
+        with open(RUTA_ESTILOS, encoding='utf-8') as f:
+            assert f.read() in etiqueta
+        assert etiqueta.startswith('<style>')
+
+    def test_no_external_fonts(self):
+        """Test that the stylesheet loads nothing from the network."""
+        with open(RUTA_ESTILOS, encoding='utf-8') as f:
+            css = f.read()
+        assert '@import' not in css
+        assert 'http' not in css
+        assert 'sans-serif' in css
+
+
+class TestPaginas:
+    """Test suite for the multipage entry point."""
+
+    PAGINAS = ['inicio', 'consultar_producto', 'evaluar_producto', 'comparar_productos',
+               'evaluar_canasta', 'mas_sustentables', 'frente_pareto', 'rankings', 'acerca_de']
+
+    @pytest.fixture
+    def app(self):
+        """Run the entry script once (default page)."""
+        app = AppTest.from_file('app_calculadora_sostenibilidad_v2.py', default_timeout=60)
+        return app.run()
+
+    @pytest.mark.parametrize("pagina", PAGINAS)
+    def test_page_renders(self, app, pagina):
+        """Test that each page script runs without errors under the shared sidebar."""
+        app.switch_page(f'paginas/{pagina}.py').run()
+        assert not app.exception
+        assert app.header or app.subheader
+        assert app.sidebar.radio[0].label == "Metodología de análisis:"
+
+    def test_extreme_new_product_scores_stay_in_range(self, app):
+        """Test that extreme widget inputs render a score clipped to 0-100."""
+        app.switch_page('paginas/evaluar_producto.py').run()
+        assert not app.checkbox[-1].value
+        app.text_input[0].set_value('Producto extremo')
+        for entrada, valor in zip(app.number_input, [100.0, 50000, 500.0, 100.0]):
+            entrada.set_value(valor)
+        next(s for s in app.selectbox if s.label == 'Origen del producto').set_value(100)
+        next(s for s in app.selectbox if s.label == 'Nivel NOVA').set_value(4)
+        app.button[0].click().run()
+        assert not app.exception
+        score = float(app.metric[0].value)
+        assert 0.0 <= score <= 100.0
+
+    @pytest.mark.parametrize("n", [1, 3, 4])
+    def test_consensus_page_with_small_catalog(self, n):
+        """Test that the top-k page handles catalogs with 3 rows or fewer."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv').head(n)
+        app = AppTest.from_file('paginas/mas_sustentables.py', default_timeout=60)
+        app.session_state['_contexto_pagina'] = ContextoPagina(
+            df, f'test-pequeno-{n}', 'A', 'Score_México', IndiceProductos(df['Producto'].tolist()), None
+        )
+        app.run()
+        assert not app.exception
+        assert len(app.slider) == (1 if n > 3 else 0)
+
+    def test_ranking_pages_use_incremental_rankings(self, tmp_path):
+        """Test that with evaluated products merged the ranking pages read the synced rankings."""
+        df = pd.read_csv('dataset_con_scores_A_y_B.csv')
+        registro = RegistroEvaluaciones(str(tmp_path / 'registro.jsonl'))
+        registro.agregar(TestRegistroEvaluaciones.registro_producto('Kiwi', 100.0))
+        rankings = {e: RankingIncremental(indice, df['Producto'])
+                    for e, indice in indices_ranking(df).items()}
+        registro.sincronizar(rankings)
+        combinado = registro.combinar(df)
+        contexto = ContextoPagina(combinado, 'test-incremental', 'A', 'Score_México',
+                                  IndiceProductos(combinado['Producto'].tolist()), registro, rankings)
+
+        app = AppTest.from_file('paginas/rankings.py', default_timeout=60)
+        app.session_state['_contexto_pagina'] = contexto
+        app.run()
+        assert not app.exception
+        tabla = app.dataframe[0].value
+        assert tabla['Producto'].tolist() == combinado.nlargest(15, 'Score_México')['Producto'].tolist()
+        assert tabla['Producto'].iloc[0] == 'Kiwi'
+
+        app = AppTest.from_file('paginas/mas_sustentables.py', default_timeout=60)
+        app.session_state['_contexto_pagina'] = contexto
+        app.run()
+        assert not app.exception
+        assert next(m.value for m in app.markdown if m.value.startswith('### ')) == '### Kiwi'
+
+    def test_page_without_entry_point(self):
+        """Test that a page opened on its own asks for the entry script."""
+        app = AppTest.from_file('paginas/inicio.py', default_timeout=60).run()
+        assert app.error
+
+
+class TestPerfilArranque:
+    """Test suite for the startup profiler."""
+
+    def test_disabled_profile_records_nothing(self):
+        """Test that a disabled recorder is a no-op."""
+        perfil = PerfilEtapas(activo=False)
+        perfil.nueva_ejecucion()
+        with perfil.etapa('cargar_datos'):
+            pass
+        assert perfil.ejecuciones() == []
+
+    def test_stages_accumulate_per_run(self):
+        """Test that repeated stages add up within a run and runs stay apart."""
+        perfil = PerfilEtapas()
+        perfil.nueva_ejecucion()
+        for _ in range(2):
+            with perfil.etapa('estilos'):
+                pass
+        perfil.nueva_ejecucion()
+        with perfil.etapa('cargar_datos'):
+            pass
+        primera, segunda = perfil.ejecuciones()
+        assert list(primera) == ['estilos']
+        assert list(segunda) == ['cargar_datos']
+        assert primera['estilos'] >= 0
+
+    def test_stage_timed_when_block_raises(self):
+        """Test that a failing stage is still recorded and the error propagates."""
+        perfil = PerfilEtapas()
+        with pytest.raises(KeyError):
+            with perfil.etapa('pagina'):
+                raise KeyError('x')
+        assert 'pagina' in perfil.ejecuciones()[0]
+
+    def test_parse_importtime(self):
+        """Test parsing of python -X importtime output."""
+        texto = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     numpy._core\n"
+            "import time:      2000 |       2500 |   numpy\n"
+            "import time:       900 |       4100 | pandas\n"
+            "some unrelated line\n"
+        )
+        filas = analizar_importtime(texto)
+        assert [f['modulo'] for f in filas] == ['numpy._core', 'numpy', 'pandas']
+        assert [f['nivel'] for f in filas] == [2, 1, 0]
+        assert filas[2]['acumulado_ms'] == pytest.approx(4.1)
+        assert filas[1]['propio_ms'] == pytest.approx(2.0)
+
+    def test_budget(self):
+        """Test that only the limits set in the budget are checked."""
+        reporte = {
+            'arranque_ms': 1800.0,
+            'primer_render_ms': 900.0,
+            'importaciones': {'modulos': [{'modulo': 'pandas', 'ms': 450.0}]},
+            'etapas_ms': {'cargar_datos': 30.0, 'estilos': 80.0}
+        }
+        assert comprobar_presupuesto(reporte, {'arranque_ms': 2000}) == []
+        excedidos = comprobar_presupuesto(reporte, {
+            'arranque_ms': 1000,
+            'importaciones_ms': {'pandas': 300, 'plotly.express': 10},
+            'etapas_ms': {'estilos': 100, 'cargar_datos': 10, 'inexistente': 1}
+        })
+        assert excedidos == [
+            'arranque_ms: 1800 ms > 1000 ms',
+            'importar pandas: 450 ms > 300 ms',
+            'etapa cargar_datos: 30 ms > 10 ms'
+        ]
+
+
+class TestCacheComparaciones:
+    """Test suite for the per-session comparison cache."""
+
+    PRODUCTOS = ['Tomate', 'Res', 'Frijol']
+
+    @pytest.fixture
+    def df(self):
+        """Load the bundled dataset."""
+        return pd.read_csv('dataset_con_scores_A_y_B.csv')
+
+    def test_reordered_selection_hits_cache(self, df):
+        """Test that the same set in another order reuses the comparison."""
+        cache = CacheComparaciones()
+        primera = cache.obtener(df, 'test-comparar', 'A', self.PRODUCTOS)
+        segunda = cache.obtener(df, 'test-comparar', 'A', self.PRODUCTOS[::-1])
+        assert segunda is primera
+        assert cache.estadisticas()['aciertos'] == 1
+        assert cache.estadisticas()['fallos'] == 1
+
+    def test_canonical_order_is_best_score_first(self, df):
+        """Test that table and figures follow descending score."""
+        comparacion = construir_comparacion(df, 'test-comparar', 'A', self.PRODUCTOS)
+        scores = comparacion.tabla['Score'].tolist()
+        assert scores == sorted(scores, reverse=True)
+        assert comparacion.tabla['Producto'].tolist() == list(comparacion.productos)
+        radar = json.loads(comparacion.radar)
+        assert [traza['name'] for traza in radar['data']] == list(comparacion.productos)
+
+    def test_scenario_and_version_are_separate_entries(self, df):
+        """Test that a scenario or dataset change is a miss."""
+        cache = CacheComparaciones()
+        a = cache.obtener(df, 'test-comparar', 'A', self.PRODUCTOS)
+        b = cache.obtener(df, 'test-comparar', 'B', self.PRODUCTOS)
+        otra = cache.obtener(df, 'test-comparar-2', 'A', self.PRODUCTOS)
+        assert a.barras != b.barras
+        assert otra is not a
+        assert cache.estadisticas()['entradas'] == 3
+
+    def test_bounded_lru_eviction(self, df):
+        """Test that the least recently used set is evicted at the bound."""
+        cache = CacheComparaciones(max_entradas=2)
+        cache.obtener(df, 'test-comparar', 'A', ['Tomate', 'Frijol'])
+        cache.obtener(df, 'test-comparar', 'A', ['Tomate', 'Res'])
+        cache.obtener(df, 'test-comparar', 'A', ['Frijol', 'Tomate'])
+        cache.obtener(df, 'test-comparar', 'A', ['Frijol', 'Res'])
+        estadisticas = cache.estadisticas()
+        assert estadisticas['entradas'] == 2
+        assert estadisticas['desalojos'] == 1
+        cache.obtener(df, 'test-comparar', 'A', ['Tomate', 'Frijol'])
+        assert cache.estadisticas()['aciertos'] == 2
+        with pytest.raises(ValueError):
+            CacheComparaciones(max_entradas=0)
+
+    def test_table_formatting(self, df):
+        """Test the rounded, formatted and read-only comparison table."""
+        tabla = construir_comparacion(df, 'test-comparar', 'B', self.PRODUCTOS).tabla
+        fila = tabla.set_index('Producto').loc['Res']
+        original = df.set_index('Producto').loc['Res']
+        assert fila['Agua (L)'] == f"{original['WF_L_kg']:,.0f}"
+        assert fila['Carbono (kg CO₂)'] == round(original['CF_kgCO2eq_kg'], 2)
+        assert fila['Score'] == round(original['Score_México_B'], 1)
+        esperado = {0: 'Local', 50: 'Regional'}.get(original['Origin_Score'], 'Importado')
+        assert fila['Origen'] == esperado
+        with pytest.raises(ValueError):
+            tabla['Score'].to_numpy()[0] = 0